@@ -6,6 +6,11 @@ __all__ = [ 'Document',
             'EnumType',
             'PrimitiveType',
             'ReferenceType',
+            'walk',
+            'WalkEvent',
+            'ENTER',
+            'LEAVE',
+            'shared_table',
             'writers',
            ]
 
@@ -17,4 +22,6 @@ from .document import FieldType
 from .document import EnumType
 from .document import PrimitiveType
 from .document import ReferenceType
+from .document import walk, WalkEvent, ENTER, LEAVE
+from .document import shared_table
 from . import writers
@@ -1,5 +1,142 @@
 import os
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+
+from .indent import Lines
+
+# Document traversal (walk) events
+ENTER = "enter"    # element reached, before its content
+LEAVE = "leave"    # element content done
+
+# Element content, in the order walked by default
+CONTENT = ( "_attributes", "_references", "_compositions" )
+
+# Traversal step
+#   event   - ENTER or LEAVE
+#   element - the element
+#   depth   - nesting level (walk roots at 0)
+#   path    - tuple of the vodml_role-s from the walk root to the element
+WalkEvent = namedtuple( "WalkEvent", [ "event", "element", "depth", "path" ] )
+
+def _content( elem, content ):
+  # lazily iterate the element content
+  for attr in content:
+    groups = getattr( elem, attr, None )
+    if groups:
+      for role in groups:
+        for item in groups[ role ]:
+          yield item
+
+def walk( roots, events=( ENTER, ), prune=None, content=CONTENT ):
+  """
+  Walk elements and their content, depth first.
+
+  An explicit stack is used instead of recursion, so the depth of the
+  hierarchy is not limited by the Python recursion limit; content is
+  iterated in place, no intermediate lists are built.
+
+  Parameters
+  ----------
+
+    roots   : iterable
+              elements to walk
+
+    events  : tuple
+              events to report: ENTER (pre-order), LEAVE (post-order), or both
+
+    prune   : callable
+              prune( element, depth, path ); when it returns True, the
+              content of the element is not walked (the element itself is
+              reported)
+
+    content : tuple
+              element content to walk, in order; default CONTENT
+
+  Returns
+  --------
+    generator of WalkEvent
+
+  """
+  enter = ENTER in events
+  leave = LEAVE in events
+  done  = object()
+
+  # frames: ( content iterator, element, depth, path )
+  stack = [ ( iter( roots ), None, -1, () ) ]
+  while stack:
+    items, parent, pdepth, ppath = stack[-1]
+
+    item = next( items, done )
+    if item is done:
+      stack.pop()
+      if leave and parent is not None:
+        yield WalkEvent( LEAVE, parent, pdepth, ppath )
+      continue
+
+    depth = pdepth + 1
+    path  = ppath + ( item.vodml_role, )
+    if enter:
+      yield WalkEvent( ENTER, item, depth, path )
+
+    if ( prune is not None and prune( item, depth, path ) ) or not any( getattr( item, attr, None ) for attr in content ):
+      # no content to walk
+      if leave:
+        yield WalkEvent( LEAVE, item, depth, path )
+      continue
+
+    stack.append( ( _content( item, content ), item, depth, path ) )
+
+class _SharedTable(Mapping):
+  # read-only mapping, shared by elements; pickled by content and
+  # interned again on load
+  __slots__ = ( "_items", )
+
+  def __init__(self, pairs ):
+    self._items = OrderedDict( pairs )
+
+  def __getitem__(self, key ):
+    return self._items[ key ]
+
+  def __iter__(self):
+    return iter( self._items )
+
+  def __len__(self):
+    return len( self._items )
+
+  def __repr__(self):
+    return "{0}({1})".format( self.__class__.__name__, list( self._items.items() ) )
+
+  def __reduce__(self):
+    return ( shared_table, ( tuple( self._items.items() ), ) )
+
+_tables = {}   # (key, value) pairs -> _SharedTable
+
+def shared_table( pairs ):
+  """
+  Return the read-only table holding the given (key, value) pairs, in order.
+
+  Tables are interned: equal pairs give the same table, so a table is held
+  once however many elements use it (eg: the literals of an enumeration).
+
+  Parameters
+  ----------
+
+    pairs  : iterable
+             (key, value) pairs
+
+  Returns
+  --------
+    table  : read-only Mapping
+  """
+  pairs = tuple( pairs )
+  table = _tables.get( pairs )
+  if table is None:
+    table = _tables.setdefault( pairs, _SharedTable( pairs ) )
+  return table
+
+# content of an element with none; replaced by an OrderedDict on first add
+_EMPTY = shared_table( () )
+
 
 class Document:
   """
@@ -16,39 +153,53 @@ class Document:
     self._source     = ""             # Pointer to source file
     self._source_ext = ""             #  - extension number within source file
 
+    self._ids        = {}             # Index: refid -> element
+    self._roles      = {}             # Index: vodml_role -> [elements]
+    self._datanodes  = []             # Elements flagged as datanode
+    self._indexed    = set()          #  - id() of the indexed elements
+
   def __str__(self):
     retstr = self.__repr__() + "\n"
     return retstr
 
   def __repr__(self):
+    return self.to_string()
 
-    retstr  = "<DOCUMENT>\n"
-    retstr += "  <INFO  value='IVAO Datamodel Instance document'/>\n"
+  def to_string( self, compact=False ):
+    """
+    Text representation of the Document.
+
+    Parameters
+    ----------
 
-    if ( len(self._models) > 0 ):
-      # Add Model tags
-      for key in self._models.keys():
-        retstr += "  <MODEL prefix='{0}' url='{1}'/>\n".format( key, self._models[ key ] )
+      compact : boolean
+                leave out indentation and newlines
 
-    if ( len(self._metadata) > 0 ):
-      # Add Metadata blocks
-      for key in self._metadata.keys():
-        metastr = "  "
+    Returns
+    --------
+      string
+    """
+    out = Lines( compact )
 
-        tmpstr = "<METADATA name='{0}'>\n".format(key)
-        entries = self._metadata[ key ]
-        for rec in entries:
-          blkstr  = "  " + repr(rec).replace('\n','\n  ')  # indent sub-content
-          tmpstr += blkstr + "\n"
-        tmpstr += "</METADATA>"
+    out.add( 0, "<DOCUMENT>" )
+    out.add( 1, "<INFO  value='IVAO Datamodel Instance document'/>" )
 
-        metastr += tmpstr.replace('\n','\n  ')
+    # Add Model tags
+    for key in self._models.keys():
+      out.add( 1, "<MODEL prefix='{0}' url='{1}'/>".format( key, self._models[ key ] ) )
 
-        retstr += metastr + "\n"
+    # Add Metadata blocks
+    for key in self._metadata.keys():
+      out.add( 1, "<METADATA name='{0}'>".format(key) )
+      for rec in self._metadata[ key ]:
+        rec.__repr_lines__( out, 2 )
+      out.add( 1, "</METADATA>" )
 
-    retstr  += "</DOCUMENT>\n"
+    out.add( 0, "</DOCUMENT>" )
 
-    return retstr
+    if compact:
+      return out.text()
+    return out.text() + "\n"
 
 
   def add_metadata( self, obj, key="default" ):
@@ -76,7 +227,7 @@ class Document:
       TypeError:  invalid argument error 
   
     """
-    if obj.__class__.__name__ not in ( "ObjectType", "DataType" ):
+    if not isinstance( obj, ( ObjectType, DataType ) ) or isinstance( obj, FieldType ):
       raise TypeError("'obj' argument must be ObjectType type, not {0}".format( obj.__class__.__name__ ) )
 
     # make sure hash entry exists for this role
@@ -86,6 +237,8 @@ class Document:
     # add object to hash
     self._metadata[ key ].append(obj)
 
+    self.index( obj )
+
 
   def add_model_pointer( self, prefix, url ):
     """
@@ -144,11 +297,131 @@ class Document:
       TypeError:  invalid argument error 
   
     """
-    if obj.__class__.__name__ not in ( "FieldType", ):
+    if not isinstance( obj, FieldType ):
       raise TypeError("'obj' argument must be FieldType type, not {0}".format( obj.__class__.__name__ ) )
 
     self._body.append(obj)
 
+    self.index( obj )
+
+
+  def index( self, elem ):
+    """
+    Add element, and all its content, to the Document index.
+
+    Elements passed to add_metadata() and add_body() are indexed with
+    their content at that time; use this for content added afterwards.
+
+    Parameters
+    ----------
+
+      elem   : ElementType
+                Element to index
+
+    Returns
+    --------
+
+      none
+    """
+    for step in walk( ( elem, ) ):
+      item = step.element
+
+      # content is indexed again, to pick up additions
+      if id( item ) not in self._indexed:
+        self._indexed.add( id( item ) )
+
+        if item.refid != "" and item.refid not in self._ids:
+          self._ids[ item.refid ] = item
+
+        self._roles.setdefault( item.vodml_role, [] ).append( item )
+
+        if getattr( item, "_datanode", False ):
+          self._datanodes.append( item )
+
+
+  def walk( self, events=( ENTER, ), prune=None, content=CONTENT ):
+    """
+    Walk the metadata objects of the Document, and their content, depth
+    first; see walk() for the parameters.
+
+    Returns
+    --------
+      generator of WalkEvent
+    """
+    roots = ( obj for key in self._metadata for obj in self._metadata[ key ] )
+    return walk( roots, events, prune, content )
+
+
+  def find( self, refid ):
+    """
+    Return the element with the given ID, at any depth.
+
+    Parameters
+    ----------
+
+      refid  : string
+                Element ID
+
+    Returns
+    --------
+
+      element: ElementType
+
+    Raises
+    --------
+
+      ValueError:  no element with the ID.
+    """
+    try:
+      return self._ids[ refid ]
+    except KeyError:
+      raise ValueError("Element with ID '{0}' not found in document.".format( refid ) )
+
+
+  def find_role( self, role ):
+    """
+    Return the elements with the given VO-DML role, at any depth, in Document order.
+
+    Parameters
+    ----------
+
+      role   : string
+                VO-DML role
+
+    Returns
+    --------
+
+      []      - list of elements; empty if none found
+    """
+    return list( self._roles.get( role, [] ) )
+
+
+  def resolve( self, ref ):
+    """
+    Return the element a ReferenceType points to.
+
+    Parameters
+    ----------
+
+      ref    : ReferenceType
+                Reference to resolve
+
+    Returns
+    --------
+
+      element: ElementType
+
+    Raises
+    --------
+
+      TypeError:   invalid argument error
+      ValueError:  target not found in document.
+    """
+    if not isinstance( ref, ReferenceType ):
+      raise TypeError("'ref' argument must be ReferenceType type, not {0}".format( ref.__class__.__name__ ) )
+
+    return self.find( ref.target )
+
 
   def set_datanode( self, role ):
     """
@@ -170,6 +443,7 @@ class Document:
     --------
   
       TypeError:  invalid argument error 
+      ValueError: no ObjectType with the role in the document.
   
     """
     if not isinstance( role, str ):
@@ -180,22 +454,13 @@ class Document:
     
     found = False
 
-    if ( len(self._metadata) > 0 ):
-      # Search Metadata blocks
-      for key in self._metadata.keys():
-        entries = self._metadata[ key ]
-        for rec in entries:
-          if rec.__class__.__name__ in ( "ObjectType" ):
-            if rec.vodml_role == role:
-              found = True
-              rec._datanode = True
-            else:
-              if rec.vodml_role in role:
-                # the given role is a child of this node
-                for child in rec.get_compositions(role):
-                  if child.vodml_role == role:
-                    found = True
-                    child._datanode = True
+    for rec in self._roles.get( role, [] ):
+      if isinstance( rec, ObjectType ):
+        found = True
+        if not rec._datanode:
+          rec._datanode = True
+          self._datanodes.append( rec )
+
     if not found:
       raise ValueError("role '"+role+"' not found in document.")
 
@@ -222,33 +487,10 @@ class Document:
   
   
     """
-    result = None
-
-    # This is not a deep search, and I think the idea was to have these
-    # instances on the 'body' element of the Document, but the code has
-    # not migrated that far yet, and that element only has the leaves
-    # which are FieldType-s.
+    if len( self._datanodes ) == 0:
+      return None
 
-    if ( len(self._metadata) > 0 ):
-      # Search Metadata blocks
-      for key in self._metadata.keys():
-        entries = self._metadata[ key ]
-        for instance in entries:
-          if instance.__class__.__name__ in ( "ObjectType" ):
-            if instance._datanode == True:
-              if result is None:
-                result = []
-              result.append(instance)
-            else:
-              # Scan the child compositions of the primary instances.
-              # we're not going recursive here... yet
-              for compkey in instance._compositions:
-                if instance._compositions[compkey][0]._datanode == True:
-                  if result is None:
-                    result = []
-                  result.extend( instance._compositions[compkey] )
-
-    return result
+    return list( self._datanodes )
 
 #================================================================================
 class ElementType(object):
@@ -263,7 +505,17 @@ class ElementType(object):
     vodml_role   - VO-DML ID of the element role
     vodml_type   - VO-DML ID of the element type
 
+    kind         - element kind, constant per class, for dispatch on the
+                   element type: 'object', 'datatype', 'field', 'enum',
+                   'primitive', 'reference'
+
+  Element classes use __slots__, and their content tables are created on
+  the first add, as documents may hold millions of elements.
   """
+  __slots__ = ( "refid", "name", "description", "vodml_role", "vodml_type" )
+
+  kind = "element"
+
   def __init__(self, refid="", name="", desc=""):
 
     if not isinstance( refid, str ):
@@ -289,22 +541,55 @@ class ElementType(object):
     return retstr
 
   def __repr__(self):
-    retstr = "<ELEMENT "+self__repr_basic_args__()
+    return self.to_string()
+
+  def to_string( self, compact=False ):
+    """
+    Text representation of the element; with compact set, without
+    indentation and newlines.
+    """
+    out = Lines( compact )
+    self.__repr_lines__( out, 0 )
+    return out.text()
+
+  def walk( self, events=( ENTER, ), prune=None, content=CONTENT ):
+    """
+    Walk the element and its content, depth first; see walk() for the
+    parameters.
+
+    Returns
+    --------
+      generator of WalkEvent
+    """
+    return walk( ( self, ), events, prune, content )
+
+  def __repr_lines__(self, out, level ):
+    self.__repr_simple__( out, level, "ELEMENT", self.__repr_basic_args__() )
+
+  def __repr_simple__(self, out, level, tag, args ):
+    # element with at most a description
     if self.description == "":
-      retstr += "/>"
+      out.add( level, "<" + tag + " " + args + "/>" )
     else:
-      retstr += ">\n"
-      retstr += self.__repr_description__()
-      retstr += "</ELEMENT>"
-    return retstr
+      out.add( level, "<" + tag + " " + args + ">" )
+      self.__repr_description__( out, level+1 )
+      out.add( level, "</" + tag + ">" )
 
   def __repr_basic_args__(self):
     retstr = "ID='{0}' name='{1}' vodml_role='{2}' vodml_type='{3}'".format(self.refid, self.name, self.vodml_role, self.vodml_type)
     return retstr
 
-  def __repr_description__(self):
-    retstr = "  <DESCRIPTION>{0}</DESCRIPTION>\n".format(self.description)
-    return retstr
+  def __repr_description__(self, out, level ):
+    out.add( level, "<DESCRIPTION>{0}</DESCRIPTION>".format(self.description), cont=level-1 )
+
+  @staticmethod
+  def __repr_block__( out, level, tag, items ):
+    # block of sub-elements, keyed by role
+    out.add( level, "<" + tag + ">" )
+    for role in items.keys():
+      for inst in items[ role ]:
+        inst.__repr_lines__( out, level+1 )
+    out.add( level, "</" + tag + ">" )
 
 
 #================================================================================
@@ -320,71 +605,41 @@ class ObjectType(ElementType):
     compositions - Set of compositions with other ObjectType-s
    
   """
+  __slots__ = ( "_attributes", "_references", "_compositions", "_referenced", "_datanode" )
+
+  kind = "object"
 
   def __init__(self, refid="", name="", desc="" ):
     super(ObjectType, self).__init__(refid, name, desc)
 
-    self._attributes   = OrderedDict()
-    self._references   = OrderedDict()
-    self._compositions = OrderedDict()
+    self._attributes   = _EMPTY
+    self._references   = _EMPTY
+    self._compositions = _EMPTY
 
     self._referenced  = False # internal flag that the Object is referenced from another Element(s)
     self._datanode    = False # internal flag that the Object starts a template describing multiple instances (ie:Table content)
    
-  def __repr__(self):
-    retstr = "<OBJECT "+self.__repr_basic_args__()
+  def __repr_lines__(self, out, level ):
+    head = "<OBJECT "+self.__repr_basic_args__()
     if ( (self.description == "") and (len(self._attributes)+len(self._references)+len(self._compositions)) == 0 ):
-      retstr += "/>"
-    else:
-      retstr += ">\n"
-
-      if ( self.description != "" ):
-        retstr += self.__repr_description__()
-
-      if len(self._attributes) > 0:
-        # Add attributes block
-        tmpstr = "  " + self.__repr_attributes__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
+      out.add( level, head + "/>" )
+      return
 
-      if len(self._references) > 0:
-        # Add references block
-        tmpstr = "  " + self.__repr_references__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
+    out.add( level, head + ">" )
 
-      if len(self._compositions) > 0:
-        # Add compositions block
-        tmpstr = "  " + self.__repr_compositions__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
+    if ( self.description != "" ):
+      self.__repr_description__( out, level+1 )
 
-      retstr += "</OBJECT>"
-    return retstr
+    if len(self._attributes) > 0:
+      self.__repr_block__( out, level+1, "ATTRIBUTES", self._attributes )
 
-  def __repr_attributes__(self):
-    retstr = "<ATTRIBUTES>\n"
-    for item in self._attributes.keys():
-      for inst in self._attributes[item]:
-        tmpstr = "  "+repr(inst).replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-    retstr += "</ATTRIBUTES>"
-    return retstr
+    if len(self._references) > 0:
+      self.__repr_block__( out, level+1, "REFERENCES", self._references )
 
-  def __repr_references__(self):
-    retstr = "<REFERENCES>\n"
-    for item in self._references.keys():
-      for inst in self._references[item]:
-        tmpstr  = "  "+repr(inst).replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-    retstr += "</REFERENCES>"
-    return retstr
+    if len(self._compositions) > 0:
+      self.__repr_block__( out, level+1, "COMPOSITIONS", self._compositions )
 
-  def __repr_compositions__(self):
-    retstr = "<COMPOSITIONS>\n"
-    for item in self._compositions.keys():
-      for inst in self._compositions[item]:
-        tmpstr  = "  "+repr(inst).replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-    retstr += "</COMPOSITIONS>"
-    return retstr
+    out.add( level, "</OBJECT>" )
 
 
   def add_attribute(self, item):
@@ -411,10 +666,12 @@ class ObjectType(ElementType):
     """
 
     #if isinstance( item, ValueType ):
-    if item.__class__.__name__ not in ( "DataType", "EnumType", "PrimitiveType", "FieldType" ):
+    if not isinstance( item, ( DataType, EnumType, PrimitiveType ) ):
       raise TypeError("'item' argument must be ValueType object, not "+item.__class__.__name__ )
 
     # make sure hash entry exists for this role
+    if self._attributes is _EMPTY:
+      self._attributes = OrderedDict()
     if self._attributes.get( item.vodml_role ) == None:
       self._attributes[ item.vodml_role ] = []
 
@@ -444,10 +701,12 @@ class ObjectType(ElementType):
       TypeError:  invalid argument error 
   
     """
-    if item.__class__.__name__ not in ( "ObjectType", ):
+    if not isinstance( item, ObjectType ):
       raise TypeError("'item' argument must be ObjectType object, not "+item.__class__.__name__ )
 
     # make sure hash entry exists for this role
+    if self._compositions is _EMPTY:
+      self._compositions = OrderedDict()
     if self._compositions.get( item.vodml_role ) == None:
       self._compositions[ item.vodml_role ] = []
 
@@ -478,13 +737,15 @@ class ObjectType(ElementType):
 
     """
 
-    if item.__class__.__name__ not in ( "ReferenceType", ):
+    if not isinstance( item, ReferenceType ):
       raise TypeError("'item' argument must be ReferenceType object, not "+item.__class__.__name__ )
 
     if item.target == "":
       raise ValueError("invalid or empty reference ID in \'"+item.name+"\'")
 
     # make sure hash entry exists for this role
+    if self._references is _EMPTY:
+      self._references = OrderedDict()
     if self._references.get( item.vodml_role ) == None:
       self._references[ item.vodml_role ] = []
 
@@ -588,6 +849,10 @@ class ValueType(ElementType):
     ucd          - UCD associated with the element
 
   """
+  __slots__ = ( "ucd", )
+
+  kind = "value"
+
   def __init__(self, refid="", name="", desc="", ucd="" ):
     super(ValueType, self).__init__(refid, name, desc)
 
@@ -596,15 +861,8 @@ class ValueType(ElementType):
 
     self.ucd = ucd
 
-  def __repr__(self):
-    retstr = "<VALUETYPE " + self.__repr_valuetype_args__()
-    if self.description == "":
-      retstr += "/>"
-    else:
-      retstr += ">\n"
-      retstr += self.__repr_description__()
-      retstr += "</VALUETYPE>"
-    return retstr
+  def __repr_lines__(self, out, level ):
+    self.__repr_simple__( out, level, "VALUETYPE", self.__repr_valuetype_args__() )
 
   def __repr_valuetype_args__(self):
     retstr  = self.__repr_basic_args__()
@@ -621,6 +879,10 @@ class PrimitiveType(ValueType):
     value        - instance value (as string)
 
   """
+  __slots__ = ( "value", )
+
+  kind = "primitive"
+
   def __init__(self, value, refid="", name="", desc="", ucd="" ):
     super(PrimitiveType, self).__init__(refid, name, desc, ucd)
 
@@ -629,20 +891,9 @@ class PrimitiveType(ValueType):
 
     self.value = value
 
-  def __repr__(self):
-    retstr = "<PRIMITIVE " + self.__repr_valuetype_args__()
-
-    retstr += " value='{0}'".format(self.value)
-
-    if self.description == "":
-      retstr += "/>"
-    else:
-      retstr += ">\n"
-      retstr += self.__repr_description__()
-      retstr += "</PRIMITIVE>"
-
-
-    return retstr
+  def __repr_lines__(self, out, level ):
+    args = self.__repr_valuetype_args__() + " value='{0}'".format(self.value)
+    self.__repr_simple__( out, level, "PRIMITIVE", args )
 
 
 #================================================================================
@@ -655,8 +906,12 @@ class EnumType(ValueType):
     literals     - Set of enumeration literals
                      key   = vo-dml id of literal
                      value = associated label
+                   shared by the instances of an enumeration, see set_literals()
    
   """
+  __slots__ = ( "value", "_literals" )
+
+  kind = "enum"
 
   def __init__(self, refid="", name="", desc="", value="", ucd=""):
     super(EnumType, self).__init__(refid, name, desc, ucd)
@@ -665,28 +920,25 @@ class EnumType(ValueType):
       raise TypeError("'value' argument must be string type, not {0}".format( value.__class__.__name__ ) )
 
     self.value = value
-    self._literals = OrderedDict()
+    self._literals = _EMPTY
 
 
-  def __repr__(self):
-    retstr = "<ENUMERATION "+self.__repr_valuetype_args__()
-
-    retstr += " value='{0}'".format(self.value)
+  def __repr_lines__(self, out, level ):
+    head = "<ENUMERATION "+self.__repr_valuetype_args__() + " value='{0}'".format(self.value)
 
     if ( (self.description == "") and (len(self._literals) == 0) ):
-      retstr += "/>"
-    else:
-      retstr += ">\n"
+      out.add( level, head + "/>" )
+      return
 
-      if ( self.description != "" ):
-        retstr += self.__repr_description__()
+    out.add( level, head + ">" )
 
-      if len(self._literals) > 0:
-        for item in sorted( self._literals.keys() ):
-          retstr += "  <LITERAL vodmlid='{0}' label='{1}' />\n".format( item, self._literals[ item ] )
-      
-      retstr += "</ENUMERATION>"
-    return retstr
+    if ( self.description != "" ):
+      self.__repr_description__( out, level+1 )
+
+    for item in sorted( self._literals.keys() ):
+      out.add( level+1, "<LITERAL vodmlid='{0}' label='{1}' />".format( item, self._literals[ item ] ) )
+
+    out.add( level, "</ENUMERATION>" )
 
   def add_literal(self, vodmlid, label):
     """
@@ -719,9 +971,44 @@ class EnumType(ValueType):
     if not isinstance( label, str ):
       raise TypeError("'label' argument must be string type, not {0}".format( label.__class__.__name__ ) )
 
+    # copy shared table before adding to it
+    if isinstance( self._literals, _SharedTable ):
+      self._literals = OrderedDict( self._literals )
+
     # add to hash
     self._literals[ vodmlid ] = label
 
+  def set_literals(self, literals):
+    """
+    Set the enumeration literals; the table is shared with the other
+    instances having the same literals, not copied.
+
+    Parameters
+    ----------
+
+      literals  : iterable of (vodmlid, label) string pairs, or a table from shared_table()
+
+    Returns
+    --------
+
+        none
+
+
+    Raises
+    --------
+
+       TypeError:  invalid argument error
+
+    """
+    if not isinstance( literals, _SharedTable ):
+      literals = tuple( literals )
+      for vodmlid, label in literals:
+        if not isinstance( vodmlid, str ) or not isinstance( label, str ):
+          raise TypeError("'literals' argument must hold string pairs, not ({0}, {1})".format( vodmlid.__class__.__name__, label.__class__.__name__ ) )
+      literals = shared_table( literals )
+
+    self._literals = literals
+
 #================================================================================
 class DataType(ValueType):
   """
@@ -734,6 +1021,9 @@ class DataType(ValueType):
                      keyed by 'role' may have multiple instances for any role.
    
   """
+  __slots__ = ( "value", "unit", "_attributes", "_references", "__dict__" )   # callers may attach attributes
+
+  kind = "datatype"
 
   def __init__(self, refid="", name="", desc="", vodml_type="", value="", unit="", ucd=""):
     super(DataType, self).__init__(refid, name, desc, ucd)
@@ -748,53 +1038,33 @@ class DataType(ValueType):
     self.value = value
     self.unit  = unit
 
-    self._attributes  = OrderedDict()
-    self._references  = OrderedDict()
+    self._attributes  = _EMPTY
+    self._references  = _EMPTY
 
 
-  def __repr__(self):
-    retstr = "<DATATYPE "+self.__repr_valuetype_args__()
+  def __repr_lines__(self, out, level, tag="DATATYPE" ):
+    head = "<" + tag + " " + self.__repr_valuetype_args__()
     if self.value != "":
-      retstr += " value='{0}'".format(self.value)
+      head += " value='{0}'".format(self.value)
       if self.unit != "":
-        retstr += " unit='{0}'".format(self.unit)
+        head += " unit='{0}'".format(self.unit)
 
     if ( (self.description == "") and (len(self._attributes) == 0) and (len(self._references) == 0 ) ):
-      retstr += "/>"
-    else:
-      retstr += ">\n"
+      out.add( level, head + "/>" )
+      return
 
-      if ( self.description != "" ):
-        retstr += self.__repr_description__()
+    out.add( level, head + ">" )
 
-      if len(self._attributes) > 0:
-        tmpstr = "  " + self.__repr_attributes__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-      
-      if len(self._references) > 0:
-        tmpstr = "  " + self.__repr_references__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
+    if ( self.description != "" ):
+      self.__repr_description__( out, level+1 )
 
-      retstr += "</DATATYPE>"
-    return retstr
+    if len(self._attributes) > 0:
+      self.__repr_block__( out, level+1, "ATTRIBUTES", self._attributes )
 
-  def __repr_attributes__(self):
-    retstr = "<ATTRIBUTES>\n"
-    for item in self._attributes.keys():
-      for inst in self._attributes[item]:
-        tmpstr  = "  "+repr(inst).replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-    retstr += "</ATTRIBUTES>"
-    return retstr
+    if len(self._references) > 0:
+      self.__repr_block__( out, level+1, "REFERENCES", self._references )
 
-  def __repr_references__(self):
-    retstr = "<REFERENCES>\n"
-    for item in self._references.keys():
-      for inst in self._references[item]:
-        tmpstr  = "  "+repr(inst).replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-    retstr += "</REFERENCES>"
-    return retstr
+    out.add( level, "</" + tag + ">" )
 
 
   def add_attribute(self, item):
@@ -821,10 +1091,12 @@ class DataType(ValueType):
     """
 
     #if isinstance( item, ValueType ):
-    if item.__class__.__name__ not in ( "DataType", "EnumType", "PrimitiveType", "FieldType" ):
+    if not isinstance( item, ( DataType, EnumType, PrimitiveType ) ):
       raise TypeError("'item' argument must be ValueType object, not "+item.__class__.__name__ )
 
     # make sure hash entry exists for this role
+    if self._attributes is _EMPTY:
+      self._attributes = OrderedDict()
     if self._attributes.get( item.vodml_role ) == None:
       self._attributes[ item.vodml_role ] = []
 
@@ -855,13 +1127,15 @@ class DataType(ValueType):
 
     """
 
-    if item.__class__.__name__ not in ( "ReferenceType", ):
+    if not isinstance( item, ReferenceType ):
       raise TypeError("'item' argument must be ReferenceType object, not "+item.__class__.__name__ )
 
     if item.target == "":
       raise ValueError("invalid or empty reference ID in \'"+item.name+"\'")
 
     # make sure hash entry exists for this role
+    if self._references is _EMPTY:
+      self._references = OrderedDict()
     if self._references.get( item.vodml_role ) == None:
       self._references[ item.vodml_role ] = []
 
@@ -875,34 +1149,16 @@ class FieldType(DataType):
   Extension of DataType to distinguish fields from metadata
 
   """
+  __slots__ = ()
+
+  kind = "field"
 
   def __init__(self, refid="", name="", desc="", vodml_type="", value="", unit="", ucd=""):
     super(FieldType, self).__init__(refid, name, desc, vodml_type, value, unit, ucd )
 
-  def __repr__(self):
-    retstr = "<FIELDTYPE "+self.__repr_valuetype_args__()
-    if self.value != "":
-      retstr += " value='{0}'".format(self.value)
-      if self.unit != "":
-        retstr += " unit='{0}'".format(self.unit)
-    if ( (self.description == "") and (len(self._attributes) == 0) and (len(self._references) == 0 ) ):
-      retstr += "/>"
-    else:
-      retstr += ">\n"
-      if ( self.description != "" ):
-        retstr += self.__repr_description__()
-
-      if len(self._attributes) > 0:
-        tmpstr = "  " + self.__repr_attributes__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
+  def __repr_lines__(self, out, level ):
+    super(FieldType, self).__repr_lines__( out, level, "FIELDTYPE" )
 
-      if len(self._references) > 0:
-        tmpstr = "  " + self.__repr_references__().replace('\n','\n  ')  # indent sub-content
-        retstr += tmpstr + "\n"
-
-      retstr += "</FIELDTYPE>"
-    return retstr
-    
 #================================================================================
 class ReferenceType(ElementType):
   """
@@ -912,6 +1168,10 @@ class ReferenceType(ElementType):
     target      - ID of referenced element
 
   """
+  __slots__ = ( "target", )
+
+  kind = "reference"
+
   def __init__(self, target, refid="", name="", desc="" ):
     super(ReferenceType, self).__init__(refid, name, desc)
 
@@ -920,14 +1180,7 @@ class ReferenceType(ElementType):
 
     self.target = target
 
-  def __repr__(self):
-    retstr = "<REFERENCE " + self.__repr_basic_args__()
-    retstr += " target='{0}'".format(self.target)
-    if self.description == "":
-      retstr += "/>"
-    else:
-      retstr += ">\n"
-      retstr += self.__repr_description__()
-      retstr += "</REFERENCE>"
-    return retstr
+  def __repr_lines__(self, out, level ):
+    args = self.__repr_basic_args__() + " target='{0}'".format(self.target)
+    self.__repr_simple__( out, level, "REFERENCE", args )
 
@@ -0,0 +1,46 @@
+"""
+  Indentation strings, shared by the Document text representation and
+  the writers; built once per nesting level and reused.
+"""
+
+INDENT = "  "        # one level of indentation
+
+_table = [ "" ]      # level -> indentation string
+
+def indentation( level ):
+  """
+  Return the indentation string for a nesting level.
+  """
+  try:
+    return _table[ level ]
+  except IndexError:
+    while len(_table) <= level:
+      _table.append( _table[-1] + INDENT )
+    return _table[ level ]
+
+
+class Lines(object):
+  """
+  Collects the lines of a nested text representation.
+
+  Each line is added with its nesting level; embedded newlines are
+  indented to the 'cont' level (default, the line level).  With compact
+  set, indentation and newlines are left out.
+  """
+  def __init__(self, compact=False ):
+    self._parts = []
+    self.compact = compact
+
+  def add( self, level, text, cont=None ):
+    if self.compact:
+      self._parts.append( text )
+      return
+
+    if "\n" in text:
+      text = text.replace( "\n", "\n" + indentation( level if cont is None else cont ) )
+    self._parts.append( indentation( level ) + text )
+
+  def text( self ):
+    if self.compact:
+      return "".join( self._parts )
+    return "\n".join( self._parts )
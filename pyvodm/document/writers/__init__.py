@@ -1,6 +1,17 @@
 __all__ = [ 'VOTWriter',
             'XMLWriter',
+            'Writer',
+            'MultiWriter',
+            'register_writer',
+            'get_writer',
+            'writer_formats',
            ]
 #
+from .writer import Writer
 from .vot import VOTWriter
 from .xml import XMLWriter
+from .writerRegistry import register_writer, get_writer, writer_formats, MultiWriter
+
+register_writer( "vot",  VOTWriter )
+register_writer( "avot", VOTWriter, annotation="vodml" )
+register_writer( "xml",  XMLWriter )
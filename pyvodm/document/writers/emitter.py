@@ -0,0 +1,72 @@
+import io
+
+"""
+  Buffered output for the Document writers.
+"""
+
+FLUSH_SIZE = 65536   # default buffered characters before writing to the stream
+
+class Emitter(object):
+  """
+  Collects output text in chunks, passing it to the target stream each time
+  about 'flush_size' characters have accumulated, and on flush().
+
+  The target may be
+    o a text stream                     (str written)
+    o a binary stream, eg: io.BytesIO   (UTF-8 encoded bytes written)
+    o a socket                          (UTF-8 encoded bytes sent)
+
+  Parameters
+  ----------
+    stream     : file-like or socket
+    flush_size : integer
+                 buffered characters before writing; 0 writes every chunk.
+
+  """
+  def __init__(self, stream, flush_size=FLUSH_SIZE ):
+    self._chunks = []
+    self._size = 0
+    self.flush_size = flush_size
+    self.nchars = 0
+
+    if not hasattr( stream, "write" ) and hasattr( stream, "sendall" ):
+      # socket
+      self._sink = lambda text: stream.sendall( text.encode("utf-8") )
+    elif isinstance( stream, io.TextIOBase ):
+      self._sink = stream.write
+    elif isinstance( stream, io.RawIOBase ):
+      self._sink = lambda text: self._write_raw( stream, text.encode("utf-8") )
+    elif isinstance( stream, io.BufferedIOBase ) or 'b' in getattr( stream, "mode", "" ):
+      self._sink = lambda text: stream.write( text.encode("utf-8") )
+    else:
+      self._sink = stream.write
+
+  @staticmethod
+  def _write_raw( stream, data ):
+    # raw streams may accept only part of the data
+    view = memoryview( data )
+    while len(view) > 0:
+      nn = stream.write( view )
+      if nn is None:
+        nn = 0
+      view = view[nn:]
+
+  def emit( self, text ):
+    """
+    Add text to the output.
+    """
+    self._chunks.append( text )
+    self._size += len(text)
+    if self._size >= self.flush_size:
+      self.flush()
+
+  def flush( self ):
+    """
+    Write the buffered text to the stream.
+    """
+    if self._chunks:
+      text = "".join( self._chunks )
+      self._chunks = []
+      self._size = 0
+      self.nchars += len(text)
+      self._sink( text )
@@ -1,57 +1,64 @@
-import os
+import base64
 
-class Indent:
-  def __init__(self, level=0 ):
-    self.__clear__()
+from xml.sax.saxutils import escape
 
-    self._level = level
-    self._sp  = "  "
-    self._buf = ""
+from .emitter import FLUSH_SIZE
+from .writer import Writer
+from ..document import ENTER, LEAVE
+from pyvodm.utils.bintable import BinTableReader, CHUNK_ROWS, is_unsigned, is_scaled
 
-    for ii in range(0, self._level):
-        self._buf = self._buf + self._sp
+class VOTWriter(Writer):
+  """
+  Writes a Document as VOTable, optionally with VO-DML annotation.
 
-  def __clear__(self):
-    self._level = 0
-    self._buf   = ""
-
-  def __str__(self):
-    return self._buf
-
-  def __repr__(self):
-    retstr  = "Not yet implemented.\n"
-    return retstr
-
-
-class VOTWriter:
+  Output is streamed: text is emitted as the Document is walked and passed
+  to the output in chunks of about 'flush_size' characters, so the whole
+  serialization is never held in memory.
 
-  def __init__(self, ofile, annotation=None ):
-    self.__clear__()
+  Parameters:
+    ofile       - output file name (opened on first write); None for a
+                  writer used only with write_to()
+    annotation  - annotation type, or its name (see set_annotation())
+    flush_size  - buffered characters before writing to the output
+    data_format - table data serialization (see set_data_format())
+    chunk_rows  - source table rows read at a time, for inline data
+    compact     - leave out indentation and newlines
+  """
 
-    if type(ofile) not in ( str, ):
-      raise TypeError("'ofile' argument must be string type, not {0}".format( ofile.__class__.__name__ ) )
-
-    # Open output file
-    try:
-        self._fp = open( ofile, "w" )
-    except Exception as ex:
-        if self._fp is not None:
-            self._fp.close()
-            self._fp = None
-        raise ex
-
-    self._annotation = annotation
+  def __init__(self, ofile, annotation=None, flush_size=FLUSH_SIZE, data_format="fits", chunk_rows=CHUNK_ROWS, compact=False ):
+    Writer.__init__( self, ofile, flush_size, compact )
 
     self.VODML = 1
 
+    if isinstance( annotation, str ):
+      self.set_annotation( annotation )
+    else:
+      self._annotation = annotation
+    self.chunk_rows = chunk_rows
+    self.set_data_format( data_format )
+
+    # element kind -> writer method, for the VOTable and annotation content
+    self._vot_elements = { "object":    self.write_vot_object,
+                           "datatype":  self.write_vot_datatype,
+                           "primitive": self.write_vot_param,
+                           "enum":      self.write_vot_param,
+                           "reference": self.write_vot_groupref,
+                           "field":     self.write_vot_fieldref,
+                         }
+    self._vodml_elements = { "object":    self.write_vodml_object_annotation,
+                             "datatype":  self.write_vodml_datatype_annotation,
+                             "primitive": self.write_vodml_constant_annotation,
+                             "enum":      self.write_vodml_constant_annotation,
+                             "reference": self.write_vodml_idref_annotation,
+                             "field":     self.write_vodml_column_annotation,
+                           }
 
-  def __del__(self):
-    if self._fp is not None:
-      self._fp.close()
 
   def __clear__(self):
-    self._fp = None
+    Writer.__clear__( self )
     self._annotation = None
+    self._data_format = "fits"
+    self.chunk_rows = CHUNK_ROWS
 
   def __str__(self):
     return self.__repr__()
@@ -60,10 +67,6 @@ class VOTWriter:
     retstr  = "Not yet implemented.\n"
     return retstr
 
-  global nl
-  nl = os.linesep
-
-
   def _convert_ivoa_datatype_to_vot( self, ivoatype ):
     """
     Utility method, converts primitive type-s to 
@@ -103,138 +106,324 @@ class VOTWriter:
         raise ValueError("Unrecognized annotation type, \"" + tag + "\"" )
 
 
-  def write( self, doc ):
+  def set_data_format( self, tag ):
     """
-      Write Document instance to file.
+      Select the table data serialization:
+        fits      - reference to the source FITS table (default)
+        tabledata - rows inline, as TABLEDATA
+        binary2   - rows inline, as base64 encoded BINARY2
+
+      Inline rows are read from the source table columns named by the
+      Document body FIELDs, a chunk of 'chunk_rows' rows at a time.
     """
-    if doc.__class__.__name__ not in ( "Document", ):
-      raise TypeError("'doc' argument must be Document type, not {0}".format( obj.__class__.__name__ ) )
+    if tag not in ( "fits", "tabledata", "binary2" ):
+        raise ValueError("Unrecognized data format, \"" + tag + "\"" )
+    self._data_format = tag
 
-    buf  = str(Indent( 1 ))
-    buf2 = str(Indent( 2 ))
 
-    lines = []
+  def _write_document( self, doc ):
+    buf  = self._indent( 1 )
+    buf2 = self._indent( 2 )
 
     # Preamble
-    lines.extend('<?xml version="1.0" encoding="UTF-8"?>'+nl )
+    self._out.emit('<?xml version="1.0" encoding="UTF-8"?>'+self._nl )
 
     if ( self._annotation is None ):
-      lines.extend('<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.3">'+nl )
+      self._out.emit('<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.3">'+self._nl )
     elif ( self._annotation == self.VODML ):
-      lines.extend('<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.4_vodml">'+nl )
+      self._out.emit('<VOTABLE xmlns="http://www.ivoa.net/xml/VOTable/v1.4_vodml">'+self._nl )
 
     # VODML annotation
     if ( self._annotation == self.VODML ):
-        lines.extend( self.write_vodml_annotation( doc, indent=1 ) )
+        self.write_vodml_annotation( doc, indent=1 )
 
     # VOTable RESOURCE 
-    lines.extend( buf + '<RESOURCE>' + nl )
+    self._out.emit( buf + '<RESOURCE>' + self._nl )
     if ( self._annotation is None ):
-      lines.extend( buf2 + '<TABLE>' + nl )
+      self._out.emit( buf2 + '<TABLE>' + self._nl )
     else:
-      lines.extend( buf2 + '<TABLE ID=\"_table1\">' + nl )
-      lines.extend( buf2 + '  <DESCRIPTION>With VO-DML annotation enabled, the TABLE content may retain its "native" structure or be reduced to just the PARAM and FIELD elements."</DESCRIPTION>' + nl )
+      self._out.emit( buf2 + '<TABLE ID=\"_table1\">' + self._nl )
+      self._out.emit( buf2 + '  <DESCRIPTION>With VO-DML annotation enabled, the TABLE content may retain its "native" structure or be reduced to just the PARAM and FIELD elements."</DESCRIPTION>' + self._nl )
 
     # Metadata
-    lines.extend( self.write_vot_metadata( doc, indent=3 ) )
+    self.write_vot_metadata( doc, indent=3 )
 
     # Data
-    lines.extend( self.write_vot_data( doc, indent=3 ) )
-
-    lines.extend( buf2 + '</TABLE>' + nl )
-    lines.extend( buf + '</RESOURCE>' + nl )
-    lines.extend( '</VOTABLE>'+nl )
+    self.write_vot_data( doc, indent=3 )
 
-    self._fp.writelines( lines )
+    self._out.emit( buf2 + '</TABLE>' + self._nl )
+    self._out.emit( buf + '</RESOURCE>' + self._nl )
+    self._out.emit( '</VOTABLE>'+self._nl )
 
   # ================================================================================
   # VOTable specific methods
   # ================================================================================
+  # GROUP content, in order
+  GROUP_CONTENT = ( "_attributes", "_compositions", "_references" )
+
   def write_vot_metadata( self, doc, indent=0 ):
-    buf = str(Indent( indent ))
+    for step in doc.walk( ( ENTER, LEAVE ), self._is_vot_leaf, self.GROUP_CONTENT ):
+      if step.event == ENTER:
+        self.write_vot_element( step.element, indent + step.depth )
+      elif not self._is_vot_leaf( step.element ) and self._has_group_content( step.element ):
+        # End with object GROUP closing tag
+        self._out.emit( self._indent( indent + step.depth ) + "</GROUP>" + self._nl )
 
-    lines = []
-    for role in doc._metadata:
-      for obj in doc._metadata[ role ]:
-        lines.extend( self.write_vot_element( obj, indent ) )
 
-    return lines
+  @staticmethod
+  def _is_vot_leaf( elem, depth=0, path=() ):
+    # element written whole (not as GROUP), its content is not walked
+    kind = elem.kind
+    return not ( kind == "object" or ( kind == "datatype" and elem.value == "" ) )
 
-  def write_vot_data( self, doc, indent=0 ):
-    buf  = str(Indent( indent ))
-    buf2 = str(Indent( indent+1 ))
-    buf3 = str(Indent( indent+2 ))
+  def _has_group_content( self, elem ):
+    return elem.description != "" or any( getattr( elem, attr, None ) for attr in self.GROUP_CONTENT )
 
-    lines = []
+
+  def write_vot_data( self, doc, indent=0 ):
+    buf  = self._indent( indent )
+    buf2 = self._indent( indent+1 )
+    buf3 = self._indent( indent+2 )
 
     if len( doc._body ) == 0:
-      return lines
+      return
+
+    # Open source table for inline data
+    table = None
+    columns = [ None ] * len( doc._body )
+    if self._data_format != "fits":
+      table = BinTableReader( doc._source, doc._source_ext )
+
+    try:
+      if table is not None:
+        columns = [ table.column( obj.value ) for obj in doc._body ]
+
+      # Add field elements
+      record  = "<!-- Data FIELDs -->"
+      self._out.emit(buf + record + self._nl)
+      for obj, column in zip( doc._body, columns ):
+        self.write_vot_field( obj, indent, column )
+
+      # Begin object record DATA
+      record = "<DATA>"
+      self._out.emit(buf + record + self._nl)
+
+      if self._data_format == "tabledata":
+        self.write_vot_tabledata( doc, table, indent+1 )
+
+      elif self._data_format == "binary2":
+        self.write_vot_binary2( doc, table, indent+1 )
+
+      else:
+        record = buf2 + "<FITS extnum=\""+str(doc._source_ext)+"\">"
+        self._out.emit( record + self._nl)
+
+        record = buf3 + "<STREAM href=\""+doc._source+"\"/>"
+        self._out.emit( record + self._nl)
+
+        record = buf2 + "</FITS>"
+        self._out.emit( record + self._nl)
 
-    # Add field elements
-    record  = "<!-- Data FIELDs -->"
-    lines.append(buf + record + nl)
+      # End with object DATA closing tag
+      self._out.emit( buf + "</DATA>"+self._nl )
+
+    finally:
+      if table is not None:
+        table.close()
+
+
+  # Binary (BINARY2) encoding of the VOTable FIELD datatypes, and the
+  # source table column types (FITS TFORM codes) each may be filled from.
+  _BINARY2_TYPES = { "integer": ( ">i4", "BIJK" ),
+                     "long":    ( ">i8", "BIJK" ),
+                     "double":  ( ">f8", "BIJKED" ),
+                     "boolean": ( "S1",  "L" ),
+                     "char":    ( "S",   "A" ) }
+
+  # Numeric FIELD datatypes, narrowest first
+  _NUMERIC_TYPES = ( "integer", "long", "double" )
+
+  @staticmethod
+  def _integer_column_type( column ):
+    """
+    Utility method, returns the narrowest VOTable datatype holding the
+    values of an integer source table column exactly; None for unsigned
+    64 bit columns, which no VOTable integer type holds.
+    """
+    if is_scaled( column ):
+      return "double"
+    if is_unsigned( column ):
+      return { 'I': "integer", 'J': "long" }.get( column.code )
+    if column.code == 'K':
+      return "long"
+    return "integer"
+
+  def _field_datatype( self, elem, column=None ):
+    """
+    Utility method, returns the VOTable datatype of the FIELD of a Document
+    body element.  With inline data, the datatype is checked against the
+    source table column, and an integer FIELD is promoted to the type
+    holding the column values: 'long' for K and unsigned J columns,
+    'double' for TSCAL/TZERO scaled columns.
+
+    Raises
+    --------
+      ValueError:  datatype can not be mapped, or does not hold the column.
+    """
+    datatype = self._convert_ivoa_datatype_to_vot( elem.vodml_type )
+    if datatype == "UNMATCHED":
+      raise ValueError("write_vot_field() - can not map data type '{0}' on element '{1}'\n".format(elem.vodml_type, elem.refid) )
+    if column is None:
+      return datatype
+
+    fits = datatype in self._BINARY2_TYPES and column.code in self._BINARY2_TYPES[datatype][1]
+    if fits and datatype in ( "integer", "long" ):
+      needed = self._integer_column_type( column )
+      if needed is None:
+        fits = False
+      elif self._NUMERIC_TYPES.index( needed ) > self._NUMERIC_TYPES.index( datatype ):
+        datatype = needed
+    if not fits:
+      raise ValueError("Column '{0}' of type '{1}' can not be written as {2} FIELD '{3}'".format( column.name, column.code, datatype, elem.value ) )
+    return datatype
+
+  def _data_types( self, doc, table ):
+    """
+    Utility method, returns the VOTable datatype and binary encoding of
+    each body FIELD, checking against its source table column.
+    """
+    result = []
     for obj in doc._body:
-      lines.extend( self.write_vot_field( obj, indent ) )
+      column = table.column( obj.value )
+      datatype = self._field_datatype( obj, column )
+      fmt = self._BINARY2_TYPES[datatype][0]
+      if datatype == "char":
+        fmt += str( column.repeat )
+      result.append( ( datatype, fmt ) )
+    return result
+
+
+  def write_vot_tabledata( self, doc, table, indent=0 ):
+    """
+      Writes the source table rows as TABLEDATA, a chunk at a time.
+      Null values (NaN, undefined logical, TNULL) are written as empty cells.
+    """
+    buf  = self._indent( indent )
+    buf2 = self._indent( indent+1 )
+
+    types = self._data_types( doc, table )
+    names = [ obj.value for obj in doc._body ]
 
-    # Begin object record DATA
-    record = "<DATA>"
-    lines.append(buf + record + nl)
+    self._out.emit( buf + "<TABLEDATA>" + self._nl )
+    for chunk in table.iter_chunks( names, self.chunk_rows ):
+      cells = [ self._tabledata_cells( datatype, values ) for ( datatype, fmt ), values in zip( types, chunk ) ]
+      for row in zip( *cells ):
+        self._out.emit( buf2 + "<TR><TD>" + "</TD><TD>".join( row ) + "</TD></TR>" + self._nl )
+    self._out.emit( buf + "</TABLEDATA>" + self._nl )
 
-    record = buf2 + "<FITS extnum=\""+str(doc._source_ext)+"\">"
-    lines.append( record + nl)
 
-    record = buf3 + "<STREAM href=\""+doc._source+"\"/>"
-    lines.append( record + nl)
+  @staticmethod
+  def _tabledata_cells( datatype, values ):
+    """
+    Utility method, converts a chunk of column values to TABLEDATA cell strings.
+    """
+    if datatype == "char":
+      return [ escape( value.decode("ascii", "replace").rstrip(" \0") ) for value in values.tolist() ]
+    if datatype == "boolean":
+      flags = { b"T": "T", b"F": "F" }
+      return [ flags.get( value, "" ) for value in values.tolist() ]
+    # masked (TNULL) cells are listed as None
+    if datatype == "double":
+      if values.dtype.kind == 'f' and values.dtype.itemsize == 4:
+        # shortest single precision representation
+        return [ "" if value != value else str(value) for value in values ]
+      return [ "" if value is None or value != value else repr(value) for value in values.astype("f8").tolist() ]
+    return [ "" if value is None else str(value) for value in values.tolist() ]
+
+
+  def write_vot_binary2( self, doc, table, indent=0 ):
+    """
+      Writes the source table rows as base64 encoded BINARY2, a chunk at a time.
+      Null values (NaN, undefined logical, TNULL) are flagged in the row null mask.
+    """
+    import numpy as np
+
+    buf  = self._indent( indent )
+    buf2 = self._indent( indent+1 )
 
-    record = buf2 + "</FITS>"
-    lines.append( record + nl)
+    types = self._data_types( doc, table )
+    names = [ obj.value for obj in doc._body ]
 
-    # End with object DATA closing tag
-    lines.append( buf + "</DATA>"+nl )
+    # Row layout: null flags, one bit per FIELD, then the values
+    nflags = ( len(types) + 7 ) // 8
+    rowtype = np.dtype( [ ( "_nulls", "u1", ( nflags, ) ) ] + [ ( "f%d" % ii, fmt ) for ii, ( datatype, fmt ) in enumerate( types ) ] )
+
+    self._out.emit( buf + "<BINARY2>" + self._nl )
+    self._out.emit( buf2 + "<STREAM encoding=\"base64\">" + self._nl )
+
+    # base64 output lines encode 57 bytes; carry the rest to the next chunk
+    encode = base64.b64encode if self.compact else base64.encodebytes
+    carry = b""
+    for chunk in table.iter_chunks( names, self.chunk_rows ):
+      rows = np.zeros( len( chunk[0] ), dtype=rowtype )
+      for ii, ( ( datatype, fmt ), values ) in enumerate( zip( types, chunk ) ):
+        nulls = np.ma.getmaskarray( values )
+        values = np.ma.getdata( values )
+        rows["f%d" % ii] = values
+        if datatype == "double" and values.dtype.kind == 'f':
+          nulls = nulls | np.isnan( values )
+        elif datatype == "boolean":
+          nulls = ( values != b"T" ) & ( values != b"F" )
+        rows["_nulls"][:, ii // 8] |= nulls.astype("u1") << ( 7 - ii % 8 )
+
+      data = carry + rows.tobytes()
+      size = len(data) - len(data) % 57
+      carry = data[size:]
+      if size > 0:
+        self._out.emit( encode( data[:size] ).decode("ascii") )
+
+    if carry:
+      self._out.emit( encode( carry ).decode("ascii") )
+
+    self._out.emit( buf2 + "</STREAM>" + self._nl )
+    self._out.emit( buf + "</BINARY2>" + self._nl )
 
-    return lines
 
   def write_vot_element( self, elem, indent=0 ):
     """
       Writes VOTable element lines.
       If VO-DML annotation is on, confine to JUST PARAM and FIELD elements.
     """
-    lines = []
-
-    if elem.__class__.__name__ in ( "ObjectType", ):
-      lines = self.write_vot_group( elem, elem.isReferenced(), indent )
+    method = self._vot_elements.get( elem.kind )
+    if method is None:
+      raise ValueError("write_vot_element() - unrecognized element type, '{0}'\n".format( elem.__class__.__name__ ) )
 
-    elif elem.__class__.__name__ in ( "DataType", ):
-      if elem.value == "":
-        lines = self.write_vot_group( elem, False, indent ) # Complex DataType
-      else:
-        lines = self.write_vot_param( elem, indent )        # Value-d DataType (Quantity)
+    method( elem, indent )
 
-    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType"):
-      lines = self.write_vot_param( elem, indent )
 
-    elif elem.__class__.__name__ in ( "ReferenceType", ):
-      lines = self.write_vot_groupref( elem, indent )
+  def write_vot_object( self, elem, indent=0 ):
+    self.write_vot_group( elem, elem.isReferenced(), indent )
 
-    elif elem.__class__.__name__ in ( "FieldType", ):
-      lines = self.write_vot_fieldref( elem, indent )
 
+  def write_vot_datatype( self, elem, indent=0 ):
+    if elem.value == "":
+      self.write_vot_group( elem, False, indent ) # Complex DataType
     else:
-      raise ValueError("write_vot_element() - unrecognized element type, '{0}'\n".format( elem.__class__.__name__ ) )
-
-    return lines
+      self.write_vot_param( elem, indent )        # Value-d DataType (Quantity)
 
 
-  def write_vot_field( self, elem, indent=0 ):
-    buf = str(Indent( indent ))
-    buf2 = str(Indent( indent + 1 ))
 
-    lines = []
+  def write_vot_field( self, elem, indent=0, column=None ):
+    """
+      Writes FIELD for a Document body element; with inline data, the
+      datatype is that holding the source table column values, and the
+      char arraysize is that of the column.
+    """
+    buf = self._indent( indent )
+    buf2 = self._indent( indent + 1 )
 
     #Resolve datatype to VOTable types
-    datatype = self._convert_ivoa_datatype_to_vot( elem.vodml_type )
-    if datatype == "UNMATCHED":
-      raise ValueError("write_vot_field() - can not map data type '{0}' on element '{1}'\n".format(elem.vodml_type, elem.refid) )
+    datatype = self._field_datatype( elem, column )
 
     # Begin datatype record FIELD
     record = "<FIELD"
@@ -248,7 +437,10 @@ class VOTWriter:
     # Add dtype
     if datatype == "char":
       record += " datatype=\"char\""
-      record += " arraysize=\"" + str(len(str(elem.value))) + "\""
+      if column is not None:
+        record += " arraysize=\"" + str(column.repeat) + "\""
+      else:
+        record += " arraysize=\"" + str(len(str(elem.value))) + "\""
     elif datatype == "integer":
       record += " datatype=\"int\""
     elif datatype == "long":
@@ -270,26 +462,24 @@ class VOTWriter:
     if elem.description == "":
       # No content.. 
       record += "/>"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     else:
       # Has content.. close
       record += ">"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
 
       # Add Description
       if elem.description != "":
-        line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + nl
-        lines.append( line )
+        line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + self._nl
+        self._out.emit( line )
 
       # End with closing tag
-      lines.append( buf + "</FIELD>"+nl )
+      self._out.emit( buf + "</FIELD>"+self._nl )
 
-    return lines
 
   def write_vot_fieldref( self, elem, indent=0 ):
-    buf = str(Indent( indent ))
+    buf = self._indent( indent )
 
-    lines = []
     record = "<FIELDref"
 
     # The field name is stored as the element value.. make ID for the reference to it.
@@ -297,17 +487,16 @@ class VOTWriter:
 
     record += "/>"
 
-    lines.append(buf + record + nl)
+    self._out.emit(buf + record + self._nl)
 
-    return lines
 
   def write_vot_group( self, elem, referenced, indent=0 ):
     """
+      Writes GROUP start tag, and description, for ObjectType or complex
+      DataType; the content and closing tag follow from write_vot_metadata().
     """
-    buf = str(Indent( indent ))
-    buf2 = str(Indent( indent+1 ))
-
-    lines = []
+    buf = self._indent( indent )
+    buf2 = self._indent( indent+1 )
 
     record = "<GROUP"
       
@@ -318,56 +507,24 @@ class VOTWriter:
       record += " name=\"" + elem.name + "\""
       
     # Add content.. 
-    if elem.description == "" and len(elem._attributes) == 0 and len(elem._compositions) == 0 and len(elem._references) == 0 :
+    if not self._has_group_content( elem ):
       record += "/>"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     else:
       record += ">"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     
       # Add Description
       if elem.description != "":
-        line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + nl
-        lines.append( line )
-
-      # Add Sub-Elements
-      lines.extend( self.write_vot_group_content( elem, indent+1 ) )
-    
-      # End with object GROUP closing tag
-      lines.append( buf + "</GROUP>"+nl )
-
-    return lines
-
-  def write_vot_group_content( self, elem, indent=0 ):
-    buf = str(Indent( indent ))
-    lines = []
-
-    # Add attribute elements
-    for role in elem._attributes:
-      for item in elem._attributes[ role ]:
-        lines.extend( self.write_vot_element( item, indent ) )
-
-    # Add composed elements
-    if hasattr( elem, '_compositions') and len(elem._compositions) > 0:
-      for role in elem._compositions:
-        for item in elem._compositions[ role ]:
-          lines.extend( self.write_vot_element( item, indent ) )
-
-    # Add reference elements
-    for role in elem._references:
-      for item in elem._references[ role ]:
-        lines.extend( self.write_vot_element( item, indent ) )
-
-    return lines
+        line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + self._nl
+        self._out.emit( line )
 
 
   def write_vot_groupref( self, elem, indent=0 ):
     """
     """
-    buf = str(Indent( indent ))
-    buf2 = str(Indent( indent+1 ))
-
-    lines = []
+    buf = self._indent( indent )
+    buf2 = self._indent( indent+1 )
 
     record = "<GROUP"
       
@@ -380,28 +537,25 @@ class VOTWriter:
     # Add content.. 
     if elem.description == "" :
       record += "/>"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     else:
       record += ">"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     
       # Add Description
-      line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + nl
-      lines.append( line )
+      line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + self._nl
+      self._out.emit( line )
 
       # End with object GROUP closing tag
-      lines.append( buf + "</GROUP>"+nl )
+      self._out.emit( buf + "</GROUP>"+self._nl )
 
-    return lines
 
   def write_vot_param( self, elem, indent=0 ):
-    buf = str(Indent( indent ))
-    buf2 = str(Indent( indent+1 ))
-
-    lines = []
+    buf = self._indent( indent )
+    buf2 = self._indent( indent+1 )
 
     #Resolve datatype to VOTable types
-    if elem.__class__.__name__ in ("EnumType"):
+    if elem.kind == "enum":
       # Enumeration value is always written as string.
       datatype = self._convert_ivoa_datatype_to_vot( "ivoa:string" )
     else:
@@ -454,248 +608,240 @@ class VOTWriter:
     # Add content.. [DESCRIPTION, VALUES, LINK]
     if elem.description == "":
       record += "/>"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
     else:
       record += ">"
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
 
       # Add Description
-      line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + nl
-      lines.append( line )
+      line = buf2 + "<DESCRIPTION>" + elem.description + "</DESCRIPTION>" + self._nl
+      self._out.emit( line )
 
       # End with PARAM closing tag
-      lines.append( buf + "</PARAM>"+nl )
+      self._out.emit( buf + "</PARAM>"+self._nl )
 
-    return lines
 
   # ================================================================================
   # VODML Annotation
   # ================================================================================
   def write_vodml_annotation( self, doc, indent=0 ):
 
-    buf = str(Indent( indent ))
+    buf = self._indent( indent )
 
-    lines = []
-    lines.append(buf + "<VODML>" + nl)
+    self._out.emit(buf + "<VODML>" + self._nl)
 
     # Model declarations
-    lines.extend( self.write_vodml_model_annotation( doc, indent+1 ) )
+    self.write_vodml_model_annotation( doc, indent+1 )
     
     # Global objects (ie: metadata)
-    lines.extend( self.write_vodml_metadata_annotation( doc, indent+1 ) )
+    self.write_vodml_metadata_annotation( doc, indent+1 )
     
     # Template objects (ie: body)
     #  - the self._body pointer has JUST the FIELD elements, 
     #    for this, we need the full object spec for the containing object (eg NDPoint)
-    lines.extend( self.write_vodml_data_annotation( doc, indent+1 ) )
+    self.write_vodml_data_annotation( doc, indent+1 )
 
-    lines.append(buf + "</VODML>" + nl)
+    self._out.emit(buf + "</VODML>" + self._nl)
 
-    return lines
 
   def write_vodml_model_annotation( self, doc, indent=0 ):
-    buf  = str(Indent( indent ))
-    buf2 = str(Indent( indent+1 ))
+    buf  = self._indent( indent )
+    buf2 = self._indent( indent+1 )
 
-    lines = []
     for prefix in doc._models.keys():
-      lines.append( buf + "<MODEL>" + nl )
-      lines.append( buf2 + "<NAME>" + prefix + "</NAME>" + nl )
+      self._out.emit( buf + "<MODEL>" + self._nl )
+      self._out.emit( buf2 + "<NAME>" + prefix + "</NAME>" + self._nl )
       url = doc._models[ prefix ]
       if url == "":
-        lines.append( buf2 + "<URL>" + "model does not have URL specified" + "</URL>" + nl )
+        self._out.emit( buf2 + "<URL>" + "model does not have URL specified" + "</URL>" + self._nl )
       else:
-        lines.append( buf2 + "<URL>" + url + "</URL>" + nl )
-      lines.append( buf + "</MODEL>" + nl )
+        self._out.emit( buf2 + "<URL>" + url + "</URL>" + self._nl )
+      self._out.emit( buf + "</MODEL>" + self._nl )
 
-    return lines
 
   def write_vodml_metadata_annotation( self, doc, indent=0 ):
-    buf  = str(Indent( indent ))
+    buf  = self._indent( indent )
 
-    lines = []
     for role in doc._metadata:
       if role.lower() == "default":
-        lines.append( buf + "<GLOBALS>" + nl )
+        self._out.emit( buf + "<GLOBALS>" + self._nl )
       else:
-        lines.append( buf + "<GLOBALS ID=\"" + role + "\">" + nl )
+        self._out.emit( buf + "<GLOBALS ID=\"" + role + "\">" + self._nl )
 
       for obj in doc._metadata[ role ]:
-        lines.extend( self.write_vodml_element_annotation( obj, indent+1 ) )
+        self.write_vodml_element_annotation( obj, indent+1 )
 
-      lines.append( buf + "</GLOBALS>" + nl )
+      self._out.emit( buf + "</GLOBALS>" + self._nl )
 
-    return lines
 
   def write_vodml_data_annotation( self, doc, indent=0 ):
-    buf  = str(Indent( indent ))
-
-    lines = []
+    buf  = self._indent( indent )
 
     # Find Data objects
     data = doc.find_data_node()
 
     if data is not None:
-      lines.append( buf + "<TEMPLATES tableref=\"_table1\">" + nl )
+      self._out.emit( buf + "<TEMPLATES tableref=\"_table1\">" + self._nl )
 
       # Write annotation for data objects
       for obj in data:
-        lines.extend( self.write_vodml_element_annotation( obj, indent+2, dataflag=True ) )
+        self.write_vodml_element_annotation( obj, indent+2, dataflag=True )
 
-      lines.append( buf + "</TEMPLATES>" + nl )
+      self._out.emit( buf + "</TEMPLATES>" + self._nl )
 
-    return lines
 
   def write_vodml_element_annotation( self, elem, indent=0, dataflag=False ):
-    buf  = str(Indent( indent ))
-    buf2  = str(Indent( indent+1 ))
+    method = self._vodml_elements.get( elem.kind )
+    if method is None:
+      raise ValueError("write_vodml_element_annotation() - Unrecognized element type, " + elem.__class__.__name__ )
 
-    lines = []
+    method( elem, indent, dataflag )
 
-    if elem.__class__.__name__ in ( "ObjectType" ):
+  def write_vodml_object_annotation( self, elem, indent=0, dataflag=False ):
+    buf  = self._indent( indent )
 
-      if elem._datanode is True and dataflag is False:
-        # add '3' to VOTable ID (which is unique) to link to EXTINSTANCES 
-        #  record += " ID=\"" + elem.tag + "3\""
-        record = "<EXTINSTANCES>"+elem.refid+"3"+"</EXTINSTANCES>"
-        lines.append(buf + record + nl)
+    if elem._datanode is True and dataflag is False:
+      # add '3' to VOTable ID (which is unique) to link to EXTINSTANCES 
+      #  record += " ID=\"" + elem.tag + "3\""
+      record = "<EXTINSTANCES>"+elem.refid+"3"+"</EXTINSTANCES>"
+      self._out.emit(buf + record + self._nl)
 
-      else:
-        record = "<INSTANCE"
+    else:
+      record = "<INSTANCE"
 
-        if elem._datanode is True and dataflag is True:
-          # add '3' to VOTable ID (which is unique) to link to EXTINSTANCES 
-          record += " ID=\"" + elem.refid + "3\""
+      if elem._datanode is True and dataflag is True:
+        # add '3' to VOTable ID (which is unique) to link to EXTINSTANCES 
+        record += " ID=\"" + elem.refid + "3\""
 
-        elif elem.isReferenced():
-          # adding '2' to VOTable ID (which is unique) to generate
-          # separate, but still unique ID for the vo-dml annotated instance
-          record += " ID=\"" + elem.refid + "2\"" 
-      
-        if elem.vodml_type != "":
-          record += " dmtype=\"" + elem.vodml_type + "\""
-        
-        tlen = len(elem._attributes) + len(elem._compositions) + len(elem._references)
-        if tlen == 0:
-          record += "/>"
-          lines.append(buf + record + nl)
-        else:
-          record += ">"
-          lines.append(buf + record + nl)
-        
-          # Add content.. 
-          #  Add attribute elements
-          if len(elem._attributes) != 0:
-            lines.extend( self.write_vodml_attribute_annotation( elem, indent+1, dataflag ) )
-        
-          # Add composed elements
-          if len(elem._compositions) != 0:
-            lines.extend( self.write_vodml_composition_annotation( elem, indent+1, dataflag ) )
-          
-          # Add reference elements
-          if len(elem._references) != 0:
-            lines.extend( self.write_vodml_reference_annotation( elem, indent+1, dataflag ) )
-         
-          # End with object INSTANCE closing tag
-          lines.append( buf + "</INSTANCE>"+nl )
-
-    elif elem.__class__.__name__ in ( "DataType" ):
-
-      if elem.value != "":
-        # Valued DataType (ie: Quantity)
-        record =  "<CONSTANT ref=\"" + elem.refid + "\""
-        record += " dmtype=\"" + elem.vodml_type + "\""
-        record += "/>"
+      elif elem.isReferenced():
+        # adding '2' to VOTable ID (which is unique) to generate
+        # separate, but still unique ID for the vo-dml annotated instance
+        record += " ID=\"" + elem.refid + "2\"" 
 
-        lines.append(buf + record + nl)
+      if elem.vodml_type != "":
+        record += " dmtype=\"" + elem.vodml_type + "\""
 
+      tlen = len(elem._attributes) + len(elem._compositions) + len(elem._references)
+      if tlen == 0:
+        record += "/>"
+        self._out.emit(buf + record + self._nl)
       else:
-        # Complex DataType
-        record = "<INSTANCE"
-        
-        if elem.vodml_type != "":
-          record += " dmtype=\"" + elem.vodml_type + "\""
-        
         record += ">"
-        lines.append(buf + record + nl)
-      
+        self._out.emit(buf + record + self._nl)
+
         # Add content.. 
         #  Add attribute elements
-        lines.extend( self.write_vodml_attribute_annotation( elem, indent+1, dataflag ) )
-        
+        if len(elem._attributes) != 0:
+          self.write_vodml_attribute_annotation( elem, indent+1, dataflag )
+
+        # Add composed elements
+        if len(elem._compositions) != 0:
+          self.write_vodml_composition_annotation( elem, indent+1, dataflag )
+
         # Add reference elements
         if len(elem._references) != 0:
-          lines.extend( self.write_vodml_reference_annotation( elem, indent+1, dataflag ) )
+          self.write_vodml_reference_annotation( elem, indent+1, dataflag )
 
         # End with object INSTANCE closing tag
-        lines.append( buf + "</INSTANCE>"+nl )
+        self._out.emit( buf + "</INSTANCE>"+self._nl )
 
-    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType" ):
+
+  def write_vodml_datatype_annotation( self, elem, indent=0, dataflag=False ):
+    buf  = self._indent( indent )
+
+    if elem.value != "":
+      # Valued DataType (ie: Quantity)
       record =  "<CONSTANT ref=\"" + elem.refid + "\""
       record += " dmtype=\"" + elem.vodml_type + "\""
       record += "/>"
 
-      lines.append(buf + record + nl)
+      self._out.emit(buf + record + self._nl)
+
+    else:
+      # Complex DataType
+      record = "<INSTANCE"
 
-    elif elem.__class__.__name__ in ( "ReferenceType" ):
-      # reference to element
-      # adding '2' to VOTable ID (which is unique) to generate
-      # separate, but still unique ID for the annotated instance.
-      lines.append(buf + "<IDREF>" + elem.target + "2" + "</IDREF>" + nl)
+      if elem.vodml_type != "":
+        record += " dmtype=\"" + elem.vodml_type + "\""
 
-    elif elem.__class__.__name__ in ( "FieldType", ):
-      # Add COLUMN reference tag
-      record = "<COLUMN ref=\"" + "_col-" + elem.value + "\" dmtype=\"" + elem.vodml_type + "\"/>"
+      record += ">"
+      self._out.emit(buf + record + self._nl)
 
-      lines.append(buf + record + nl)
+      # Add content.. 
+      #  Add attribute elements
+      self.write_vodml_attribute_annotation( elem, indent+1, dataflag )
 
-    else:
-      raise ValueError("write_vodml_element_annotation() - Unrecognized element type, " + elem.__class__.__name__ )
+      # Add reference elements
+      if len(elem._references) != 0:
+        self.write_vodml_reference_annotation( elem, indent+1, dataflag )
+
+      # End with object INSTANCE closing tag
+      self._out.emit( buf + "</INSTANCE>"+self._nl )
+
+
+  def write_vodml_constant_annotation( self, elem, indent=0, dataflag=False ):
+    buf  = self._indent( indent )
+
+    record =  "<CONSTANT ref=\"" + elem.refid + "\""
+    record += " dmtype=\"" + elem.vodml_type + "\""
+    record += "/>"
+
+    self._out.emit(buf + record + self._nl)
+
+
+  def write_vodml_idref_annotation( self, elem, indent=0, dataflag=False ):
+    buf  = self._indent( indent )
+
+    # reference to element
+    # adding '2' to VOTable ID (which is unique) to generate
+    # separate, but still unique ID for the annotated instance.
+    self._out.emit(buf + "<IDREF>" + elem.target + "2" + "</IDREF>" + self._nl)
+
+
+  def write_vodml_column_annotation( self, elem, indent=0, dataflag=False ):
+    buf  = self._indent( indent )
+
+    # Add COLUMN reference tag
+    record = "<COLUMN ref=\"" + "_col-" + elem.value + "\" dmtype=\"" + elem.vodml_type + "\"/>"
 
-    return lines
+    self._out.emit(buf + record + self._nl)
 
 
   def write_vodml_attribute_annotation( self, elem, indent=0, dataflag=False ):
-    buf   = str(Indent( indent ))
-    lines = []
+    buf   = self._indent( indent )
 
     #  Add attribute elements
     for role in elem._attributes:
-      lines.append( buf + "<ATTRIBUTE dmrole=\"" + role + "\">" + nl )
+      self._out.emit( buf + "<ATTRIBUTE dmrole=\"" + role + "\">" + self._nl )
 
       for item in elem._attributes[ role ]:
-        lines.extend( self.write_vodml_element_annotation( item, indent+1, dataflag ) )
+        self.write_vodml_element_annotation( item, indent+1, dataflag )
         
-      lines.append( buf + "</ATTRIBUTE>"+nl )
+      self._out.emit( buf + "</ATTRIBUTE>"+self._nl )
 
-    return lines
 
   def write_vodml_composition_annotation( self, elem, indent=0, dataflag=False ):
-    buf   = str(Indent( indent ))
-    lines = []
+    buf   = self._indent( indent )
 
     #  Add composition elements
     for role in elem._compositions:
-      lines.append( buf + "<COMPOSITION dmrole=\"" + role + "\"> " + nl )
+      self._out.emit( buf + "<COMPOSITION dmrole=\"" + role + "\"> " + self._nl )
 
       for item in elem._compositions[ role ]:
-        lines.extend( self.write_vodml_element_annotation( item, indent+1, dataflag ) )
+        self.write_vodml_element_annotation( item, indent+1, dataflag )
 
-      lines.append( buf + "</COMPOSITION> " + nl )
+      self._out.emit( buf + "</COMPOSITION> " + self._nl )
 
-    return lines
 
   def write_vodml_reference_annotation( self, elem, indent=0, dataflag=False ):
-    buf   = str(Indent( indent ))
-    lines = []
+    buf   = self._indent( indent )
 
     # Add reference elements
     for role in elem._references:
-      lines.append(buf + "<REFERENCE dmrole=\"" + role + "\">" + nl)
+      self._out.emit(buf + "<REFERENCE dmrole=\"" + role + "\">" + self._nl)
 
       for item in elem._references[ role ]:
-        lines.extend( self.write_vodml_element_annotation( item, indent+1, dataflag ) )
+        self.write_vodml_element_annotation( item, indent+1, dataflag )
 
-      lines.append(buf + "</REFERENCE>" + nl)
+      self._out.emit(buf + "</REFERENCE>" + self._nl)
 
-    return lines
@@ -0,0 +1,118 @@
+import os
+
+from .emitter import Emitter, FLUSH_SIZE
+from ..indent import indentation
+from ..document import Document
+
+class Writer(object):
+  """
+  Base of the Document writers.
+
+  The output file is opened on the first write(), and stays open for
+  further writes until close(); use the writer as a context manager to
+  close it on exit:
+
+    with VOTWriter( "out.vot" ) as w:
+      w.write( doc )
+
+  Output is streamed: text is emitted as the Document is walked and passed
+  to the output in chunks of about 'flush_size' characters.  Subclasses
+  implement _write_document(), emitting text through self._out, with
+  self._indent() and self._nl for the layout.
+
+  Parameters:
+    ofile       - output file name; None for a writer used only with write_to()
+    flush_size  - buffered characters before writing to the output
+    compact     - leave out indentation and newlines
+  """
+
+  NEWLINE = os.linesep   # line end of pretty printed output
+
+  def __init__(self, ofile, flush_size=FLUSH_SIZE, compact=False ):
+    self.__clear__()
+
+    if ofile is not None and type(ofile) not in ( str, ):
+      raise TypeError("'ofile' argument must be string type, not {0}".format( ofile.__class__.__name__ ) )
+
+    self.ofile = ofile
+    self.flush_size = flush_size
+    self.set_compact( compact )
+
+  def __clear__(self):
+    self.ofile = None
+    self._fp = None
+    self._out = None
+    self.flush_size = FLUSH_SIZE
+    self.compact = False
+    self._nl = self.NEWLINE
+    self._indent = indentation
+
+  def set_compact( self, flag ):
+    """
+    Select compact output (no indentation, no newlines) or pretty printed.
+    """
+    self.compact = bool( flag )
+    if self.compact:
+      self._nl = ""
+      self._indent = lambda level: ""
+    else:
+      self._nl = self.NEWLINE
+      self._indent = indentation
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback ):
+    self.close()
+    return False
+
+  def close(self):
+    """
+    Close the output file, if open.
+    """
+    if self._fp is not None:
+      self._fp.close()
+      self._fp = None
+
+  def write( self, doc ):
+    """
+    Write Document instance to the output file.
+
+    Raises
+    --------
+      TypeError : for invalid argument types
+      IOError   : writer has no output file, or error opening it
+    """
+    if self.ofile is None:
+      raise IOError("No output file; use write_to() to write to a stream.")
+
+    if self._fp is None:
+      self._fp = open( self.ofile, "w" )
+
+    self.write_to( doc, self._fp )
+
+  def write_to( self, doc, stream ):
+    """
+    Write Document instance to a stream.
+
+    Parameters
+    ----------
+      doc    : Document
+      stream : text or binary file-like (eg: io.StringIO, io.BytesIO), or socket
+               binary outputs receive UTF-8 encoded bytes.
+    """
+    if not isinstance( doc, Document ):
+      raise TypeError("'doc' argument must be Document type, not {0}".format( doc.__class__.__name__ ) )
+
+    self._out = Emitter( stream, self.flush_size )
+    try:
+      self._write_document( doc )
+      self._out.flush()
+    finally:
+      self._out = None
+
+    if hasattr( stream, "flush" ):
+      stream.flush()
+
+  def _write_document( self, doc ):
+    raise NotImplementedError("{0} does not implement _write_document()".format( self.__class__.__name__ ) )
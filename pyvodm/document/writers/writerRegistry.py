@@ -0,0 +1,144 @@
+"""
+  Registry of the Document writers, by output format name.
+"""
+
+from ..document import Document
+
+_writers = {}   # format name -> ( Writer class, default options )
+
+def register_writer( name, cls, **options ):
+  """
+  Register a Writer class under a format name.
+
+  Parameters
+  ----------
+
+    name    : string
+              format name (eg: 'vot')
+
+    cls     : Writer class
+              constructed as cls( ofile, **options )
+
+    options : keyword arguments
+              default constructor options for the format
+              (eg: annotation="vodml")
+
+  Returns
+  --------
+    None
+  """
+  _writers[ name ] = ( cls, options )
+
+
+def writer_formats():
+  """
+  Return the registered format names, sorted.
+  """
+  return sorted( _writers.keys() )
+
+
+def get_writer( name, ofile=None, **options ):
+  """
+  Create a writer for the named format.
+
+  Parameters
+  ----------
+
+    name    : string
+              registered format name
+
+    ofile   : string
+              output file name (opened on first write); None for write_to() only
+
+    options : keyword arguments
+              constructor options, overriding the format defaults
+
+  Returns
+  --------
+    writer  : Writer
+
+  Raises
+  --------
+    ValueError : unregistered format
+  """
+  if name not in _writers:
+    raise ValueError("Unrecognized output format, \"{0}\"; expected one of {1}".format( name, writer_formats() ) )
+
+  cls, defaults = _writers[ name ]
+  kwargs = dict( defaults )
+  kwargs.update( options )
+  return cls( ofile, **kwargs )
+
+
+class MultiWriter(object):
+  """
+  Writes a Document in several formats with one call.
+
+  Each target is a (format, output) pair, where output is a file name,
+  opened on the first write, or an open stream.  The backends write in
+  turn from the same in-memory Document; the Document is checked once.
+  Files are closed by close(), or on leaving a 'with' block:
+
+    with MultiWriter( [ ("vot", "out.vot"), ("avot", "out_ann.vot"), ("xml", "out.xml") ] ) as w:
+      w.write( doc )
+
+  Parameters:
+    targets  - list of (format, output) pairs, or dictionary format -> output
+    options  - constructor options common to all the writers (eg: flush_size)
+
+  Raises
+  --------
+    ValueError : unregistered format
+  """
+  def __init__(self, targets, **options ):
+    self.__clear__()
+
+    if isinstance( targets, dict ):
+      targets = targets.items()
+
+    for name, output in targets:
+      if isinstance( output, str ):
+        writer = get_writer( name, output, **options )
+        stream = None
+      else:
+        writer = get_writer( name, None, **options )
+        stream = output
+      self._targets.append( ( name, writer, stream ) )
+
+  def __clear__(self):
+    self._targets = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback ):
+    self.close()
+    return False
+
+  def __len__(self):
+    return len( self._targets )
+
+  def close(self):
+    """
+    Close all writer output files.
+    """
+    for name, writer, stream in self._targets:
+      writer.close()
+
+  def write( self, doc ):
+    """
+    Write Document instance to every target.
+
+    Raises
+    --------
+      TypeError : for invalid argument types
+      IOError   : error opening an output file
+    """
+    if not isinstance( doc, Document ):
+      raise TypeError("'doc' argument must be Document type, not {0}".format( doc.__class__.__name__ ) )
+
+    for name, writer, stream in self._targets:
+      if stream is None:
+        writer.write( doc )
+      else:
+        writer.write_to( doc, stream )
@@ -1,29 +1,48 @@
+from .emitter import FLUSH_SIZE
+from .writer import Writer
+from ..document import ENTER, LEAVE
 
-class XMLWriter:
+def _escape( data ):
+  """
+  Escape text or attribute value (as written by xml.dom.minidom).
+  """
+  if not data:
+    return ""
+  return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
 
-  def __init__(self, ofile ):
-    self.__clear__()
 
-    if type(ofile) not in ( str, ):
-        raise TypeError("'ofile' argument must be string type, not {0}".format( ofile.__class__.__name__ ) )
+class XMLWriter(Writer):
+  """
+  Writes a Document as model instance XML.
 
-    # Open output file
-    try:
-        self._fp = open( ofile, "w" )
-    except Exception as ex:
-        if self._fp is not None:
-            self._fp.close()
-            self._fp = None
-        raise ex
+  Elements are written as the Document is walked, and passed to the output
+  in chunks of about 'flush_size' characters; no DOM is built.  The output
+  is that of the pretty printed DOM (xml.dom.minidom toprettyxml(), 2 space
+  indent).
 
+  Parameters:
+    ofile       - output file name (opened on first write); None for a
+                  writer used only with write_to()
+    flush_size  - buffered characters before writing to the output
+    compact     - leave out indentation and newlines
+  """
 
-  def __del__(self):
-    if self._fp is not None:
-      self._fp.close()
+  NEWLINE = "\n"
+
+  # Schema expects specific order of content.
+  CONTENT = ( "_references", "_compositions", "_attributes" )
+
+  def __init__(self, ofile, flush_size=FLUSH_SIZE, compact=False ):
+    Writer.__init__( self, ofile, flush_size, compact )
+
+    # element kind -> writer method
+    self._elements = { "object":    self._interpret_object,
+                       "datatype":  self._interpret_datatype,
+                       "primitive": self._interpret_simple_type,
+                       "enum":      self._interpret_simple_type,
+                       "reference": self._interpret_ref_type,
+                     }
 
-  def __clear__(self):
-    self._xmldoc = None
-    self._fp = None
 
   def __str__(self):
     return self.__repr__()
@@ -35,15 +54,14 @@ class XMLWriter:
 
   def _interpret_Document( self, doc ):
     """
-    Translate Document instance in to model object DOM
+    Write Document instance as model object XML
     """
-    import xml.dom.minidom as md
+    nl = self._nl
 
-    # Create output DOM
-    result = md.Document()
+    self._out.emit('<?xml version="1.0" encoding="UTF-8"?>' + nl )
 
     # Handle namespace..
-    #   - not using actual URL so that the namespace string 
+    #   - not using actual URL so that the namespace string
     #     is always the same (the actual string does not matter)
     #
     # Determine top level namespace ( kind-of a hack )
@@ -60,118 +78,100 @@ class XMLWriter:
         topns = "coords"
     elif "ivoa" in doc._models.keys():
         topns = "ivoa"
-    nsurl = "{0}/{1}".format( nsivoa, topns )
-
-    # Create root element
-    root = result.createElementNS( nsurl, topns+":EXAMPLE")
 
-    # Set contained namespaces
-    root.setAttributeNS("xmls", "xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance" )
-    #nsbase = "http://ivoa.net/xml"
+    # Root element, with contained namespaces
+    record = "<" + topns + ":EXAMPLE"
+    record += " xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\""
     for key in sorted ( doc._models.keys() ):
-        nstag = "xmlns:{0}".format( key )
         if key == "ivoa":
           nsurl = "{0}/{1}".format( nsivoa, key )
         else:
           nsurl = "{0}/{1}".format( nsbase, key )
-        root.setAttributeNS("xmls", nstag, nsurl )
+        record += " xmlns:" + key + "=\"" + _escape( nsurl ) + "\""
 
-        if ( key == topns ):
-            root.setAttribute( nstag, nsurl )
-
-    # Add root element to DOM
-    result.appendChild(root)
+    # Process metadata elements
+    first = True
+    for step in doc.walk( ( ENTER, LEAVE ), self._is_simple, self.CONTENT ):
+      if first:
+        self._out.emit( record + ">" + nl )
+        first = False
+
+      if step.event == ENTER:
+        self._interpret_element( step.element, step.depth+1 )
+      elif not self._is_simple( step.element ) and self._has_content( step.element ):
+        self._out.emit( self._indent( step.depth+1 ) + "</" + self._complex_tag( step.element ) + ">" + nl )
+
+    if first:
+      self._out.emit( record + "/>" + nl )
+    else:
+      self._out.emit( "</" + topns + ":EXAMPLE>" + nl )
 
-    # Store XML document, for easy access
-    self._xmldoc = result
+  @staticmethod
+  def _is_simple( elem, depth=0, path=() ):
+    # element written whole, its content is not walked
+    kind = elem.kind
+    return not ( kind == "object" or ( kind == "datatype" and elem.value == "" ) )
 
-    # Process metadata elements
-    for role in doc._metadata:
-      for obj in doc._metadata[ role ]:
-          item = self._interpret_element( obj )
-          root.appendChild( item )
+  def _has_content( self, elem ):
+    return any( getattr( elem, attr, None ) for attr in self.CONTENT )
 
-    return result
+  @staticmethod
+  def _complex_tag( elem ):
+    if ( elem.vodml_type == elem.vodml_role ):
+        return elem.vodml_type                 # Primary object
+    return elem.vodml_role.rsplit('.', 1)[1]   # Secondary object
 
-  def _interpret_element( self, elem ):
+  def _interpret_element( self, elem, level ):
     """
-    Translate Document ElementType instance in to model object DOM element
+    Write Document ElementType instance as model object XML element;
+    for a complex type, just the start tag.
     """
-    node = None
+    method = self._elements.get( elem.kind )
+    if method is None:
+      raise ValueError("XMLWriter - unrecognized element type, '{0}'".format( elem.__class__.__name__ ) )
 
-    if elem.__class__.__name__ in ( "ObjectType" ):
-      node = self._interpret_complex_type( elem, elem.isReferenced()  )
+    method( elem, level )
 
-    elif elem.__class__.__name__ in ( "DataType", ):
-      if elem.value == "":
-        node = self._interpret_complex_type( elem, False ) # Complex DataType
-      else:
-        node = self._interpret_simple_type( elem )        # Value-d DataType (Quantity)
-   
-    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType"):
-      node = self._interpret_simple_type( elem )
-   
-    elif elem.__class__.__name__ in ( "ReferenceType", ):
-      node = self._interpret_ref_type( elem )
+  def _interpret_object( self, elem, level ):
+    self._interpret_complex_type( elem, elem.isReferenced(), level )
 
-    return node
+  def _interpret_datatype( self, elem, level ):
+    if elem.value == "":
+      self._interpret_complex_type( elem, False, level ) # Complex DataType
+    else:
+      self._interpret_simple_type( elem, level )        # Value-d DataType (Quantity)
 
 
-  def _interpret_complex_type( self, elem, referenced ):
+  def _interpret_complex_type( self, elem, referenced, level ):
     """
-    Translate Document ObjectType or DataType, which has sub-content 
+    Write start tag of Document ObjectType or DataType, which has sub-content
     """
-    top = self._xmldoc
+    tag = self._complex_tag( elem )
+    record = self._indent( level ) + "<" + tag
 
-    #if ( '.' not in elem.vodml_role ):
-    if ( elem.vodml_type == elem.vodml_role ):
-        # Primary object
-        node = top.createElement( elem.vodml_type )
-    else:
+    if ( elem.vodml_type != elem.vodml_role ):
         # Secondary object
-        [vtype, vrole] = elem.vodml_role.rsplit('.', 1)
-
-        node = top.createElement( vrole )
-        node.setAttribute( 'xsi:type', elem.vodml_type  )
+        record += " xsi:type=\"" + _escape( elem.vodml_type ) + "\""
 
     if referenced:
-      node.setAttribute( 'ID', elem.refid )
+      record += " ID=\"" + _escape( elem.refid ) + "\""
 
     # Element name - nope
-    # node.setAttribute( 'name', elem.name )
-    
-    # Schema expects specific order of content.
-    
-    # Add reference elements
-    for role in elem._references:
-      for item in elem._references[ role ]:
-        child = self._interpret_element( item )
-        node.appendChild( child )
-    
-    # Add composed elements
-    if hasattr( elem, '_compositions') and len(elem._compositions) > 0:
-      for role in elem._compositions:
-        for item in elem._compositions[ role ]:
-          child = self._interpret_element( item )
-          node.appendChild( child )
-    
-    # Add attribute elements
-    for role in elem._attributes:
-      for item in elem._attributes[ role ]:
-        child = self._interpret_element( item )
-        node.appendChild( child )
-   
-    return node
-
-
-  def _interpret_simple_type( self, elem ):
+
+    if self._has_content( elem ):
+      self._out.emit( record + ">" + self._nl )
+    else:
+      self._out.emit( record + "/>" + self._nl )
+
+
+  def _interpret_simple_type( self, elem, level ):
     """
-    Translate Document Primitive, Enum types
+    Write Document Primitive, Enum types
     """
-    top = self._xmldoc
+    buf = self._indent( level )
+    nl = self._nl
 
     [vtype, vrole] = elem.vodml_role.rsplit('.', 1)
-    node = top.createElement( vrole )
 
     val = elem.value
     if elem.value == "+Inf":
@@ -180,73 +180,34 @@ class XMLWriter:
       val = "-INF"
 
     if "Quantity" in elem.vodml_type:
-        node.setAttribute( 'xsi:type', elem.vodml_type  )
+        buf2 = self._indent( level+1 )
+        record = buf + "<" + vrole + " xsi:type=\"" + _escape( elem.vodml_type ) + "\">" + nl
         if elem.unit is not None and elem.unit != "":
-            subnode = top.createElement( "unit" )
-            tnode = top.createTextNode( elem.unit )
-            subnode.appendChild( tnode )
-            node.appendChild( subnode )
-        subnode = top.createElement( "value" )
-        tnode = top.createTextNode( val )
-        subnode.appendChild( tnode )
-        node.appendChild( subnode )
+            record += buf2 + "<unit>" + _escape( "%s" % elem.unit ) + "</unit>" + nl
+        record += buf2 + "<value>" + _escape( "%s" % val ) + "</value>" + nl
+        record += buf + "</" + vrole + ">" + nl
     else:
         if "boolean" in elem.vodml_type:
           val = elem.value.lower()
 
-        if elem.__class__.__name__ in ("EnumType"):
+        if elem.kind == "enum":
           if "." in elem.value:
             [enumtype, enumval] = elem.value.rsplit('.', 1)
 
             val = enumval
 
-        tnode = top.createTextNode( val )
-        node.appendChild( tnode )
- 
-    return node
+        record = buf + "<" + vrole + ">" + _escape( "%s" % val ) + "</" + vrole + ">" + nl
 
+    self._out.emit( record )
 
-  def _interpret_ref_type( self, elem ):
-    """
-    Translate Document Reference types
-    """
-    top = self._xmldoc
-
-    [vtype, vrole] = elem.vodml_role.rsplit('.', 1)
 
-    node = top.createElement( vrole )
-    node.setAttribute( 'IDREF', elem.target  )
-
-    return node
-
-  def write( self, doc ):
+  def _interpret_ref_type( self, elem, level ):
     """
-    Write Document instance.
-    
-    Parameters
-    ----------
-    
-      doc     : Document
-                Document class containing an IVOA Model instance to be 
-                interpreted and written in XML format.
-    
-    Returns
-    --------
-      none
-
-
-    Raises
-    --------
-      TypeError : for invalid argument types
-        "'<arg>' argument must be <type> type"
-
-
+    Write Document Reference types
     """
-    if doc.__class__.__name__ not in ( "Document", ):
-      raise TypeError("'doc' argument must be Document type, not {0}".format( obj.__class__.__name__ ) )
-
-    xml = self._interpret_Document( doc )
+    [vtype, vrole] = elem.vodml_role.rsplit('.', 1)
 
-    xml_str = xml.toprettyxml(indent="  ", encoding="UTF-8" )
-    self._fp.write( xml_str.decode() )
+    self._out.emit( self._indent( level ) + "<" + vrole + " IDREF=\"" + _escape( elem.target ) + "\"/>" + self._nl )
 
+  def _write_document( self, doc ):
+    self._interpret_Document( doc )
@@ -1,8 +1,13 @@
 __all__ = [ 'Model',
             'ModelElement',
+            'ModelCache',
+            'ModelRegistry',
+            'default_registry',
             'builders',
            ]
 
 from .model import Model
 from .model import ModelElement
+from .modelCache import ModelCache
+from .modelRegistry import ModelRegistry, default_registry
 from . import builders
@@ -1,3 +1,6 @@
-__all__ = [ 'DocBuilder', ]
+__all__ = [ 'DocBuilder',
+            'BuildStats',
+          ]
 
 from .docBuilder import DocBuilder
+from .buildStats import BuildStats
@@ -0,0 +1,174 @@
+import time
+from collections import OrderedDict
+
+
+class BuildStats:
+  """
+  Timings and counters of an instrumented DocBuilder (see
+  DocBuilder.instrument()).
+
+  Attributes:
+    wall          - OrderedDict, phase -> wall clock time (seconds)
+    cpu           - OrderedDict, phase -> CPU time of the process (seconds)
+    calls         - OrderedDict, phase -> number of runs
+    elements      - OrderedDict, element kind -> number of Document elements created
+    map_find      - number of ModelMap.find() calls made by the builder
+    model_get     - number of Model.get() calls made by the builder
+    bytes_read    - bytes read from source files
+    cache_hits    - models loaded from the ModelCache
+    cache_misses  - ModelCache lookups which had to parse the model source
+    callback      - callable, or None; called as callback( operation, record )
+                    when a DocBuilder call completes (eg: 'process'), with a
+                    BuildStats holding the measurements of that call only.
+
+  Phases:
+    add_model        - DocBuilder.add_model()
+    add_instance_map - DocBuilder.add_instance_map(), whole
+    template         - loading the instance template (ModelMap)
+    required_models  - checking the models required by the template
+    referenced       - identifying the referenced template elements
+    compile          - compiling the template
+    process          - DocBuilder.process(), whole
+    fetch            - opening the source file
+    header           - reading the source file header
+    load             - creating the Document elements
+
+  Phase times are inclusive: a phase run from another (eg: 'compile'
+  from 'process') is also counted in the enclosing one.
+  """
+
+  def __init__(self, callback=None ):
+    self.__clear__()
+    self.callback = callback
+
+  def __clear__(self):
+    self.wall  = OrderedDict()
+    self.cpu   = OrderedDict()
+    self.calls = OrderedDict()
+    self.elements = OrderedDict()
+    self.map_find = 0
+    self.model_get = 0
+    self.bytes_read = 0
+    self.cache_hits = 0
+    self.cache_misses = 0
+    self.callback = None
+
+    self._record = None   # measurements of the DocBuilder call in progress
+    self._depth = 0       # nesting of the phases in progress
+
+  def __str__(self):
+    return self.__repr__()
+
+  def __repr__(self):
+    retstr  = "BuildStats:\n"
+    for phase in self.wall:
+      retstr += "   {0:20} calls={1:<6d} wall={2:.6f}s cpu={3:.6f}s\n".format( phase, self.calls[phase], self.wall[phase], self.cpu[phase] )
+    for kind in self.elements:
+      retstr += "   {0:20} {1}\n".format( "elements."+kind, self.elements[kind] )
+    retstr += "   map_find={0} model_get={1} bytes_read={2} cache_hits={3} cache_misses={4}\n".format(
+                self.map_find, self.model_get, self.bytes_read, self.cache_hits, self.cache_misses )
+    return retstr
+
+  def reset( self ):
+    """
+    Clear the collected measurements, keeping the callback.
+    """
+    callback = self.callback
+    self.__clear__()
+    self.callback = callback
+
+  def as_dict( self ):
+    """
+    Return the measurements as nested dictionaries, for export.
+    """
+    result = OrderedDict()
+    result["phases"] = OrderedDict( ( phase, OrderedDict( [ ("calls", self.calls[phase]), ("wall", self.wall[phase]), ("cpu", self.cpu[phase]) ] ) )
+                                    for phase in self.wall )
+    result["elements"] = OrderedDict( self.elements )
+    for name in ( "map_find", "model_get", "bytes_read", "cache_hits", "cache_misses" ):
+      result[ name ] = getattr( self, name )
+    return result
+
+  @property
+  def record( self ):
+    """
+    Measurements of the DocBuilder call in progress (BuildStats), or None.
+    """
+    return self._record
+
+  def add_time( self, phase, wall, cpu ):
+    """
+    Add a run of the named phase.
+    """
+    self.calls[ phase ] = self.calls.get( phase, 0 ) + 1
+    self.wall[ phase ]  = self.wall.get( phase, 0.0 ) + wall
+    self.cpu[ phase ]   = self.cpu.get( phase, 0.0 ) + cpu
+
+  def add_elements( self, kind, count=1 ):
+    """
+    Add to the count of elements created of the given kind.
+    """
+    self.elements[ kind ] = self.elements.get( kind, 0 ) + count
+
+  def merge( self, other ):
+    """
+    Add the measurements of another BuildStats.
+    """
+    for phase in other.wall:
+      self.calls[ phase ] = self.calls.get( phase, 0 ) + other.calls[ phase ]
+      self.wall[ phase ]  = self.wall.get( phase, 0.0 ) + other.wall[ phase ]
+      self.cpu[ phase ]   = self.cpu.get( phase, 0.0 ) + other.cpu[ phase ]
+    for kind in other.elements:
+      self.add_elements( kind, other.elements[ kind ] )
+    self.map_find     += other.map_find
+    self.model_get    += other.model_get
+    self.bytes_read   += other.bytes_read
+    self.cache_hits   += other.cache_hits
+    self.cache_misses += other.cache_misses
+
+  def timed( self, phase, func, measure=None ):
+    """
+    Return func wrapped to time its runs as the named phase.
+
+    Parameters
+    ----------
+
+      phase    : string
+                 phase name
+
+      func     : callable
+                 function to time
+
+      measure  : callable, or None
+                 context manager factory, measure( record ), entered around
+                 each run to collect the phase counters into record
+
+    Returns
+    --------
+      callable
+    """
+    def run( *args, **kwargs ):
+      if self._depth == 0:
+        self._record = BuildStats()
+      record = self._record
+      self._depth += 1
+
+      wall = time.perf_counter()
+      cpu  = time.process_time()
+      try:
+        if measure is None:
+          return func( *args, **kwargs )
+        with measure( record ):
+          return func( *args, **kwargs )
+      finally:
+        record.add_time( phase, time.perf_counter() - wall, time.process_time() - cpu )
+        self._depth -= 1
+        if self._depth == 0:
+          self._record = None
+          self.merge( record )
+          if self.callback is not None:
+            self.callback( phase, record )
+
+    run.__name__ = getattr( func, "__name__", phase )
+    run.__doc__  = getattr( func, "__doc__", None )
+    return run
@@ -1,15 +1,141 @@
 import os
 import sys
 import subprocess
+from collections import namedtuple
+from contextlib import contextmanager
 
 if sys.version_info[0] < 3:
   from urllib2 import urlopen
+  from urllib import url2pathname
+  from urlparse import urlparse
 else:
-  from urllib.request import urlopen
+  from urllib.request import urlopen, url2pathname
+  from urllib.parse import urlparse
 
-from pyvodm.model import Model
+from collections import OrderedDict
+
+from pyvodm.model import default_registry
+from pyvodm.utils.header import CountingReader, open_fits, open_fits_stream
+from pyvodm.utils.params import stk_build
 from pyvodm.modelMap import ModelMap
 from pyvodm.document import Document, ObjectType, DataType, EnumType, PrimitiveType, ReferenceType, FieldType
+from pyvodm.document import shared_table
+from .buildStats import BuildStats
+
+
+# Compiled instance template.
+#   PlanNode  - everything needed to instantiate one Document element, resolved
+#               once from the template and models.
+#     kind        - object, datatype, quantity, field, enum, primitive, reference
+#     value       - resolved value; the header keyword name when 'key' is True
+#     children    - tuple of child PlanNode-s
+#     literals    - shared table of the enumeration literals, vodmlid -> label
+#   BuildPlan - the structural steps of the template, in order
+#     steps       - tuple of (action, key, PlanNode); action is one of
+#                     metadata  - add instance to metadata block 'key'
+#                     datanode  - flag element with role 'key' as datanode
+#                     instance  - build instance (for its FIELDs) only
+#     models      - tuple of (prefix, url) of the models used by the template
+PlanNode = namedtuple( "PlanNode", [ "kind", "refid", "name", "desc", "ucd", "unit",
+                                     "vodml_role", "vodml_type", "value", "key",
+                                     "referenced", "children", "literals" ] )
+
+BuildPlan = namedtuple( "BuildPlan", [ "steps", "models" ] )
+
+
+class _ModelTable(dict):
+  """
+  Hash of loaded models, keyed by prefix.
+
+  A prefix not yet loaded is looked up in the imports of the loaded models
+  and, if found, loaded through the registry on first access.
+  """
+  def __init__(self, registry ):
+    dict.__init__(self)
+    self.registry = registry
+
+  def __missing__(self, prefix ):
+    for model in list( self.values() ):
+      if prefix in model.imports:
+        model = self.registry.resolve( prefix, model.imports )
+        self[ prefix ] = model
+        return model
+    raise KeyError( prefix )
+
+
+class _CountingMap:
+  """
+  ModelMap counting find() calls into a BuildStats; used by an
+  instrumented DocBuilder, while the template is analysed.
+  """
+  def __init__(self, target, record ):
+    self._target = target
+    self._record = record
+
+  def __getattr__(self, name ):
+    return getattr( self._target, name )
+
+  def find( self, *args, **kwargs ):
+    self._record.map_find += 1
+    return self._target.find( *args, **kwargs )
+
+
+class _CountingModel:
+  """
+  Model counting get() calls into a BuildStats.
+  """
+  def __init__(self, target, record ):
+    self._target = target
+    self._record = record
+
+  def __getattr__(self, name ):
+    return getattr( self._target, name )
+
+  def get( self, *args, **kwargs ):
+    self._record.model_get += 1
+    return self._target.get( *args, **kwargs )
+
+
+class _CountingModels:
+  """
+  Models table handing out _CountingModel-s.
+  """
+  def __init__(self, target, record ):
+    self._target = target
+    self._record = record
+
+  def __getattr__(self, name ):
+    return getattr( self._target, name )
+
+  def __contains__(self, prefix ):
+    return prefix in self._target
+
+  def __getitem__(self, prefix ):
+    return _CountingModel( self._target[ prefix ], self._record )
+
+  def __setitem__(self, prefix, model ):
+    self._target[ prefix ] = model
+
+
+# Builder used by the process_many() worker processes.
+#   set once per worker by _init_worker(), with the parent's models and
+#   compiled template.
+_worker = None
+
+def _init_worker( builder ):
+  global _worker
+  _worker = builder
+
+def _process_one( infile, exten ):
+  """
+  Process a single file in a worker process.
+  Returns (infile, Document or exception, bytes read).
+  """
+  try:
+    doc = _worker.process( infile, exten )
+  except Exception as ex:
+    return ( infile, ex, 0 )
+  return ( infile, doc, _worker.stats["bytes_read"] )
 
 
 class DocBuilder:
@@ -18,23 +144,68 @@ class DocBuilder:
 
   Attributes:
     models    - Hash of VO-DML models   (Model)
+                  models imported by those loaded are added on first use
+    cache     - Parsed model cache      (ModelCache)
+    registry  - Loaded model registry   (ModelRegistry)
     map       - Instance Template       (ModelMap)
     fheader   - Source data file header (OrderedDict)
+    stats     - Processing statistics   (OrderedDict)
+                  files             - number of files processed
+                  bytes_read        - bytes read from the last file
+                  total_bytes_read  - bytes read from all files
+    instrumentation - Phase timings and counters (BuildStats)
+                  None unless turned on with instrument()
+
+  The template is compiled against the models into a BuildPlan once (see
+  compile()); processing a file then only substitutes the header values.
+  What is derived from the template alone (structural layout, referenced
+  elements) is kept until the template is replaced or compile() is run;
+  what also depends on the models (required models, BuildPlan) until a
+  model is added.
 
   """
 
-  def __init__(self):
+  def __init__(self, cache=None, registry=None):
     """
+    Parameters:
+      cache    - ModelCache
+                   optional cache of parsed model specifications,
+                   used by add_model()
+      registry - ModelRegistry
+                   models are loaded through, and shared with, this
+                   registry; default is the process wide registry, shared
+                   by all builders (add_model() loads a local model file
+                   again when it changed on disk)
     """
     self.__clear__()
 
+    self.cache = cache
+    self.registry = registry if registry is not None else default_registry()
+    self.models = _ModelTable( self.registry )
+
   def __clear__(self):
+    self.cache    = None
+    self.registry = None
     self.models   = {}
     self.template = None
     self.fheader = None
+    self.stats = OrderedDict( [ ("files", 0), ("bytes_read", 0), ("total_bytes_read", 0) ] )
+
+    self.instrumentation = None
+
+    self._document = None      # Document being built
+    self._referenced = set()   # IDs of objects referenced by others
+    self._layout = None        # Structural steps of the template
+    self._required = None      # Prefixes of the models the template requires
+    self._plan = None          # Compiled template (BuildPlan)
 
-    self._document = None   # Document being built
-    self._referenced = []   # IDs of objects referenced by others
+  def __getstate__(self):
+    # instrumentation is not sent to worker processes
+    state = self.__dict__.copy()
+    for method, phase in self._PHASES:
+      state.pop( method, None )
+    state["instrumentation"] = None
+    return state
 
 
   def __str__(self):
@@ -52,18 +223,23 @@ class DocBuilder:
     Scan the map, identifying elements which are referenced by other objects.
     This just provides a shortcut means of setting the 'referable' field.
     """
+    referenced = set()
 
     for element in self.template.iter():
       if element.value.startswith("ref:"):
-        refid = element.value.split(":").pop()
-        if refid not in self._referenced:
-          self._referenced.append( refid )
+        referenced.add( element.value.split(":").pop() )
+
+    self._referenced = referenced
 
 
   def _identify_required_models( self ):
     """
     Scan the map, identifying which models are represented.
+    The result is kept until the template or the models change.
     """
+    if self._required is not None:
+      return self._required
+
     required = []
 
     for element in self.template.iter():
@@ -87,13 +263,14 @@ class DocBuilder:
     #if len(required) > 0:
     #  print("Template requires the following Models, {0}\n".format( sorted(required) ) )
 
-    return required
+    self._required = tuple( required )
+    return self._required
 
 
   def _check_for_required_models( self ):
     """
     Scan the map, identifying which models are represented.
-    And check that they are loaded.
+    And check that they are loaded, loading imported models as needed.
     """
     missing  = {}
 
@@ -112,67 +289,119 @@ class DocBuilder:
 
   def _load_document( self ):
     """
-    Load Document content using Structure elements from map file.
-    Structural elements are those with Role = "vodml:*" and 
-    organizes the Instances into blocks.
-        Role
-        vodml:metadata   - Starts block of metadata instances
-        vodml:templates  - Starts block of data instances
-                            (may contain metadata, but at least some of the
-                             elements are expected to be FieldType)
-        vodml:instance   - Insert specified instance here.
-                             (value identifies instance by ID)
-        vodml:terminate  - End of Structural records
-                             convenience tag to stop ModelMap iteration
+    Load Document content by executing the compiled BuildPlan.
+    Only the values pulled from the file header ('key:') are resolved here,
+    everything else was resolved by compile().
     """
-    key = ""
-    level = ""
+    for action, key, node in self._plan.steps:
+      if action == "metadata":
+        self.document.add_metadata( self._build_element( node ), key )
+      elif action == "datanode":
+        self.document.set_datanode( key )
+      else:
+        # instance outside of a metadata block; built for its FIELDs only
+        self._build_element( node )
 
-    for element in self.template.iter():
-      if element.role.startswith("vodml:"):
-        if element.role == "vodml:metadata":
-          key = element.name
-          level = element.role
-          continue
-        elif element.role == "vodml:templates":
-          key = element.etype
-          level = element.role
-          self.document.set_datanode( element.etype )
-          continue
-        elif element.role == "vodml:instance":
-          # create specified instance
-          tag = element.value.split(":").pop()
-          obj = self._new_element( tag )
-        
-          # add instance to appropriate section of the Document
-          if level == "vodml:metadata":
-            self.document.add_metadata( obj, key )
-        
-#          elif level == "vodml:templates":
-#            self.document.add_body( obj )
-#            data = None
-#            for item in self.document._metadata.get("Default"):
-#              try:
-#                data = item.get_compositions( key )
-#              except Exception as ex:
-#                pass
-#            if data is not None:
-#              data.append(obj)
-        
-        elif element.role == "vodml:terminate":
-          break
-        else:
-          raise ValueError("Unrecognized structural role in template map, '{0}'".format(element.role) )
 
+  def _build_element( self, node ):
+    """
+    Instantiate the Document element described by the given PlanNode,
+    including its children.
+
+    Parameters:
+    ----------
+      node      - PlanNode
+                    Compiled element description.
 
-  def _new_element(self, tag ):
     """
-    Create instance of element associated with the given tag.
+    kind = node.kind
+
+    if kind == "object":
+      result = ObjectType( refid=node.refid, name=node.name, desc=node.desc )
+    elif kind == "datatype":
+      result = DataType( refid=node.refid, name=node.name, desc=node.desc, ucd=node.ucd )
+    elif kind == "quantity":
+      result = DataType( refid=node.refid,
+                         name=node.name,
+                         desc=node.desc,
+                         value=self._substitute_value( node ),
+                         unit=node.unit,
+                         ucd=node.ucd
+                       )
+    elif kind == "field":
+      result = FieldType( refid=node.refid,
+                          name=node.name,
+                          desc=node.desc,
+                          unit=node.unit,
+                          ucd=node.ucd,
+                          value=node.value,
+                        )
+    elif kind == "enum":
+      result = EnumType( refid=node.refid, name=node.name, desc=node.desc, value=self._substitute_value( node ) )
+      result.set_literals( node.literals )
+    elif kind == "primitive":
+      result = PrimitiveType( refid=node.refid, name=node.name, desc=node.desc, value=self._substitute_value( node ) )
+    elif kind == "reference":
+      result = ReferenceType( refid=node.refid, name=node.name, desc=node.desc, target=node.value )
+    else:
+      raise ValueError("Unrecognized plan node kind ("+kind+") for tag=\'"+node.refid+"\'")
+
+    #Assign vodml role and type
+    result.vodml_role = node.vodml_role
+    result.vodml_type = node.vodml_type
+
+    #Set flag if this element is referenced.
+    if node.referenced:
+      result.setReferenced( True )
+
+    #Add child elements
+    for child in node.children:
+      item = self._build_element( child )
+      if child.kind == "object":
+        result.add_composition( item )
+      elif child.kind == "reference":
+        result.add_reference( item )
+      elif child.kind == "field":
+        result.add_attribute( item )
+        self.document.add_body( item )
+      else:
+        result.add_attribute( item )
+
+    return result
+
+
+  def _substitute_value( self, node ):
+    """
+    Return the value for a PlanNode, pulling it from the file header
+    when the template specified a 'key:' source.
+    """
+    if not node.key:
+      return node.value
+
+    if self.fheader is None:
+      raise ValueError("No source file info loaded, can not resolve value for element '{0}'\n".format( node.refid ) )
+
+    try:
+      kval = self.fheader[ node.value ]
+    except KeyError as ex:
+      raise ValueError("Key '{0}' not found in source file, can not resolve value for element '{1}'\n".format(node.value, node.refid) )
+
+    # return key value as string
+    return str( kval )
+
+
+  def _compile_element(self, tag ):
+    """
+    Compile the template element associated with the given tag.
 
     Parameters:
     ----------
       tag       - string
-                    UID of element to create from template map.
+                    UID of element to compile from template map.
+
+    Returns:
+    ----------
+      PlanNode
 
     """
     if type(tag) not in ( str, ):
@@ -190,27 +419,27 @@ class DocBuilder:
     modelspec = self.models[prefix].get( element.role )
 
     if modelspec.etype in ["objectType"]:
-      result = self._new_objectType( tag )
+      result = self._compile_objectType( tag )
     elif modelspec.etype in ["dataType"]:
-      result = self._new_dataType( tag )
+      result = self._compile_dataType( tag )
     elif modelspec.etype in ["attribute"]:
-      result = self._new_valueType( tag )
+      result = self._compile_valueType( tag )
     elif modelspec.etype in ["collection", "composition"]:
-      result = self._new_composition( tag )
+      result = self._compile_composition( tag )
     elif modelspec.etype in ["reference"]:
-       result = self._new_reference( tag )
+       result = self._compile_reference( tag )
     else:
       raise ValueError("Unrecognized element type ("+modelspec.etype+") for tag=\'"+tag+"\'")
 
     #Set flag if this element is referenced.
     if tag in self._referenced:
-      result.setReferenced( True )
+      result = result._replace( referenced=True )
 
     return result
 
-  def _new_valueType(self, tag ):
+  def _compile_valueType(self, tag ):
     """
-    Create instance of appropriate subclass of ValueType.
+    Compile appropriate subclass of ValueType.
     """
     #Get ModelMap element record
     element = self.template.find( uid=tag )
@@ -227,22 +456,22 @@ class DocBuilder:
     except:
       raise ValueError("new_valueType() - Unexpected problem resolving type of '{0}.\n",format(datype) )
 
-    #Instantiate the specific ValueType 
+    #Compile the specific ValueType 
     if kind in ["dataType"]:
-      result = self._new_dataType( tag )
+      result = self._compile_dataType( tag )
     elif kind in ["enumeration"]:
-      result = self._new_enumType( tag )
+      result = self._compile_enumType( tag )
     elif kind in ["primitiveType"]:
-      result = self._new_primType( tag )
+      result = self._compile_primType( tag )
     else:
       raise ValueError("new_valueType() - Unrecognized ValueType flavor '{0}.\n",format(kind) )
 
     return result
 
 
-  def _new_enumType(self, tag ):
+  def _compile_enumType(self, tag ):
     """
-    Create new instance of EnumType.
+    Compile EnumType, including the Literals list from the Model.
     """
     #Get ModelMap element record
     element = self.template.find( uid=tag )
@@ -254,29 +483,26 @@ class DocBuilder:
     self._resolve_vodml_type( element )
 
     # resolve value
-    valstr = self._resolve_value( element )
-
-    #Create it.
-    result = EnumType( refid=tag, name=ename, desc=element.description, value=valstr )
-
-    #Assign vodml role and type
-    result.vodml_role  = element.role
-    result.vodml_type = element.etype
+    valstr, key = self._resolve_value( element )
 
-    #Add Literals list from Model.
+    #Literals list from Model.
+    literals = []
     prefix = element.role.split(":")[0]
     model = self.models[prefix]
-    #TODO: iterator through model records
-    for item in model._records.keys():
-      if item.startswith( element.etype+"." ):  # Child of Enumeration type.
-        result.add_literal( item, item.split(".").pop() )
+    try:
+      for item in model.literals( element.etype ):
+        literals.append( ( item, item.split(".").pop() ) )
+    except ValueError:
+      pass   # enumeration not in this model, no literals
 
-    return result
+    return PlanNode( kind="enum", refid=tag, name=ename, desc=element.description, ucd="", unit="",
+                     vodml_role=element.role, vodml_type=element.etype,
+                     value=valstr, key=key, referenced=False, children=(), literals=shared_table( literals ) )
 
 
-  def _new_primType(self, tag ):
+  def _compile_primType(self, tag ):
     """
-    Create new instance of Primitive Type.
+    Compile Primitive Type.
     """
     #Get ModelMap element record
     element = self.template.find( uid=tag )
@@ -288,21 +514,16 @@ class DocBuilder:
     self._resolve_vodml_type( element )
 
     # resolve value
-    valstr = self._resolve_value( element )
+    valstr, key = self._resolve_value( element )
 
-    #Create it.
-    result = PrimitiveType( refid=tag, name=ename, desc=element.description, value=valstr )
+    return PlanNode( kind="primitive", refid=tag, name=ename, desc=element.description, ucd="", unit="",
+                     vodml_role=element.role, vodml_type=element.etype,
+                     value=valstr, key=key, referenced=False, children=(), literals=() )
 
-    #Assign vodml role and type
-    result.vodml_role  = element.role
-    result.vodml_type = element.etype
 
-    return result
-
-
-  def _new_dataType(self, tag ):
+  def _compile_dataType(self, tag ):
     """
-    Create new instance of DataType.
+    Compile DataType.
     """
     #Get ModelMap element record
     element = self.template.find( uid=tag )
@@ -316,58 +537,42 @@ class DocBuilder:
     # initialize value
     valstr = element.value
 
-    #Create it.
     # o Handle complex DataType-s
     if valstr.startswith("inline:"):
       # o Complex DataType populated by another instance record.
-      # create THAT instance...
-      tag = valstr[ valstr.find(":")+1: ]
-      result = self._new_element( tag )
+      # compile THAT instance...
+      itag = valstr[ valstr.find(":")+1: ]
+      result = self._compile_element( itag )
 
       # re-assign element role to this spec.
-      result.vodml_role = element.role
+      return result._replace( vodml_role=element.role )
 
+    children = ()
+    key = False
+    unit = ""
+    if valstr == "":
+      # o Non-valued DataType-s 
+      kind = "datatype"
+      children = self._compile_children( tag )
+
+    elif element.value.startswith("field:"):
+      kind = "field"
+      valstr, key = self._resolve_value( element )
+      unit = element.unit
     else:
-      if valstr == "":
-        # o Non-valued DataType-s 
-        obj = DataType( refid=tag,
-                        name=ename,
-                        desc=element.description,
-                        ucd=element.ucd
-                      )
-        result = self._add_children( obj )
-
-      elif element.value.startswith("field:"):
-        result = None
-        valstr = self._resolve_value( element )
-        result = FieldType( refid=tag,
-                            name=ename,
-                            desc=element.description,
-                            unit=element.unit,
-                            ucd=element.ucd,
-                            value=valstr,
-                            )
-      else:
-        # o Handle value-d DataType-s (ie: Quantities)
-        valstr = self._resolve_value( element )
-        result = DataType( refid=tag,
-                           name=ename,
-                           desc=element.description,
-                           value=valstr,
-                           unit=element.unit,
-                           ucd=element.ucd
-                         )
-
-      #Assign vodml role and type
-      result.vodml_role = element.role
-      result.vodml_type = element.etype
+      # o Handle value-d DataType-s (ie: Quantities)
+      kind = "quantity"
+      valstr, key = self._resolve_value( element )
+      unit = element.unit
 
-    return result
+    return PlanNode( kind=kind, refid=tag, name=ename, desc=element.description, ucd=element.ucd, unit=unit,
+                     vodml_role=element.role, vodml_type=element.etype,
+                     value=valstr, key=key, referenced=False, children=children, literals=() )
 
 
-  def _new_objectType(self, tag ):
+  def _compile_objectType(self, tag ):
     """
-    Create new instance of ObjectType.
+    Compile ObjectType.
 
     Parameters:
       tag          - string   
@@ -376,31 +581,18 @@ class DocBuilder:
     #Get ModelMap element record
     element = self.template.find( uid=tag )
 
-    # resolve name
-    ename = element.name
-
     # resolve vodml_type
     self._resolve_vodml_type( element )
 
-    # Create object
-    result = ObjectType(refid=tag,
-                        name=ename,
-                        desc=element.description
-                       )
-
-    #Assign vodml role and type 
-    result.vodml_role = element.role
-    result.vodml_type = element.etype
-
-    #Add child elements
-    result = self._add_children( result )
-
-    return result
+    return PlanNode( kind="object", refid=tag, name=element.name, desc=element.description, ucd="", unit="",
+                     vodml_role=element.role, vodml_type=element.etype,
+                     value="", key=False, referenced=False,
+                     children=self._compile_children( tag ), literals=() )
 
 
-  def _new_composition(self, tag ):
+  def _compile_composition(self, tag ):
     """
-    Create new instance of composition to ObjectType.
+    Compile composition to ObjectType.
     """
 
     #Get ModelMap element record
@@ -412,21 +604,15 @@ class DocBuilder:
     #Get ID of composed instance.
     itag = element.value.split(":").pop()
 
-    #Create object
-    result = self._new_objectType( itag )
+    #Compile object
+    result = self._compile_objectType( itag )
 
-    # re-assign element role to this spec.
-    result.vodml_role = element.role
+    # re-assign element role to this spec, flag if this element is referenced.
+    return result._replace( vodml_role=element.role, referenced=( itag in self._referenced ) )
 
-    #Set flag if this element is referenced.
-    if itag in self._referenced:
-      result.setReferenced( True )
-
-    return result
-
-  def _new_reference(self, tag ):
+  def _compile_reference(self, tag ):
     """
-    Create new instance of Reference to ObjectType.
+    Compile Reference to ObjectType.
     """
     #Get ModelMap element record
     element = self.template.find( uid=tag )
@@ -442,75 +628,50 @@ class DocBuilder:
       raise ValueError("Unrecognized value spec for reference element ("+tag+"), does not contain reference.")
     valstr = element.value.split(':').pop().strip()
 
-    # Create it.
-    result = ReferenceType( refid=tag, name=ename, desc=element.description, target=valstr )
+    return PlanNode( kind="reference", refid=tag, name=ename, desc=element.description, ucd="", unit="",
+                     vodml_role=element.role, vodml_type=element.etype,
+                     value=valstr, key=False, referenced=False, children=(), literals=() )
 
-    #Add vodml role and type info
-    result.vodml_role = element.role
-    result.vodml_type = element.etype
 
-    return result
-
-
-  def _add_children(self, obj ):
+  def _compile_children(self, tag ):
     """
-    Add children elements to the provided object 
+    Compile children elements of the given template element.
     """
-    result = obj
-
-    tag = obj.refid
+    result = []
 
     # Find children of provided Object in ModelMap
     children = self.template.find_children( tag )
     for key in children.keys():
-      child = children[key]
+      result.append( self._compile_element( key ) )
 
-      item = self._new_element( key )
-      ctype = item.__class__.__name__
-      if ctype in [ "ObjectType" ]:
-        result.add_composition( item )
-      elif ctype in [ "ReferenceType" ]:
-        result.add_reference( item )
-      elif ctype in [ "DataType", "EnumType", "PrimitiveType" ]:
-        result.add_attribute( item )
-      elif ctype in [ "FieldType" ]:
-        result.add_attribute( item )
-        self.document.add_body( item )
-      else:
-        raise ValueError("Unrecognized child object type. {0}".format( item.__class__.__name__ ) )
+    return tuple( result )
 
-    return result
 
   def _resolve_value(self, element ):
     """
-    Evaluate ModelMap element value field and resolve it
+    Evaluate ModelMap element value field and resolve it, as far as can
+    be done without a source file.
 
     Parameters
       element   - ModelMap record
 
     Returns
       result    - resolved value as a string
+                  (keyword name for header keyword sourced values)
+      key       - True if value is to be pulled from the file header
     
     """
     result = ""
+    key = False
 
     if element.value.startswith("lit:"):
       # Element value is provided directly
       result = element.value[element.value.find(":")+1:]
 
     elif element.value.startswith("key:"):
-      # pull keyword value from file header info
-      if self.fheader is None:
-        raise ValueError("No source file info loaded, can not resolve value for element '{0}'\n".format( element.uid ) )
-      else:
-        kname = element.value[element.value.find(":")+1:].strip()
-        try:
-          kval = self.fheader[ kname ]
-        except KeyError as ex:
-          raise ValueError("Key '{0}' not found in source file, can not resolve value for element '{1}'\n".format(kname, element.uid) )
-
-      # return key value as string
-      result = str( kval )
+      # keyword value is pulled from file header info when the file is processed
+      result = element.value[element.value.find(":")+1:].strip()
+      key = True
 
     elif element.value.startswith("field:"):
       result = element.value[element.value.find(":")+1:].strip()
@@ -641,19 +802,26 @@ class DocBuilder:
 #    else:
 #      valstr = element.value
 
-    return result
+    return result, key
 
 
   def _resolve_vodml_type(self, element ):
     """
     Evaluate ModelMap element, if vodml_type is not specified
     extract and assign the default from Model specs.
+    A specified vodml_type which extends other types must extend the
+    type given by the Model specs.
 
     Parameters
       element   - ModelMap record
+
+    Raises
+      ValueError - specified vodml_type does not extend the Model spec type
     
     """
-    if element.etype == "":
+    if element.etype != "":
+      self._check_vodml_type( element )
+    else:
       # ModelMap does not specify, use default from Model
       # o Get corresponding Model record for this element
       prefix = element.role.split(":")[0]
@@ -667,6 +835,27 @@ class DocBuilder:
           
       element.etype = vodml_type
 
+  def _check_vodml_type(self, element ):
+    """
+    Check ModelMap element vodml_type against the type from Model specs.
+    Types of a Model which records no inheritance at all (eg: some ASCII
+    tables) are not checked.
+    """
+    try:
+      prefix = element.role.split(":")[0]
+      declared = self.models[prefix].get( element.role ).dtype
+      if element.etype == declared or ':' not in declared:
+        return
+      model = self.models[ element.etype.split(":")[0] ]
+      if not model.has_inheritance():
+        return
+      valid = model.is_subtype( element.etype, declared )
+    except (KeyError, ValueError, IOError):
+      return   # unresolved types are reported where they are used
+
+    if not valid:
+      raise ValueError("Template type '{0}' of '{1}' does not extend '{2}'".format( element.etype, element.name, declared ) )
+
 
   # --------------------------------------------------------------------------------
   # Public methods
@@ -674,6 +863,13 @@ class DocBuilder:
   def add_model( self, fname ):
     """
     Loads specified model specification and adds to stored set.
+    Models imported by it need not be added; they are loaded when the
+    template first uses them.
+
+    The model is shared through the builder registry: a model already
+    loaded is reused, unless its source is a local file changed since
+    (see ModelRegistry.load(), refresh).  Use ModelRegistry.invalidate()
+    to have a remote model fetched again.
   
     Parameters
     ----------
@@ -695,11 +891,17 @@ class DocBuilder:
                Error opening file.
     """
 
-    m = Model( fname )
-    m.url = fname
-    
+    m = self.registry.load( fname, cache=self.cache, refresh=True )
+
+    if self.models.get( m.prefix ) is m:
+      return   # already loaded, nothing derived from the models changes
+
     self.models[ m.prefix ] = m
 
+    # compiled template may depend on replaced model
+    self._required = None
+    self._plan = None
+
 
   def add_instance_map( self, fname ):
     """
@@ -726,8 +928,12 @@ class DocBuilder:
                Error opening file.
     """
 
-    # load the instance map 
-    self.template = ModelMap( fname )
+    # load the instance map, dropping what was derived from the previous one
+    self.template = self._load_template( fname )
+    self._referenced = set()
+    self._layout = None
+    self._required = None
+    self._plan = None
 
     # check that all required models are loaded
     self._check_for_required_models()
@@ -735,6 +941,105 @@ class DocBuilder:
     # identify elements which are referenced
     self._identify_referenced_elements()
 
+    # resolve template against the models
+    self._compile()
+
+
+  def _load_template( self, fname ):
+    return ModelMap( fname )
+
+
+  def _template_layout( self ):
+    """
+    Return the structural steps of the template, as (action, key, tag)
+    with the actions of the BuildPlan steps and the tag of the instance
+    to compile.  Kept until the template is replaced.
+    """
+    if self._layout is not None:
+      return self._layout
+
+    steps = []
+    key = ""
+    level = ""
+
+    for element in self.template.iter( role="vodml:" ):
+      if element.role == "vodml:metadata":
+        key = element.name
+        level = element.role
+      elif element.role == "vodml:templates":
+        key = element.etype
+        level = element.role
+        steps.append( ( "datanode", element.etype, None ) )
+      elif element.role == "vodml:instance":
+        tag = element.value.split(":").pop()
+
+        # add instance to appropriate section of the Document
+        if level == "vodml:metadata":
+          steps.append( ( "metadata", key, tag ) )
+        else:
+          steps.append( ( "instance", key, tag ) )
+
+      elif element.role == "vodml:terminate":
+        break
+      else:
+        raise ValueError("Unrecognized structural role in template map, '{0}'".format(element.role) )
+
+    self._layout = tuple( steps )
+    return self._layout
+
+
+  def compile( self ):
+    """
+    Compile the loaded instance template into a BuildPlan.
+
+    Resolves element types, element kinds, children, referenced flags and
+    enumeration literals once, so that process() only needs to substitute
+    the values pulled from each file header.  Run by add_instance_map(),
+    and again by process() after the loaded models change; run it after
+    editing the loaded template, as the template is scanned again.
+
+    Returns
+    --------
+
+      BuildPlan
+
+    Raises
+    --------
+
+      ValueError:  No template loaded, template requires Models not loaded,
+                   or problem resolving template element.
+    """
+    if self.template is None:
+      raise ValueError("No instance template loaded, can not compile.")
+
+    # drop what was derived from the template, it may have been edited
+    self._layout = None
+    self._required = None
+    self._check_for_required_models()
+    self._identify_referenced_elements()
+
+    return self._compile()
+
+
+  def _compile( self ):
+    # compile the template, from its cached layout and required models
+    steps = []
+    for action, key, tag in self._template_layout():
+      if action == "datanode":
+        steps.append( ( action, key, None ) )
+      else:
+        steps.append( ( action, key, self._compile_element( tag ) ) )
+
+    # Info on models used in the Document
+    # NOTE: we have already checked that all required models are loaded
+    #       (or loadable) so can be loose with accessing the models hash here.
+    models = []
+    for prefix in self._identify_required_models():
+      models.append( ( prefix, self.models[prefix].url ) )
+
+    self._plan = BuildPlan( steps=tuple(steps), models=tuple(models) )
+
+    return self._plan
 
 
   def process( self, infile, exten=1 ):
@@ -764,27 +1069,23 @@ class DocBuilder:
 
     """
 
-    # Copy file to local temporary space
-    if infile.startswith("http:") or  infile.startswith("https:") or infile.startswith("file:"):
-      fname = infile
-    elif infile.startswith('.'):
-#      fname = "file://"+os.getcwd()+infile[1:]
-      fname = "file://"+os.path.abspath( infile )
-    else:
-      fname = "file://"+infile
-    
-    import tempfile
-    fh = urlopen( fname )
-    tfile = tempfile.NamedTemporaryFile( delete=False )
-    tfile.write( fh.read() )
-    tfile.close()
-    
+    fname, fh = self._open_source( infile )
+
     # Load file header
-    self.fheader = self._get_header( tfile.name, exten )
+    try:
+      reader = CountingReader( fh )
+      self.fheader = self._get_header( reader, exten )
+    finally:
+      fh.close()
+
+    self.stats["files"] += 1
+    self.stats["bytes_read"] = reader.nbytes
+    self.stats["total_bytes_read"] += reader.nbytes
+
+    # (Re)compile template if models changed since it was loaded
+    if self._plan is None:
+      self.compile()
 
-    # Delete temporary file
-    os.unlink(tfile.name)
-    
     # Create Document to hold content
     self.document = Document()
     self.document._source = fname
@@ -794,11 +1095,8 @@ class DocBuilder:
     self._load_document()
 
     # Attach info on models used in the Document
-    # NOTE: we have already checked that all required models are loaded
-    #       so can be loose with accessing the models hash here.
-    used = self._identify_required_models()
-    for prefix in used:
-      self.document.add_model_pointer( prefix, self.models[prefix].url )
+    for prefix, url in self._plan.models:
+      self.document.add_model_pointer( prefix, url )
     
     # return resulting document
     result = self.document
@@ -806,17 +1104,256 @@ class DocBuilder:
     return result
 
 
+  def process_many( self, stack, workers=None, exten=1, ordered=True ):
+    """
+    Process a set of files, yielding a Document for each.
+
+    The loaded models and the compiled template are shared with a pool of
+    worker processes; each worker receives them once at startup.
+    A problem with one file does not stop the batch, the exception raised
+    while processing it is yielded in place of its Document.
+
+    Arguments
+    ---------
+
+      stack    : string or list
+                 stack of input files; a string is expanded with stk_build()
+                 (ie: '@list' file or comma separated list)
+      workers  : integer
+                 number of worker processes; None or 1 processes the files
+                 in this process.
+      exten    : integer
+                 HDU of files to process (0 based)
+      ordered  : boolean
+                 True  = yield results in stack order
+                 False = yield results as they complete
+
+    Yields
+    --------
+
+      (infile, result) :  result is the Document, or the exception raised
+                          processing the file.
+
+    """
+    if isinstance( stack, str ):
+      stack = stk_build( stack )
+
+    # Compile once here rather than in every worker
+    if self._plan is None:
+      self.compile()
+
+    if workers is None or workers <= 1:
+      for infile in stack:
+        try:
+          result = self.process( infile, exten )
+        except Exception as ex:
+          result = ex
+        yield ( infile, result )
+      return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    # Limit the number of files in flight, stacks may be large.
+    window = workers * 4
+
+    def collect( future ):
+      infile, result, nbytes = future.result()
+      if not isinstance( result, Exception ):
+        self.stats["files"] += 1
+        self.stats["bytes_read"] = nbytes
+        self.stats["total_bytes_read"] += nbytes
+      return ( infile, result )
+
+    with ProcessPoolExecutor( max_workers=workers, initializer=_init_worker, initargs=(self,) ) as pool:
+      if ordered:
+        pending = deque()
+        for infile in stack:
+          pending.append( pool.submit( _process_one, infile, exten ) )
+          if len(pending) >= window:
+            yield collect( pending.popleft() )
+        while pending:
+          yield collect( pending.popleft() )
+      else:
+        pending = set()
+        for infile in stack:
+          pending.add( pool.submit( _process_one, infile, exten ) )
+          if len(pending) >= window:
+            done, pending = wait( pending, return_when=FIRST_COMPLETED )
+            for future in done:
+              yield collect( future )
+        while pending:
+          done, pending = wait( pending, return_when=FIRST_COMPLETED )
+          for future in done:
+            yield collect( future )
+
+
+  # Instrumented methods, and the phase each is timed as
+  _PHASES = ( ( "add_model",                     "add_model" ),
+              ( "add_instance_map",              "add_instance_map" ),
+              ( "_load_template",                "template" ),
+              ( "_check_for_required_models",    "required_models" ),
+              ( "_identify_referenced_elements", "referenced" ),
+              ( "_compile",                      "compile" ),
+              ( "process",                       "process" ),
+              ( "_open_source",                  "fetch" ),
+              ( "_get_header",                   "header" ),
+              ( "_load_document",                "load" ),
+            )
+
+  def instrument( self, stats=None, callback=None ):
+    """
+    Turn on the collection of phase timings and counters.
+
+    The builder methods of each phase are replaced, on this instance only,
+    by timing wrappers; until then, and after uninstrument(), the builder
+    runs without any instrumentation code.  Files processed by the worker
+    processes of process_many() are not instrumented.
+
+    Arguments
+    ---------
+
+      stats    : BuildStats
+                 collects the measurements; default is a new BuildStats
+      callback : callable
+                 called as callback( operation, record ) when a builder
+                 call completes, with the measurements of that call
+                 (BuildStats); eg: to export them to a metrics system
+
+    Returns
+    --------
+
+      BuildStats : the instrumentation, also available as self.instrumentation
+
+    """
+    self.uninstrument()
+
+    if stats is None:
+      stats = BuildStats( callback )
+    elif callback is not None:
+      stats.callback = callback
+
+    for method, phase in self._PHASES:
+      setattr( self, method, stats.timed( phase, getattr( self, method ), self._measure( phase ) ) )
+    self.instrumentation = stats
+
+    return stats
+
+
+  def uninstrument( self ):
+    """
+    Turn off the instrumentation, restoring the plain builder methods.
+
+    Returns
+    --------
+
+      BuildStats : the instrumentation turned off, or None
+    """
+    stats = self.instrumentation
+    if stats is not None:
+      for method, phase in self._PHASES:
+        self.__dict__.pop( method, None )
+      self.instrumentation = None
+    return stats
+
+
+  def _measure( self, phase ):
+    """
+    Return the counter collection of an instrumented phase, or None.
+    """
+    if phase in ( "required_models", "referenced", "compile" ):
+      return self._count_lookups
+    if phase == "add_model":
+      return self._count_cache
+    if phase == "load":
+      return self._count_elements
+    if phase == "process":
+      return self._count_bytes
+    return None
+
+  @contextmanager
+  def _count_lookups( self, record ):
+    # count template and model lookups through counting stand-ins
+    if isinstance( self.template, _CountingMap ):
+      yield
+      return
+
+    template, models = self.template, self.models
+    if template is not None:
+      self.template = _CountingMap( template, record )
+    self.models = _CountingModels( models, record )
+    try:
+      yield
+    finally:
+      self.template, self.models = template, models
+
+  @contextmanager
+  def _count_cache( self, record ):
+    cache = self.cache if self.cache is not None else self.registry.cache
+    if cache is None:
+      yield
+      return
+
+    hits, misses = cache.hits, cache.misses
+    try:
+      yield
+    finally:
+      record.cache_hits   += cache.hits - hits
+      record.cache_misses += cache.misses - misses
+
+  @contextmanager
+  def _count_elements( self, record ):
+    yield
+
+    # elements created, from the compiled template
+    nodes = [ node for action, key, node in self._plan.steps if node is not None ]
+    while nodes:
+      node = nodes.pop()
+      record.add_elements( "datatype" if node.kind == "quantity" else node.kind )
+      nodes.extend( node.children )
+
+  @contextmanager
+  def _count_bytes( self, record ):
+    yield
+    record.bytes_read += self.stats["bytes_read"]
+
+
+  def _open_source( self, infile ):
+    """
+    Open the source file; local files are read in place, remote files are
+    streamed, reading only up to the end of the requested header.  Gzip
+    compressed files are decompressed, local or remote.
+    Returns (source URL, binary stream).
+    """
+    if infile.startswith("http:") or  infile.startswith("https:"):
+      fname = infile
+      fh = open_fits_stream( urlopen( fname ) )
+    else:
+      if infile.startswith("file:"):
+        fname = infile
+        path = url2pathname( urlparse( infile ).path )
+      elif infile.startswith('.'):
+        fname = "file://"+os.path.abspath( infile )
+        path = infile
+      else:
+        fname = "file://"+infile
+        path = infile
+      fh = open_fits( path )
+
+    return fname, fh
+
+
   def _get_header( self, filename, exten=1 ):
     """
     Loads file metadata into local variable
-    """
-    from astropy.table import Table
+    Only the header of the requested HDU is read, data blocks are skipped.
 
-    # Open file/exten
-    t = Table.read( filename, hdu=exten )
+    'filename' may be a file name or an open binary stream.
+    """
+    from pyvodm.utils.header import read_header, header_meta
 
-    # Extract header metadata
-    result = t.meta
+    # Read header of file/exten, extract header metadata
+    result = header_meta( read_header( filename, exten ) )
 
     # Remove unnecessary records
     if result is not None:
@@ -1,4 +1,24 @@
-class ModelElement:
+import sys
+from collections import OrderedDict
+
+if sys.version_info[0] >= 3:
+  from sys import intern
+
+def _intern( value ):
+  """
+  Intern string values; anything else is kept as given.
+  """
+  if type(value) is str:
+    return intern( value )
+  return value
+
+from pyvodm.utils.table import TableReader, source_name
+
+from .modelRegistry import default_registry
+from .modelCache import source_stamp
+
+
+class ModelElement(object):
   """
   Class representing a single VO-DML model element.
 
@@ -15,7 +35,12 @@ class ModelElement:
     constraint    - any constraint associated with the element (free form)
     semantic      - semantic concept source document
 
+  Records are slotted, and the type vocabulary (etype, dtype, extends,
+  multiplicity, semantic) is interned, so each distinct value is stored once.
+
   """
+  __slots__ = ( "tag", "etype", "dtype", "extends", "multiplicity",
+                "description", "constraint", "semantic" )
 
   def __init__(self, tag="", etype="", dtype="", extends="", mult="", desc="", constraint="", semcon="" ):
     self.__clear__()
@@ -23,19 +48,19 @@ class ModelElement:
     if tag != "":
         self.tag = tag
     if etype != "":
-        self.etype = etype
+        self.etype = _intern( etype )
     if dtype != "":
-        self.dtype = dtype
+        self.dtype = _intern( dtype )
     if extends != "":
-        self.extends = ""
+        self.extends = _intern( extends )
     if mult != "":
-        self.multiplicity = mult
+        self.multiplicity = _intern( mult )
     if desc != "":
         self.description = desc
     if constraint != "":
         self.constraint = constraint
     if semcon != "":
-        self.semantic = semcon
+        self.semantic = _intern( semcon )
 
 
   def __clear__(self):
@@ -78,7 +103,7 @@ class Model:
        key = full vo-dml id of element (with model prefix)
 
   """
-  def __init__(self, fname):
+  def __init__(self, fname, cache=None, registry=None, stamp=None):
     """
     Instantiate a Model instance from source file.
     Supported formats:
@@ -86,19 +111,53 @@ class Model:
          - identified by file name suffix (.xml)
       o ASCII table
          - identified by file name suffix (.db)
+    The source may also be an open file, or bytes, holding either format;
+    content starting with '<' is read as VO-DML/XML.  (These are not cached.)
+
+    When a ModelCache is provided, the parsed specification is taken
+    from, or added to, that cache; 'stamp' is the version stamp of the
+    source, if the caller already has it (see source_stamp()).
+
+    Imported models are loaded on demand, through the given ModelRegistry
+    (default: the process wide registry), see get().
     """
     self.__clear__()
 
+    self.registry = registry
+
+    if not isinstance( fname, str ):
+      # open file or in-memory content; identify format from content
+      if not isinstance( fname, ( bytes, bytearray ) ):
+        fname = fname.read()
+      if not isinstance( fname, ( bytes, bytearray ) ):
+        fname = fname.encode("utf-8")
+      if fname.lstrip().startswith( b"<" ):
+        self.__readXML( fname )
+      else:
+        self.__readDB( fname )
+      return
+
     if ( fname.strip() == "" ):
       raise IOError( "'fname' argument empty; must provide Model description file. " )
 
     if ( fname.endswith("xml") ):
-      self.__readXML( fname )
+      reader = self.__readXML
     elif ( fname.endswith("db") ):
-      self.__readDB( fname )
+      reader = self.__readDB
     else:
       raise( ValueError("Unable to identify Model description file type.") )
 
+    if cache is not None:
+      if stamp is None:
+        stamp = source_stamp( fname )
+      if cache.load( fname, self, stamp ):
+        return
+
+    reader( fname )
+
+    if cache is not None:
+      cache.store( fname, self, stamp )
+
   def __clear__(self):
       self.name   = ""
       self.prefix   = ""
@@ -110,7 +169,14 @@ class Model:
       self.lastmod  = ""
       self.url      = ""
       self.imports  = {}
+      self.registry = None
       self._records = {}
+      self._children = None   # vodml-id -> child vodml-ids (None key: top level)
+      self._etypes = None     # element type -> vodml-ids
+      self._inheritance = False  # any element records 'extends'
+      self._supertypes = {}   # type vodml-id -> supertype vodml-ids, nearest first
+      self._supersets = {}    # type vodml-id -> frozenset of supertype vodml-ids
+      self._members = {}      # type vodml-id -> OrderedDict of member records
 
 
   def __str__(self):
@@ -165,8 +231,9 @@ class Model:
     Parameters
     ----------
   
-      fname: string
-                Filename of vo-dml model specification table.
+      fname: string, file-like or bytes
+                Filename of vo-dml model specification table,
+                or open file, or table content.
 
     Returns
     --------
@@ -180,16 +247,17 @@ class Model:
     IOError:
                Invalid fname input.
                Error opening file.
+    ValueError:
+               Malformed line; message starts with '<file>:<line>:'
 
     """
-    if ( fname.strip() == "" ):
+    if isinstance( fname, str ) and fname.strip() == "":
       raise IOError( "'fname' argument value invalid. '{0}'".format(fname) )
 
-    #Open file (read-only); will close() when we leave this block
-    with open( fname, 'r') as fp: 
-      content = fp.readlines()
+    #Open source (read-only); closed when iteration ends
+    table = TableReader( fname )
 
-    #Loop records
+    #Loop records, streaming
     #  - skip empty records and records starting with '#'
     #  - handle metadata records
     #  - handle data records
@@ -197,11 +265,8 @@ class Model:
     #    o strip leading/trailing whitespace 
     #    o instantiate ModelElement
     #    o add to records hash (key=<tag with prefix>)
-    for line in content:
-      line = line.strip()
-      if line == '' or line[0] == '#':
-        continue
-      elif line.startswith("Name="):
+    for lineno, line in table:
+      if line.startswith("Name="):
         self.name = line[line.find("=")+1:]
       elif line.startswith("Prefix="):
         self.prefix = line[line.find("=")+1:]
@@ -219,28 +284,48 @@ class Model:
         self.lastmod = line[line.find("=")+1:]
       elif line.startswith("URL=") or line.startswith("URI="):
         self.url = line[line.find("=")+1:]
+      elif line.startswith("Import="):
+        # Import='<prefix>:<url>'
+        item = line[line.find("=")+1:].strip("'")
+        if ":" not in item:
+          raise table.error( lineno, "Import must be '<prefix>:<url>', found '{0}'.".format(item) )
+        key, url = item.split(":", 1)
+        self.imports[ key ] = url
       else:
-        parts = line.split('&')
-        elem = ModelElement( tag=parts[0].strip(),
-                             etype=parts[1].strip(),
-                             dtype=parts[2].strip(),
-                             mult=parts[3].strip(),
-                             desc=parts[4].strip(),
+        parts = table.fields( lineno, line, 5 )
+        elem = ModelElement( tag=parts[0],
+                             etype=parts[1],
+                             dtype=parts[2],
+                             mult=parts[3],
+                             desc=parts[4],
                              )
         key = self.prefix+":"+elem.tag
         self._records[ key ] = elem
 
 
+  # Model level elements holding a ModelElement definition tree.
+  _XML_TYPES = ( "package", "primitiveType", "dataType", "objectType", "enumeration" )
+
+  # Element children which define the element itself; any other child
+  # element is a nested definition (attribute, composition, literal...).
+  _XML_FIELDS = ( "vodml-id", "name", "description", "extends", "datatype",
+                  "constraint", "semanticconcept", "multiplicity", "isOrdered" )
+
   def __readXML(self, fname ):
     """
     Load vo-dml/XML model specification.
 
+    The document is streamed (ElementTree.iterparse); each definition is
+    converted to a ModelElement as soon as its closing tag is read, and the
+    parsed subtree is released.  Records are stored in document order,
+    parents ahead of their children.
+
     Parameters
     ----------
   
-      fname: string
+      fname: string or bytes
                 Filename of vo-dml/XML model specification.
-                (May be URL)
+                (May be URL), or content.
 
     Returns
     --------
@@ -256,145 +341,189 @@ class Model:
                Error opening file.
 
     """
-    if ( fname.strip() == "" ):
+    if isinstance( fname, str ) and fname.strip() == "":
       raise IOError( "'fname' argument value invalid. '{0}'".format(fname) )
 
-    import xml.dom.minidom as xml
-    import os
+    import io
+    import xml.etree.ElementTree as ET
     import sys
     if sys.version_info[0] < 3:
       from urllib2 import urlopen
     else:
       from urllib.request import urlopen
 
+    name = source_name( fname )
+    fh = None
     try:
-      if fname.startswith("http:") or  fname.startswith("https:") or fname.startswith("file:"):
+      if not isinstance( fname, str ):
+        source = io.BytesIO( fname ) if isinstance( fname, ( bytes, bytearray ) ) else fname
+        events = ET.iterparse( source, events=("start", "end") )
+      elif fname.startswith("http:") or  fname.startswith("https:") or fname.startswith("file:"):
         fh = urlopen( fname )
-        dom = xml.parse( fh )
+        events = ET.iterparse( fh, events=("start", "end") )
       else:
-        dom = xml.parse( fname )
+        events = ET.iterparse( fname, events=("start", "end") )
     except Exception:
-      raise( IOError("Problem opening Model description file '"+fname+"'.") )
+      raise( IOError("Problem opening Model description file '"+name+"'.") )
 
     try:
-      top = dom.firstChild
-      for child in top.childNodes:
-        if child.nodeName == "name":
-          self.name = self.__getXMLText( child.childNodes )
-          self.prefix = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "description":
-          self.description = "'"+self.__getXMLText( child.childNodes ).replace( os.linesep, ' ')+"'"
-        elif child.nodeName == "title":
-          self.title = "'"+self.__getXMLText( child.childNodes )+"'"
-        elif child.nodeName == "author":
-          self.author = "'"+self.__getXMLText( child.childNodes )+"'"
-        elif child.nodeName == "version":
-          self.version = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "previousVersion":
-          self.prever = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "lastModified":
-          self.lastmod = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "uri":
-          self.url = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "import":
-          key = child.getElementsByTagName("name")[0].childNodes[0].data
-          url = child.getElementsByTagName("url")[0].childNodes[0].data
-          self.imports[ key ] = url
-        elif child.nodeName == "package":
-          self.__processXMLElement( child )
-        elif child.nodeName == "primitiveType":
-          self.__processXMLElement( child )
-        elif child.nodeName == "dataType":
-          self.__processXMLElement( child )
-        elif child.nodeName == "objectType":
-          self.__processXMLElement( child )
-        elif child.nodeName == "enumeration":
-          self.__processXMLElement( child )
-        else:
-          if child.nodeType != child.TEXT_NODE:
-            print("skipping node: "+child.nodeName )
+      self.__streamXML( events )
+    except ET.ParseError:
+      raise( IOError("Problem opening Model description file '"+name+"'.") )
     except Exception:
-      raise( IOError("Problem interpreting Model description file '"+fname+"'.") )
+      raise( IOError("Problem interpreting Model description file '"+name+"'.") )
+    finally:
+      if fh is not None:
+        fh.close()
+
+  def __streamXML(self, events ):
+    """
+    Consume iterparse (start, end) events, populating the model.
+
+    A stack holds one frame per open element: [ node, kind, fields, records ]
+      kind     - 'root', 'header' (model level item), 'type' (definition),
+                 'field' (definition item) or None (content of the above)
+      fields   - definition items collected so far ('type' only)
+      records  - (key, ModelElement) of the definition subtree, in order
+    """
+    stack = []
+    for event, node in events:
+      if event == "start":
+        if not stack:
+          kind = "root"
+        else:
+          pkind = stack[-1][1]
+          if pkind == "root":
+            kind = "type" if node.tag in self._XML_TYPES else "header"
+          elif pkind == "type":
+            kind = "field" if node.tag in self._XML_FIELDS else "type"
+          else:
+            kind = None
+        stack.append( [ node, kind, {}, [] ] )
+        continue
+
+      node, kind, fields, records = stack.pop()
+      if kind == "field":
+        self.__readXMLField( node, stack[-1][2] )
+      elif kind == "type":
+        elem = self.__makeXMLElement( node.tag, fields )
+        records.insert( 0, ( self.prefix+":"+elem.tag, elem ) )
+        if stack[-1][1] == "type":
+          stack[-1][3].extend( records )
+        else:
+          for key, elem in records:
+            self._records[ key ] = elem
+      elif kind == "header":
+        self.__readXMLHeader( node )
+      else:
+        continue
 
+      # done with this subtree
+      stack[-1][0].remove( node )
 
-  def __getXMLText(self, nodelist ):
+  def __getXMLText(self, node ):
     """
+    Text directly contained by the node (not by its children), stripped.
     """
-    rc = []
-    for node in nodelist:
-      if node.nodeType == node.TEXT_NODE:
-        rc.append(node.data)
+    rc = [ node.text or "" ]
+    for child in node:
+      rc.append( child.tail or "" )
     return ''.join(rc).strip()
 
-  def __processXMLElement(self, node ):
+  def __getXMLData(self, node, tag ):
+    """
+    Text of the first descendant with the given tag, unstripped.
+    """
+    item = node.find( ".//"+tag )
+    if item is None or item.text is None:
+      raise ValueError("Missing '"+tag+"' content.")
+    return item.text
+
+  def __readXMLHeader(self, node ):
     """
+    Set model description attribute from a model level node.
     """
     import os
-    children = []
-
-    elementtype = node.nodeName
-
-    multiplicity = ""
-    ext = ""
-    constr = ""
-    semanticconcept = ""
-    for child in node.childNodes:
-      try:
-        # Collect node element definition set
-        if child.nodeName == "vodml-id":
-          vodmlid = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "name":
-          datatype = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "description":
-          description = self.__getXMLText( child.childNodes ).replace( os.linesep, ' ')
-        elif child.nodeName == "extends":
-          ext = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "datatype":
-          datatype = child.getElementsByTagName("vodml-ref")[0].childNodes[0].data
-        elif child.nodeName == "constraint":
-          constr = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "semanticconcept":
-          semanticconcept = self.__getXMLText( child.childNodes )
-        elif child.nodeName == "multiplicity":
-          tmin = child.getElementsByTagName("minOccurs")[0].childNodes[0].data
-          tmax = child.getElementsByTagName("maxOccurs")[0].childNodes[0].data
-          if tmin == tmax:
-            multiplicity = tmin
-          elif tmax == "-1":
-            multiplicity = tmin+"..*"
-          else:
-            multiplicity = tmin+".."+tmax
-        elif child.nodeName == "isOrdered":
-          pass
+
+    if node.tag == "name":
+      self.name = self.__getXMLText( node )
+      self.prefix = self.__getXMLText( node )
+    elif node.tag == "description":
+      self.description = "'"+self.__getXMLText( node ).replace( os.linesep, ' ')+"'"
+    elif node.tag == "title":
+      self.title = "'"+self.__getXMLText( node )+"'"
+    elif node.tag == "author":
+      self.author = "'"+self.__getXMLText( node )+"'"
+    elif node.tag == "version":
+      self.version = self.__getXMLText( node )
+    elif node.tag == "previousVersion":
+      self.prever = self.__getXMLText( node )
+    elif node.tag == "lastModified":
+      self.lastmod = self.__getXMLText( node )
+    elif node.tag == "uri":
+      self.url = self.__getXMLText( node )
+    elif node.tag == "import":
+      key = self.__getXMLData( node, "name" )
+      url = self.__getXMLData( node, "url" )
+      self.imports[ key ] = url
+    else:
+      print("skipping node: "+node.tag )
+
+  def __readXMLField(self, node, fields ):
+    """
+    Collect definition item into the fields dictionary of its element.
+    """
+    import os
+
+    try:
+      # Collect node element definition set
+      if node.tag == "vodml-id":
+        fields["vodmlid"] = self.__getXMLText( node )
+      elif node.tag == "name":
+        fields["datatype"] = self.__getXMLText( node )
+      elif node.tag == "description":
+        fields["description"] = self.__getXMLText( node ).replace( os.linesep, ' ')
+      elif node.tag == "extends":
+        if node.find( ".//vodml-ref" ) is not None:
+          fields["ext"] = self.__getXMLData( node, "vodml-ref" ).strip()
+        else:
+          fields["ext"] = self.__getXMLText( node )
+      elif node.tag == "datatype":
+        fields["datatype"] = self.__getXMLData( node, "vodml-ref" )
+      elif node.tag == "constraint":
+        fields["constr"] = self.__getXMLText( node )
+      elif node.tag == "semanticconcept":
+        fields["semanticconcept"] = self.__getXMLText( node )
+      elif node.tag == "multiplicity":
+        tmin = self.__getXMLData( node, "minOccurs" )
+        tmax = self.__getXMLData( node, "maxOccurs" )
+        if tmin == tmax:
+          fields["multiplicity"] = tmin
+        elif tmax == "-1":
+          fields["multiplicity"] = tmin+"..*"
         else:
-          # child is a complex object.. add to list for further processing
-          children.append( child )
-      except Exception:
-        raise( ValueError("Problem interpreting Model element '"+node.nodeName+"' item '"+child.nodeName+"'.") )
+          fields["multiplicity"] = tmin+".."+tmax
+    except Exception:
+      raise( ValueError("Problem interpreting Model element item '"+node.tag+"'.") )
 
+  def __makeXMLElement(self, elementtype, fields ):
+    """
+    Create ModelElement from the collected definition items.
+    """
+    datatype = fields["datatype"]
     if elementtype == "literal" or elementtype == "package":
       datatype = ""
 
-    # Create ModelElement for this node.
-    elem = ModelElement( tag=vodmlid,
+    return ModelElement( tag=fields["vodmlid"],
                          etype=elementtype,
                          dtype=datatype,
-                         extends=ext,
-                         mult=multiplicity,
-                         desc=description,
-                         constraint=constr,
-                         semcon=semanticconcept,
+                         extends=fields.get("ext", ""),
+                         mult=fields.get("multiplicity", ""),
+                         desc=fields["description"],
+                         constraint=fields.get("constr", ""),
+                         semcon=fields.get("semanticconcept", ""),
                          )
 
-    # Add to Model records list
-    key = self.prefix+":"+elem.tag
-    self._records[ key ] = elem
-
-    # process child elements
-    for child in children:
-      if child.nodeType != child.TEXT_NODE:
-        self.__processXMLElement( child )
-
 
   def get( self, tag ):
     """
@@ -405,6 +534,7 @@ class Model:
   
       tag: string
                 VODML-ID of desired model element.
+                The element may belong to an imported model.
 
   
     Returns
@@ -417,14 +547,293 @@ class Model:
     Raises
     --------
   
-      None
+      ValueError:  tag not found.
+      IOError:     problem loading the imported model.
     """
 
     try:
       result = self._records[tag]
     except KeyError as ke: # no matching tag
-      raise ValueError("Input tag not found in Model '{0}'".format(tag) )
+      prefix = tag.split(":")[0]
+      if prefix == self.prefix or prefix not in self.imports:
+        raise ValueError("Input tag not found in Model '{0}'".format(tag) )
+
+      # element of an imported model, load it on first use
+      registry = self.registry
+      if registry is None:
+        registry = default_registry()
+      result = registry.resolve( prefix, self.imports ).get( tag )
+
+    return result
+
+
+  def _build_index( self ):
+    """
+    Single pass over the records, assigning each to its parent and type.
+    The parent of an element is the nearest element whose vodml-id is a
+    leading, dot separated, part of its own (ie: '<parent>.*').
+    """
+    children = { None: [] }
+    etypes = {}
+    inheritance = False
+    for key in self._records:
+      children[key] = []
+
+    for key, elem in self._records.items():
+      parent = None
+      head = key
+      while "." in head:
+        head = head.rsplit( ".", 1 )[0]
+        if head in children:
+          parent = head
+          break
+      children[ parent ].append( key )
+      etypes.setdefault( elem.etype, [] ).append( key )
+      inheritance = inheritance or elem.extends != ""
+
+    self._children = children
+    self._etypes = etypes
+    self._inheritance = inheritance
+
+  def children( self, vodmlid ):
+    """
+    Return the direct children of the specified element.
+
+    Parameters
+    ----------
+
+      vodmlid: string
+                VODML-ID of parent model element.
+                None returns the top level elements (packages).
+
+    Returns
+    --------
+
+      results: OrderedDict
+                ModelElement records of each child, keyed by VODML-ID,
+                in model order.
+
+    Raises
+    --------
+
+      ValueError:  vodmlid not found in Model
+    """
+    if self._children is None:
+      self._build_index()
+
+    try:
+      kids = self._children[vodmlid]
+    except KeyError:
+      raise ValueError("Input tag not found in Model '{0}'".format(vodmlid) )
+
+    result = OrderedDict()
+    for key in kids:
+      result[key] = self._records[key]
+
+    return result
+
+  def literals( self, enum_id ):
+    """
+    Return the literals of the specified enumeration.
+
+    Parameters
+    ----------
+
+      enum_id: string
+                VODML-ID of enumeration.
 
+    Returns
+    --------
+
+      results: OrderedDict
+                ModelElement records of each literal, keyed by VODML-ID,
+                in model order.
+
+    Raises
+    --------
+
+      ValueError:  enum_id not found in Model
+    """
+    result = OrderedDict()
+    for key, elem in self.children( enum_id ).items():
+      if elem.etype == "literal":
+        result[key] = elem
+
+    return result
+
+  def iter_records( self, etype=None ):
+    """
+    Iterate the model records, in model order.
+
+    Parameters
+    ----------
+
+      etype: string
+                Only records of this element type (eg: 'objectType')
+
+    Returns
+    --------
+
+      generator of (vodmlid, ModelElement) tuples
+    """
+    if etype is None:
+      for item in self._records.items():
+        yield item
+      return
+
+    if self._etypes is None:
+      self._build_index()
+
+    for key in self._etypes.get( etype, () ):
+      yield ( key, self._records[key] )
+
+  def has_inheritance( self ):
+    """
+    Return True if any element of the model records the type it extends;
+    a specification without inheritance (eg: some ASCII tables) has none.
+    """
+    if self._children is None:
+      self._build_index()
+
+    return self._inheritance
+
+
+  # Element types which are members of an object/data type
+  _MEMBER_TYPES = ( "attribute", "composition", "reference", "collection" )
+
+  def _model_for( self, vodmlid ):
+    """
+    Return the model defining the given element; this model or an import.
+    """
+    prefix = vodmlid.split(":")[0]
+    if prefix == self.prefix:
+      return self
+    if prefix not in self.imports:
+      raise ValueError("Input tag not found in Model '{0}'".format(vodmlid) )
+
+    registry = self.registry
+    if registry is None:
+      registry = default_registry()
+    return registry.resolve( prefix, self.imports )
+
+  def supertypes( self, type_id, _chain=() ):
+    """
+    Return the supertypes of the specified type, following 'extends' through
+    imported models.  Computed once per type.
+
+    Parameters
+    ----------
+
+      type_id: string
+                VODML-ID of type.
+
+    Returns
+    --------
+
+      supertypes: tuple
+                VODML-IDs of the supertypes, nearest first.
+
+    Raises
+    --------
+
+      ValueError:  type or one of its supertypes not found, or cyclic inheritance
+    """
+    try:
+      return self._supertypes[type_id]
+    except KeyError:
+      pass
+
+    model = self._model_for( type_id )
+    if model is not self:
+      return model.supertypes( type_id, _chain )
+
+    if type_id in _chain:
+      raise ValueError("Cyclic inheritance of Model type '{0}'".format(type_id) )
+
+    elem = self.get( type_id )
+    result = ()
+    if elem.extends != "":
+      result = ( elem.extends, ) + self._model_for( elem.extends ).supertypes( elem.extends, _chain + (type_id,) )
+
+    self._supersets[type_id] = frozenset( result )
+    self._supertypes[type_id] = result
+    return result
+
+  def is_subtype( self, type_id, super_id ):
+    """
+    Return True if the type is, or extends, the specified supertype.
+
+    Parameters
+    ----------
+
+      type_id: string
+                VODML-ID of type.
+
+      super_id: string
+                VODML-ID of candidate supertype.
+
+    Returns
+    --------
+
+      result: boolean
+
+    Raises
+    --------
+
+      ValueError:  type or one of its supertypes not found
+    """
+    if type_id == super_id:
+      return True
+
+    model = self._model_for( type_id )
+    try:
+      return super_id in model._supersets[type_id]
+    except KeyError:
+      model.supertypes( type_id )
+      return super_id in model._supersets[type_id]
+
+  def members( self, type_id ):
+    """
+    Return the members (attributes, compositions, references) of the specified
+    type, including those inherited from its supertypes.  Computed once per type;
+    the result is shared and must not be modified.
+
+    Parameters
+    ----------
+
+      type_id: string
+                VODML-ID of type.
+
+    Returns
+    --------
+
+      results: OrderedDict
+                ModelElement records keyed by VODML-ID; inherited members
+                first, from the most distant supertype down.
+
+    Raises
+    --------
+
+      ValueError:  type or one of its supertypes not found
+    """
+    try:
+      return self._members[type_id]
+    except KeyError:
+      pass
+
+    model = self._model_for( type_id )
+    if model is not self:
+      return model.members( type_id )
+
+    result = OrderedDict()
+    supers = self.supertypes( type_id )
+    if supers:
+      result.update( self._model_for( supers[0] ).members( supers[0] ) )
+    for key, elem in self.children( type_id ).items():
+      if elem.etype in self._MEMBER_TYPES:
+        result[key] = elem
+
+    self._members[type_id] = result
     return result
 
 
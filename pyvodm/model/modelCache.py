@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zlib
+
+if sys.version_info[0] < 3:
+  from urllib2 import urlopen, Request
+  from urllib import url2pathname
+  from urlparse import urlparse
+else:
+  from urllib.request import urlopen, Request, url2pathname
+  from urllib.parse import urlparse
+
+_UNKNOWN = object()   # stamp not given, look it up
+
+
+def source_stamp( fname ):
+  """
+  Return version stamp of a model source, None if it can not be determined.
+    o local files   - real path, modification time and size
+    o remote files  - URL and the ETag/Last-Modified of the server response
+                      to a HEAD request
+  """
+  if fname.startswith("http:") or fname.startswith("https:"):
+    try:
+      fh = urlopen( Request( fname, method="HEAD" ) )
+      etag = fh.headers.get("ETag")
+      lastmod = fh.headers.get("Last-Modified")
+      fh.close()
+    except Exception:
+      return None
+    if etag is None and lastmod is None:
+      return None
+    return "{0}|{1}|{2}".format( fname, etag, lastmod )
+
+  if fname.startswith("file:"):
+    fname = url2pathname( urlparse( fname ).path )
+  try:
+    path = os.path.realpath( fname )
+    st = os.stat( path )
+  except OSError:
+    return None
+  return "{0}|{1}|{2}".format( path, st.st_mtime_ns, st.st_size )
+
+
+class ModelCache:
+  """
+  Persistent on-disk cache of parsed Model specifications.
+
+  Entries are content-addressed: the key is a hash of the source location
+  plus its version stamp (see source_stamp(); URLs without ETag or
+  Last-Modified are not cached), so a changed source simply misses and is
+  parsed again.  Finding the stamp of a remote source takes a request to
+  the server, unless the caller passes one it already has.
+
+  Each entry holds the model header fields, imports and element records as
+  zlib compressed JSON of plain strings, so reading an entry can not run
+  code, whoever wrote the cache directory.  Entries are written to a
+  temporary file and renamed into place, so concurrent writers (eg: worker
+  processes warming the same cache) never expose a partial entry.
+
+  Attributes:
+    cachedir  - cache location; default is $PYVODM_CACHE_DIR or
+                ~/.cache/pyvodm/models
+    hits      - number of models loaded from the cache
+    misses    - number of lookups that had to parse the source
+
+  """
+  # Bump when the entry layout changes; old entries are then ignored.
+  VERSION = 3
+
+  HEADER = ( "name", "prefix", "description", "title", "author",
+             "version", "prever", "lastmod", "url" )
+
+  # ModelElement attributes, in constructor argument order
+  RECORD = ( "tag", "etype", "dtype", "extends", "multiplicity",
+             "description", "constraint", "semantic" )
+
+  def __init__(self, cachedir=None ):
+    self.__clear__()
+
+    if cachedir is None:
+      cachedir = os.environ.get( "PYVODM_CACHE_DIR",
+                                 os.path.join( os.path.expanduser("~"), ".cache", "pyvodm", "models" ) )
+    self.cachedir = cachedir
+
+    if not os.path.isdir( self.cachedir ):
+      os.makedirs( self.cachedir )
+
+  def __clear__(self):
+    self.cachedir = None
+    self.hits = 0
+    self.misses = 0
+
+  def __str__(self):
+    return self.__repr__()
+
+  def __repr__(self):
+    retstr  = "ModelCache: " + self.cachedir + "\n"
+    retstr += "   Hits:   " + str(self.hits) + "\n"
+    retstr += "   Misses: " + str(self.misses) + "\n"
+    return retstr
+
+  def _entry( self, fname, stamp=_UNKNOWN ):
+    """
+    Return cache file name for the source, None if it is not cacheable.
+    """
+    if stamp is _UNKNOWN:
+      stamp = source_stamp( fname )
+    if stamp is None:
+      return None
+    digest = hashlib.sha256( "{0}|{1}".format( self.VERSION, stamp ).encode("utf-8") ).hexdigest()
+    return os.path.join( self.cachedir, digest + ".vodm" )
+
+  def load( self, fname, model, stamp=_UNKNOWN ):
+    """
+    Populate model from the cache entry for the given source.
+
+    Parameters
+    ----------
+
+      fname: string
+                Filename/URL of vo-dml model specification.
+
+      model: Model
+                Model instance to populate.
+
+      stamp: string
+                version stamp of the source, if already known (see
+                source_stamp(); None when it has none, not cached)
+
+    Returns
+    --------
+
+      found: boolean
+                True if the model was loaded from the cache.
+    """
+    entry = self._entry( fname, stamp )
+    if entry is None:
+      self.misses += 1
+      return False
+
+    try:
+      with open( entry, 'rb' ) as fp:
+        content = json.loads( zlib.decompress( fp.read() ).decode("utf-8") )
+      if content["version"] != self.VERSION:
+        raise ValueError("cache entry version mismatch")
+    except Exception:
+      # missing or unreadable entry
+      self.misses += 1
+      return False
+
+    from .model import ModelElement
+
+    for key, value in zip( self.HEADER, content["header"] ):
+      setattr( model, key, value )
+    model.imports = dict( content["imports"] )
+    model._records = {}
+    for key, fields in content["records"]:
+      # RECORD is in ModelElement argument order
+      model._records[ key ] = ModelElement( *fields )
+
+    self.hits += 1
+    return True
+
+  def store( self, fname, model, stamp=_UNKNOWN ):
+    """
+    Write cache entry for the given source.
+
+    Parameters
+    ----------
+
+      fname: string
+                Filename/URL of vo-dml model specification.
+
+      model: Model
+                Parsed model.
+
+      stamp: string
+                version stamp of the source, if already known (see
+                source_stamp(); None when it has none, not cached)
+
+    Returns
+    --------
+
+      None
+    """
+    entry = self._entry( fname, stamp )
+    if entry is None:
+      return
+
+    content = { "version": self.VERSION,
+                "header":  tuple( getattr( model, key ) for key in self.HEADER ),
+                "imports": tuple( model.imports.items() ),
+                "records": tuple( ( key, tuple( getattr( elem, attr ) for attr in self.RECORD ) )
+                                  for key, elem in model._records.items() ),
+              }
+    data = zlib.compress( json.dumps( content ).encode("utf-8") )
+
+    # write-then-rename, safe for concurrent writers
+    fd, tmpname = tempfile.mkstemp( dir=self.cachedir, suffix=".tmp" )
+    try:
+      with os.fdopen( fd, 'wb' ) as fp:
+        fp.write( data )
+      os.replace( tmpname, entry )
+    except Exception:
+      if os.path.exists( tmpname ):
+        os.unlink( tmpname )
+      raise
+
+  def prewarm( self, fnames ):
+    """
+    Parse and cache each of the given model specifications, if not already cached.
+
+    Parameters
+    ----------
+
+      fnames: list
+                Filenames/URLs of vo-dml model specifications.
+
+    Returns
+    --------
+
+      None
+    """
+    from .model import Model
+
+    for fname in fnames:
+      Model( fname, cache=self )
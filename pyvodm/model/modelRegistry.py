@@ -0,0 +1,279 @@
+import threading
+
+from .modelCache import source_stamp
+
+
+class ModelRegistry:
+  """
+  Registry of loaded Model specifications, keyed by source URL.
+
+  Each model is loaded once, the first time it is asked for, and kept for
+  the life of the registry.  Concurrent requests for the same URL are
+  deduplicated: one thread parses the source, the others wait for and
+  share its result.  A failed load is not remembered, so a later request
+  tries again.
+
+  The version stamp of each model (see ModelCache) is kept with it.  A
+  load with refresh=True loads a local source again if it changed since
+  (modification time or size); remote sources are not checked, use
+  invalidate().  A stamp kept for a URL is used again when it is loaded
+  through a cache, so that a cache hit does not ask a remote server for it.
+
+  Imported models (Model.imports) are resolved through the registry on
+  first use; see Model.get() and DocBuilder.
+
+  Attributes:
+    cache     - ModelCache used when loading a model (optional)
+    offline   - when True, remote (http/https) sources are not fetched;
+                requests for them raise IOError unless aliased to a
+                local copy
+
+  """
+  def __init__(self, cache=None, offline=False ):
+    self.__clear__()
+
+    self.cache = cache
+    self.offline = offline
+
+  def __clear__(self):
+    self.cache = None
+    self.offline = False
+
+    self._models  = {}   # url -> Model
+    self._stamps  = {}   # url -> version stamp of the model source
+    self._aliases = {}   # url -> location to load from
+    self._loading = {}   # url -> Lock held while loading
+    self._lock = threading.Lock()
+
+  def __str__(self):
+    return self.__repr__()
+
+  def __repr__(self):
+    retstr  = "ModelRegistry:\n"
+    for url in sorted( self._models ):
+      retstr += "   " + self._models[url].prefix + ": " + url + "\n"
+    return retstr
+
+  def __getstate__(self):
+    # locks can not be pickled (eg: sent to worker processes)
+    state = self.__dict__.copy()
+    del state["_loading"]
+    del state["_lock"]
+    return state
+
+  def __setstate__(self, state ):
+    self.__dict__.update( state )
+    self._loading = {}
+    self._lock = threading.Lock()
+
+  def __contains__(self, url ):
+    return url in self._models
+
+  def __len__(self):
+    return len( self._models )
+
+  def alias( self, url, location ):
+    """
+    Load the model identified by url from another location (eg: a local copy).
+
+    Parameters
+    ----------
+
+      url: string
+                URL of the model, as given in the import of other models.
+
+      location: string
+                Filename/URL to load the model from.
+
+    Returns
+    --------
+
+      None
+    """
+    with self._lock:
+      self._aliases[ url ] = location
+
+  def register( self, model, url=None, stamp=None ):
+    """
+    Add an already loaded model.
+
+    Parameters
+    ----------
+
+      model: Model
+                Loaded model.
+
+      url: string
+                URL to register the model under; default is model.url
+
+      stamp: string
+                version stamp of the model source (see ModelCache), if known
+
+    Returns
+    --------
+
+      None
+    """
+    if url is None:
+      url = model.url
+
+    with self._lock:
+      self._models[ url ] = model
+      if stamp is not None:
+        self._stamps[ url ] = stamp
+
+  def invalidate( self, url=None ):
+    """
+    Drop the model loaded for the given URL (default: all models), so
+    that the next request loads it again.
+
+    Parameters
+    ----------
+
+      url: string
+                URL of the model, as requested.
+
+    Returns
+    --------
+
+      None
+    """
+    with self._lock:
+      if url is None:
+        self._models.clear()
+        self._stamps.clear()
+      else:
+        self._models.pop( url, None )
+        self._stamps.pop( url, None )
+
+  @staticmethod
+  def _is_remote( location ):
+    return location.startswith("http:") or location.startswith("https:")
+
+  def load( self, url, cache=None, refresh=False ):
+    """
+    Return the model for the given URL, loading it on first request.
+
+    Parameters
+    ----------
+
+      url: string
+                Filename/URL of vo-dml model specification.
+
+      cache: ModelCache
+                cache to load through, instead of the registry cache.
+
+      refresh: boolean
+                when True, a model loaded from a local source which has
+                changed since is loaded again.
+
+    Returns
+    --------
+
+      model: Model
+                The model; its url attribute is set to the requested url.
+
+    Raises
+    --------
+
+    IOError:
+               Error opening file, or remote source requested while offline.
+    """
+    from .model import Model
+
+    with self._lock:
+      model = self._models.get( url )
+      location = self._aliases.get( url, url )
+      stamp = self._stamps.get( url )
+
+    if model is not None and refresh and stamp is not None and not self._is_remote( location ):
+      if source_stamp( location ) != stamp:
+        # changed since loaded
+        with self._lock:
+          if self._models.get( url ) is model:
+            del self._models[ url ]
+            self._stamps.pop( url, None )
+        model = None
+
+    if model is not None:
+      return model
+
+    with self._lock:
+      model = self._models.get( url )
+      if model is not None:
+        return model
+      lock = self._loading.setdefault( url, threading.Lock() )
+      stamp = self._stamps.get( url )
+
+    with lock:
+      # another thread may have loaded it while we waited
+      with self._lock:
+        model = self._models.get( url )
+      if model is not None:
+        return model
+
+      try:
+        remote = self._is_remote( location )
+        if self.offline and remote:
+          raise IOError("Model description file '"+url+"' not available offline.")
+
+        if cache is None:
+          cache = self.cache
+        if stamp is None and ( cache is not None or not remote ):
+          stamp = source_stamp( location )
+          if stamp is None:
+            cache = None   # source can not be cached
+        model = Model( location, cache=cache, registry=self, stamp=stamp )
+        model.url = url
+
+        with self._lock:
+          self._models[ url ] = model
+          if stamp is not None:
+            self._stamps[ url ] = stamp
+      finally:
+        with self._lock:
+          self._loading.pop( url, None )
+
+    return model
+
+  def resolve( self, prefix, imports ):
+    """
+    Return the model imported under the given prefix.
+
+    Parameters
+    ----------
+
+      prefix: string
+                Model prefix (eg: 'ivoa')
+
+      imports: dictionary
+                Model imports, prefix -> url  (Model.imports)
+
+    Returns
+    --------
+
+      model: Model
+
+    Raises
+    --------
+
+    KeyError:
+               prefix not in imports.
+    IOError:
+               Error loading the imported model.
+    """
+    return self.load( imports[ prefix ] )
+
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_registry():
+  """
+  Return the process wide ModelRegistry.
+  """
+  global _default
+  with _default_lock:
+    if _default is None:
+      _default = ModelRegistry()
+  return _default
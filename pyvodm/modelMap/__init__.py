@@ -1,6 +1,8 @@
 __all__ = [ 'ModelMap',
             'ModelMapElement',
+            'ModelMapIter',
            ]
 
 from .modelMap import ModelMap
 from .modelMap import ModelMapElement
+from .modelMap import ModelMapIter
@@ -1,6 +1,21 @@
+import sys
+from bisect import bisect_left
 from collections import OrderedDict
 
-class ModelMapElement:
+from pyvodm.utils.table import TableReader
+
+if sys.version_info[0] >= 3:
+  from sys import intern
+
+def _intern( value ):
+  """
+  Interned copy of a string value, other values unchanged.
+  """
+  if type(value) is str:
+    return intern( value )
+  return value
+
+class ModelMapElement(object):
   """
   Class representing a single Instance Template (ModelMap) record.
 
@@ -20,7 +35,11 @@ class ModelMapElement:
     description   - description
     value         - identifies source of element value. see value property for details
 
+  Records are slotted, and the vocabulary (role, etype, ucd, unit) is
+  interned, so each distinct value is stored once.
+
   """
+  __slots__ = ( "uid", "name", "role", "etype", "ucd", "unit", "description", "_value" )
 
   def __init__(self, uid="", name="", role="", etype="", ucd="", unit="", desc="", value="" ):
     self.__clear__()
@@ -30,13 +49,13 @@ class ModelMapElement:
     if name != "":
         self.name = name
     if role != "":
-        self.role = role
+        self.role = _intern( role )
     if etype != "":
-        self.etype = etype
+        self.etype = _intern( etype )
     if ucd != "":
-        self.ucd = ucd
+        self.ucd = _intern( ucd )
     if unit != "":
-        self.unit = unit
+        self.unit = _intern( unit )
     if desc != "":
         self.description = desc
     if value != "":
@@ -104,25 +123,57 @@ class ModelMapElement:
 class ModelMapIter(object):
   """
     Iterator through ModelMap records
+
+    The iterator holds a cursor into a snapshot of the map records, so each
+    step is O(1) and a full pass is linear in the size of the map.
+
+    Parameters
+    ----------
+      source  : ModelMap
+                  Map to iterate.
+      role    : string
+                  Optional role prefix; only records whose role starts with
+                  this prefix are visited (e.g. "vodml:" for the structural
+                  records).
   """
-  def __init__(self, source ):
+  def __init__(self, source, role=None, records=None ):
     self.__clear__()
 
     if source.__class__.__name__ not in ( "ModelMap", ):
       raise TypeError("'source' argument must be ModelMap instance, not "+source.__class__.__name__ )
 
+    if records is None:
+      records = source._records.values()
+
     self.map  = source
-    self.keys = source._get_uids()
+    self.role = role
+    if role is None:
+      self.records = list( records )
+    else:
+      self.records = [ rec for rec in records if rec.role.startswith( role ) ]
 
 
   def __clear__( self ):
     self.map  = None
-    self.keys = None
+    self.role = None
+    self.records = None
     self.current  = -1
 
   def __iter__(self):
     return self
 
+  def __len__(self):
+    return len( self.records )
+
+  def __getitem__(self, index):
+    """
+    Index or slice the records visited by this iterator.
+    A slice returns a new (rewound) ModelMapIter over the selected records.
+    """
+    if isinstance( index, slice ):
+      return ModelMapIter( self.map, records=self.records[index] )
+    return self.records[index]
+
   def __str__(self):
     return self.__repr__()
 
@@ -132,14 +183,10 @@ class ModelMapIter(object):
 
   def __next__(self):
     self.current += 1
-    ii = 0
-    if self.current < len(self.keys):
-      for item in self.keys:
-        if ii == self.current:
-          retval = self.map.find( uid=item )
-          return retval
-        ii += 1
+    if self.current < len(self.records):
+      return self.records[ self.current ]
     else:
+      self.current = len(self.records)
       raise StopIteration
 
   def next(self):
@@ -165,8 +212,9 @@ class ModelMap:
 
     Parameter
     ---------
-      fname:  string
-              Reads specified file and interprets each non-comment line as a ModelMapElement.
+      fname:  string, file-like or bytes
+              Reads specified file (or open file, or in-memory content) and
+              interprets each non-comment line as a ModelMapElement.
 
     Supported formats:
     -----------------
@@ -187,6 +235,9 @@ class ModelMap:
     --------
     IOError:   Invalid fname input.
                Error opening file.
+    ValueError:
+               Malformed record; message starts with '<file>:<line>:'
+    TypeError: Invalid record value; message starts with '<file>:<line>:'
     """
 
     self.__clear__()
@@ -195,6 +246,10 @@ class ModelMap:
 
   def __clear__(self):
       self._records = OrderedDict()
+      self._children = None   # uid -> [child uids], built on first query
+      self._parent   = None   # uid -> parent uid
+      self._names    = {}     # name -> first record with that name
+      self._sorted   = None   # sorted [(name, position, uid)], built on first prefix query
 
 
   def __str__(self):
@@ -229,7 +284,47 @@ class ModelMap:
 
   # Private: Add ModelMapElement record to the Map
   def __add_record( self, elem ):
-    self._records[elem.uid] = elem
+    if elem.uid in self._records:
+      # replacing a record; rebuild name index from scratch
+      self._records[elem.uid] = elem
+      self._names = {}
+      for rec in self._records.values():
+        self._names.setdefault( rec.name, rec )
+    else:
+      self._records[elem.uid] = elem
+      self._names.setdefault( elem.name, elem )
+    self._children = None
+    self._parent   = None
+    self._sorted   = None
+
+  # Private: Build the parent/child index.
+  def _build_index( self ):
+    """
+    Single pass over the records, assigning each record to its parent.
+    The children of a record are the contiguous records following it whose
+    names extend the parent name (ie: '<parent.name>.*'); a stack of the
+    currently open records gives the nearest such parent.
+    """
+    children = OrderedDict()
+    parent = {}
+    stack = []
+
+    for uid in self._records.keys():
+      record = self._records[uid]
+      while stack and not record.name.startswith( stack[-1].name+"." ):
+        stack.pop()
+
+      children[uid] = []
+      if stack:
+        parent[uid] = stack[-1].uid
+        children[ stack[-1].uid ].append( uid )
+      else:
+        parent[uid] = None
+
+      stack.append( record )
+
+    self._children = children
+    self._parent = parent
 
   # Private: Return List of Map element uids.
   def _get_uids( self ):
@@ -239,40 +334,39 @@ class ModelMap:
   # Private: Load model map from file.
   def __readDB(self, fname ):
 
-    if ( fname.strip() == "" ):
+    if isinstance( fname, str ) and fname.strip() == "":
       raise IOError( "'fname' argument value invalid. '{0}'".format(fname) )
 
-    #Open file (read-only); will close() when we leave this block
+    #Open source (read-only); closed when iteration ends
     try:
-      with open( fname, 'r') as fp: 
-        content = fp.readlines()
+      table = TableReader( fname )
     except Exception as ex:
       emsg = str(ex)
       emsg = emsg.replace('[Errno 2] ','')
       raise IOError( emsg )
 
-    #Loop records
+    #Loop records, streaming
     #  - skip empty records and records starting with '#'
     #  - handle data records
     #    o parse on '&'
     #    o strip leading/trailing whitespace 
     #    o instantiate ModelMapElement
     #    o add to records hash (key=uid, with prefix?)
-    for line in content:
-      if line[0] == '#' or line.strip() == '':
-        continue
-      else:
-          parts = line.split('&')
-          elem = ModelMapElement( uid=parts[0].strip(),
-                                  name=parts[1].strip(),
-                                  role=parts[2].strip(),
-                                  etype=parts[3].strip(),
-                                  ucd=parts[4].strip(),
-                                  unit=parts[5].strip(),
-                                  desc=parts[6].strip(),
-                                  value=parts[7].strip(),
-                                )
-          self.__add_record( elem )
+    for lineno, line in table:
+      parts = table.fields( lineno, line, 8 )
+      try:
+        elem = ModelMapElement( uid=parts[0],
+                                name=parts[1],
+                                role=parts[2],
+                                etype=parts[3],
+                                ucd=parts[4],
+                                unit=parts[5],
+                                desc=parts[6],
+                                value=parts[7],
+                              )
+      except TypeError as ex:
+        raise table.error( lineno, str(ex), TypeError )
+      self.__add_record( elem )
 
 
   def find( self, uid=None, name=None ):
@@ -307,7 +401,6 @@ class ModelMap:
 
     """
     result = None
-    found = False
     emsg = "Matching record not found in ModelMap"
 
     if ( uid is not None and name is None ):
@@ -318,13 +411,9 @@ class ModelMap:
         raise ValueError( emsg )
 
     elif ( name is not None and uid is None ):
-      for uid in self._records.keys():
-        rec = self._records[uid]
-        if rec.name == name:
-          result = rec
-          found = True
-          break
-      if not found:
+      try:
+        result = self._names[name]
+      except KeyError as ke: # no matching name
         emsg += ", name='{0}'.".format(name)
         raise ValueError( emsg )
 
@@ -334,6 +423,41 @@ class ModelMap:
     return result
 
 
+  def find_prefix( self, prefix ):
+    """
+    Finds all records whose instance name starts with the given prefix
+    (e.g. "JBandFilter." for every record under the JBandFilter instance).
+    Uses a sorted name index, built on first use.
+
+    Parameters
+    ----------
+
+      prefix: string
+                Leading part of the instance name to match. (case sensitive)
+
+    Returns
+    --------
+
+      results: OrderedDict
+                Dictionary of matching ModelMapElement records, in template order.
+                Empty if nothing matches.
+    """
+    if self._sorted is None:
+      self._sorted = sorted( (rec.name, pos, rec.uid) for pos, rec in enumerate( self._records.values() ) )
+
+    matched = []
+    ii = bisect_left( self._sorted, (prefix,) )
+    while ii < len(self._sorted) and self._sorted[ii][0].startswith( prefix ):
+      matched.append( self._sorted[ii][1:] )
+      ii += 1
+
+    result = OrderedDict()
+    for pos, uid in sorted( matched ):
+      result[uid] = self._records[uid]
+
+    return result
+
+
   def find_children( self, uid ):
     """
     Finds the direct children of specified element from this ModelMap.
@@ -357,36 +481,99 @@ class ModelMap:
   
       ValueError:  Input uid not found in ModelMap
     """
+    if self._children is None:
+      self._build_index()
+
+    try:
+      kids = self._children[uid]
+    except KeyError:
+      raise ValueError("Input ID not found in ModelMap, uid='{0}'.".format(uid) )
+
     result = OrderedDict()
+    for k in kids:
+      result[k] = self._records[k]
+
+    return result
+
+
+  def find_parent( self, uid ):
+    """
+    Finds the parent of specified element from this ModelMap.
 
-    parent = None
-    pattern = ""
+    Parameters
+    ----------
 
-    for k in self._records.keys():
-      if k == uid:
-        parent = self._records[k]
-        pattern = parent.name+"."
-        continue
+      uid: string
+                ID of model element.
 
-      if parent is not None:
-        record = self._records[k]
+    Returns
+    --------
 
-        # check if we are in same Instance (match against parent name)
-        if record.name.startswith( pattern ):
-            result[k] = record
-        else:
-          break
+      parent: ModelMapElement
+                Record of the parent element, None for top-level records.
 
-    if parent is None:
+    Raises
+    --------
+
+      ValueError:  Input uid not found in ModelMap
+    """
+    if self._parent is None:
+      self._build_index()
+
+    try:
+      puid = self._parent[uid]
+    except KeyError:
       raise ValueError("Input ID not found in ModelMap, uid='{0}'.".format(uid) )
 
-    return result
+    if puid is None:
+      return None
+    return self._records[puid]
 
 
-  def iter( self ):
+  def descendants( self, uid ):
+    """
+    Generator over all descendants of specified element, depth first,
+    in template order.
+
+    Parameters
+    ----------
+
+      uid: string
+                ID of model element.
+
+    Yields
+    --------
+
+      element: ModelMapElement
+
+    Raises
+    --------
+
+      ValueError:  Input uid not found in ModelMap
+    """
+    if self._children is None:
+      self._build_index()
+
+    if uid not in self._children:
+      raise ValueError("Input ID not found in ModelMap, uid='{0}'.".format(uid) )
+
+    stack = list( reversed( self._children[uid] ) )
+    while stack:
+      k = stack.pop()
+      yield self._records[k]
+      stack.extend( reversed( self._children[k] ) )
+
+
+  def iter( self, role=None ):
     """
     Return ModelMapIter iterator.
+
+    Parameters
+    ----------
+
+      role: string
+                Optional role prefix to filter on (e.g. "vodml:").
     """
-    return ModelMapIter( self )
+    return ModelMapIter( self, role=role )
 
 
@@ -4,6 +4,16 @@ all = [ 'get_params',
         'validate_dir_param',
         'validate_file_param',
         'stk_build',
+        'read_header',
+        'header_meta',
+        'open_fits',
+        'open_fits_stream',
+        'CountingReader',
+        'TableReader',
+        'BinTableReader',
        ]
 
 from .params import *
+from .header import read_header, header_meta, open_fits, open_fits_stream, CountingReader
+from .table import TableReader
+from .bintable import BinTableReader
@@ -0,0 +1,263 @@
+"""
+  Chunked, sequential access to the rows of a FITS binary table.
+
+  Only the header of the requested HDU is parsed (preceding HDUs are
+  skipped), then the table rows are read in order, a chunk at a time, so
+  memory use depends on the chunk size, not the table size.  This works
+  equally for plain, gzip compressed and remote (http) files.
+"""
+import re
+import sys
+
+from collections import OrderedDict, namedtuple
+
+if sys.version_info[0] < 3:
+  from urllib2 import urlopen
+  from urllib import url2pathname
+  from urlparse import urlparse
+else:
+  from urllib.request import urlopen, url2pathname
+  from urllib.parse import urlparse
+
+from .header import read_header_bytes, open_fits, open_fits_stream
+
+CHUNK_ROWS = 10000   # default rows per chunk
+
+TFORM_REGEXP = re.compile( r"^\s*(\d*)([LXBIJKAEDCMPQ])" )
+
+# Bytes per element of each TFORM type code ('X' handled separately)
+_WIDTH = { 'L': 1, 'B': 1, 'I': 2, 'J': 4, 'K': 8, 'A': 1,
+           'E': 4, 'D': 8, 'C': 8, 'M': 16, 'P': 8, 'Q': 16 }
+
+# numpy (big endian) type of each supported scalar TFORM type code
+_DTYPE = { 'L': 'S1', 'B': 'u1', 'I': '>i2', 'J': '>i4', 'K': '>i8',
+           'E': '>f4', 'D': '>f8' }
+
+# Table column description
+#   code    - TFORM type code
+#   repeat  - TFORM repeat count (string width, for 'A')
+#   offset  - byte offset in row
+#   tscal, tzero - linear scaling of integer columns
+#   tnull   - stored value of undefined integer cells, or None
+Column = namedtuple( "Column", [ "name", "code", "repeat", "offset", "tscal", "tzero", "tnull" ] )
+
+_INTEGER = ( 'B', 'I', 'J', 'K' )
+
+def is_unsigned( col ):
+  """
+  True if the integer column follows the FITS unsigned integer convention
+  (TSCAL = 1, TZERO = 2**(bits-1), for I, J and K columns).
+  """
+  if col.code not in _INTEGER or col.code == 'B':
+    return False
+  return col.tscal == 1 and col.tzero == 2**( 8*_WIDTH[col.code] - 1 )
+
+def is_scaled( col ):
+  """
+  True if the values of the integer column are scaled by TSCAL/TZERO to
+  floating point (ie: other than by the unsigned integer convention).
+  """
+  if col.code not in _INTEGER or ( col.tscal == 1 and col.tzero == 0 ):
+    return False
+  return not is_unsigned( col )
+
+# ================================================================================
+def open_table_source( source ):
+  """
+  Open FITS file for binary reading.
+
+  Parameters
+  ----------
+
+    source : string
+            file name, file: URL or http(s) URL (may be gzip compressed)
+
+  Returns
+  --------
+    fp     : binary file object (caller closes)
+
+  """
+  if source.startswith("http:") or source.startswith("https:"):
+    return open_fits_stream( urlopen( source ) )
+  if source.startswith("file:"):
+    url = urlparse( source )
+    if url.netloc in ( "", "localhost" ):
+      source = url2pathname( url.path )
+    else:
+      # relative path, as in 'file://' + path
+      source = url2pathname( url.netloc + url.path )
+  return open_fits( source )
+
+# ================================================================================
+class BinTableReader(object):
+  """
+  Reads rows of a FITS binary table HDU, in chunks.
+
+  Parameters
+  ----------
+
+    source : string or file-like
+            FITS file name or URL (see open_table_source), or open binary
+            stream positioned at the start of the file.
+
+    exten  : integer
+            HDU of the table (0 based)
+
+  Attributes
+  ----------
+    nrows   : number of table rows
+    columns : OrderedDict of Column, by name
+
+  Raises
+  --------
+    IOError:     problem reading file.
+    ValueError:  HDU is not a binary table.
+
+  """
+  def __init__(self, source, exten=1 ):
+    from astropy.io.fits import Header
+
+    self._close = False
+    if isinstance( source, str ):
+      self._fp = open_table_source( source )
+      self._close = True
+    else:
+      self._fp = source
+
+    try:
+      header = Header.fromstring( read_header_bytes( self._fp, exten ).decode("ascii") )
+      if header.get("XTENSION", "").strip() != "BINTABLE":
+        raise ValueError("HDU {0} is not a binary table.".format( exten ) )
+
+      self.rowsize = header["NAXIS1"]
+      self.nrows = header["NAXIS2"]
+      self.columns = OrderedDict()
+
+      offset = 0
+      for ii in range( 1, header["TFIELDS"]+1 ):
+        match = TFORM_REGEXP.match( header["TFORM%d" % ii] )
+        if match is None:
+          raise ValueError("Invalid TFORM{0} '{1}'.".format( ii, header["TFORM%d" % ii] ) )
+        repeat = int( match.group(1) ) if match.group(1) else 1
+        code = match.group(2)
+        name = header.get( "TTYPE%d" % ii, "col%d" % ii ).strip()
+        self.columns[name] = Column( name=name, code=code, repeat=repeat, offset=offset,
+                                     tscal=header.get( "TSCAL%d" % ii, 1 ),
+                                     tzero=header.get( "TZERO%d" % ii, 0 ),
+                                     tnull=header.get( "TNULL%d" % ii ) )
+        if code == 'X':
+          offset += ( repeat + 7 ) // 8
+        else:
+          offset += repeat * _WIDTH[code]
+    except Exception:
+      self.close()
+      raise
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback ):
+    self.close()
+    return False
+
+  def close(self):
+    if self._close:
+      self._fp.close()
+      self._close = False
+
+  def column(self, name ):
+    """
+    Return description of the named column; exact name first, then case-insensitive.
+
+    Raises
+    --------
+      ValueError:  no such column.
+    """
+    try:
+      return self.columns[name]
+    except KeyError:
+      pass
+    for key in self.columns:
+      if key.lower() == name.lower():
+        return self.columns[key]
+    raise ValueError("Column '{0}' not found in table.".format( name ) )
+
+  def iter_chunks(self, names, nrows=CHUNK_ROWS ):
+    """
+    Iterate the table rows, a chunk at a time.
+
+    Parameters
+    ----------
+
+      names : list
+              names of the columns to read; supported are scalar
+              L, B, I, J, K, E, D columns and A (string) columns.
+
+      nrows : integer
+              rows per chunk
+
+    Returns
+    --------
+      generator of lists of numpy arrays, one per requested column, holding
+      the values of up to nrows rows.  Integer columns with TSCAL/TZERO are
+      scaled (the unsigned integer convention yields unsigned arrays);
+      integer columns with TNULL are masked arrays, the undefined cells
+      masked; strings and logicals are bytes arrays.
+
+    Raises
+    --------
+      ValueError:  unsupported column type.
+      IOError:     file truncated.
+    """
+    import numpy as np
+
+    cols = [ self.column( name ) for name in names ]
+    fields = {}
+    for ii, col in enumerate( cols ):
+      if col.code == 'A':
+        fmt = 'S%d' % col.repeat
+      elif col.code in _DTYPE and col.repeat == 1:
+        fmt = _DTYPE[col.code]
+      else:
+        raise ValueError("Column '{0}' of type '{1}{2}' is not supported.".format( col.name, col.repeat, col.code ) )
+      fields['f%d' % ii] = ( fmt, col.offset )
+    rowtype = np.dtype( { 'names': list( fields.keys() ),
+                          'formats': [ item[0] for item in fields.values() ],
+                          'offsets': [ item[1] for item in fields.values() ],
+                          'itemsize': self.rowsize } )
+
+    nrows = max( 1, nrows )
+    remaining = self.nrows
+    try:
+      while remaining > 0:
+        count = min( nrows, remaining )
+        data = self._read( count * self.rowsize )
+        rows = np.frombuffer( data, dtype=rowtype )
+        remaining -= count
+        yield [ self._scale( col, rows['f%d' % ii] ) for ii, col in enumerate( cols ) ]
+    finally:
+      self.close()
+
+  def _read(self, size ):
+    chunks = []
+    while size > 0:
+      data = self._fp.read( size )
+      if not data:
+        raise IOError("Unexpected end of file while reading table rows.")
+      chunks.append( data )
+      size -= len(data)
+    return b"".join( chunks )
+
+  @staticmethod
+  def _scale( col, values ):
+    if col.code in _INTEGER and col.tnull is not None:
+      # TNULL applies to the stored values, before scaling
+      import numpy as np
+      values = np.ma.masked_equal( values, col.tnull )
+
+    if is_unsigned( col ):
+      bits = 8 * _WIDTH[col.code]
+      return values.astype( '>u%d' % (bits//8) ) ^ ( 1 << (bits-1) )
+    if is_scaled( col ):
+      return values * float( col.tscal ) + float( col.tzero )
+    return values
@@ -0,0 +1,309 @@
+"""
+  Header-only FITS access.
+
+  Reads the header cards of a single HDU, seeking past the data blocks
+  of any preceding HDUs without reading them.
+"""
+import gzip
+import re
+
+from collections import OrderedDict
+
+BLOCK_SIZE = 2880   # FITS logical record length
+CARD_SIZE  = 80     # FITS header card length
+
+# Keywords dropped from the metadata of table HDUs (matches astropy Table.read)
+REMOVE_KEYWORDS = ( "XTENSION", "BITPIX", "NAXIS", "NAXIS1", "NAXIS2",
+                    "PCOUNT", "GCOUNT", "TFIELDS", "THEAP" )
+
+COLUMN_KEYWORD_REGEXP = re.compile( "(TTYPE|TFORM|TUNIT|TNULL|TSCAL|TZERO|TDISP|TBCOL|TDIM|"
+                                    "TCTYP|TCUNI|TCRPX|TCRVL|TCDLT|TRPOS)[0-9]+" )
+
+# ================================================================================
+def _card_int( card ):
+  """
+  Integer value of a mandatory (fixed format) header card.
+  """
+  value = card[10:].split(b'/')[0].strip()
+  return int( value )
+
+# ================================================================================
+def _data_size( cards ):
+  """
+  Size in bytes of the data blocks (including padding) following a header.
+  """
+  keys = {}
+  for card in cards:
+    key = card[:8].rstrip()
+    if key in ( b"BITPIX", b"NAXIS", b"PCOUNT", b"GCOUNT", b"GROUPS" ) or key.startswith( b"NAXIS" ):
+      keys[ key ] = card
+
+  naxis = _card_int( keys[ b"NAXIS" ] ) if b"NAXIS" in keys else 0
+  if naxis == 0:
+    return 0
+
+  size = 1
+  for ii in range( 1, naxis+1 ):
+    nn = _card_int( keys[ b"NAXIS"+str(ii).encode() ] )
+    if ii == 1 and nn == 0 and b"GROUPS" in keys:
+      # random groups; NAXIS1 is 0 by convention
+      continue
+    size *= nn
+
+  pcount = _card_int( keys[ b"PCOUNT" ] ) if b"PCOUNT" in keys else 0
+  gcount = _card_int( keys[ b"GCOUNT" ] ) if b"GCOUNT" in keys else 1
+  size = abs( _card_int( keys[ b"BITPIX" ] ) ) // 8 * gcount * ( pcount + size )
+
+  return ( ( size + BLOCK_SIZE - 1 ) // BLOCK_SIZE ) * BLOCK_SIZE
+
+# ================================================================================
+def _skip( fp, nbytes ):
+  """
+  Advance file position by nbytes; seek when possible, else read and discard.
+  """
+  seekable = getattr( fp, "seekable", None )
+  if seekable is not None and seekable():
+    fp.seek( nbytes, 1 )
+    return
+
+  while nbytes > 0:
+    chunk = fp.read( min( nbytes, 64*BLOCK_SIZE ) )
+    if not chunk:
+      raise IOError("Unexpected end of file while skipping FITS data.")
+    nbytes -= len(chunk)
+
+# ================================================================================
+def read_header_bytes( fp, exten=1 ):
+  """
+  Return the raw header of the requested HDU from an open binary stream.
+
+  Parameters
+  ----------
+
+    fp    : file-like
+            binary stream positioned at the start of the FITS file.
+
+    exten : integer
+            HDU to read (0 based)
+
+  Returns
+  --------
+    header : bytes
+            header cards of the HDU, up to and including the END card block.
+
+  Raises
+  --------
+    IOError:  file is truncated, or the HDU does not exist.
+
+  """
+  hdu = 0
+  while True:
+    blocks = []
+    cards  = []
+    done   = False
+    while not done:
+      block = fp.read( BLOCK_SIZE )
+      if len(block) < BLOCK_SIZE:
+        if hdu > 0 and len(blocks) == 0 and len(block) == 0:
+          raise IOError("HDU {0} not found in file, it has {1} HDUs.".format( exten, hdu ) )
+        raise IOError("Unexpected end of file while reading header of HDU {0}.".format( hdu ) )
+      blocks.append( block )
+      for ii in range( 0, BLOCK_SIZE, CARD_SIZE ):
+        card = block[ii:ii+CARD_SIZE]
+        if card[:8] == b"END     ":
+          done = True
+          break
+        cards.append( card )
+
+    if hdu == exten:
+      return b"".join( blocks )
+
+    # skip data of this HDU
+    _skip( fp, _data_size( cards ) )
+    hdu += 1
+
+# ================================================================================
+class CountingReader(object):
+  """
+  Wraps a binary stream, counting the bytes actually read through it.
+  Seeks pass through without being counted.
+  """
+  def __init__(self, fp ):
+    self._fp = fp
+    self.nbytes = 0
+
+  def read( self, size=-1 ):
+    data = self._fp.read( size )
+    self.nbytes += len(data)
+    return data
+
+  def seekable( self ):
+    seekable = getattr( self._fp, "seekable", None )
+    return seekable is not None and seekable()
+
+  def seek( self, offset, whence=0 ):
+    return self._fp.seek( offset, whence )
+
+  def tell( self ):
+    return self._fp.tell()
+
+# ================================================================================
+def open_fits( fname ):
+  """
+  Open local FITS file for binary reading, transparently decompressing
+  gzip compressed files.
+
+  Parameters
+  ----------
+
+    fname : string
+            FITS file name
+
+  Returns
+  --------
+    fp    : binary file object (caller closes)
+
+  """
+  fp = open( fname, 'rb' )
+  magic = fp.read(2)
+  if magic == b"\x1f\x8b":
+    fp.close()
+    return gzip.open( fname, 'rb' )
+
+  fp.seek(0)
+  return fp
+
+# ================================================================================
+class _Prefixed(object):
+  """
+  Binary stream, with the bytes already read from its start put back.
+  """
+  def __init__(self, prefix, fp ):
+    self._prefix = prefix
+    self._fp = fp
+
+  def read( self, size=-1 ):
+    if not self._prefix:
+      return self._fp.read( size )
+    if size is None or size < 0:
+      data = self._prefix + self._fp.read()
+    else:
+      data = self._prefix[:size]
+      if len(data) < size:
+        data += self._fp.read( size - len(data) )
+    self._prefix = self._prefix[len(data):]
+    return data
+
+  def close( self ):
+    self._fp.close()
+
+class _GzipStream(gzip.GzipFile):
+  """
+  Decompressing reader of a gzip compressed stream; closes the stream.
+  """
+  def __init__(self, fp ):
+    gzip.GzipFile.__init__( self, fileobj=fp, mode='rb' )
+    self._source = fp
+
+  def close( self ):
+    try:
+      gzip.GzipFile.close( self )
+    finally:
+      self._source.close()
+
+def open_fits_stream( fp ):
+  """
+  Wrap an open binary stream of a FITS file (eg: remote, not seekable),
+  transparently decompressing a gzip compressed one.
+
+  Parameters
+  ----------
+
+    fp    : binary file object, at the start of the file
+
+  Returns
+  --------
+    fp    : binary file object (caller closes; closes the given stream)
+
+  """
+  magic = fp.read(2)
+  stream = _Prefixed( magic, fp )
+  if magic == b"\x1f\x8b":
+    return _GzipStream( stream )
+  return stream
+
+# ================================================================================
+def read_header( source, exten=1 ):
+  """
+  Read the header of the requested HDU, without reading any data.
+
+  Parameters
+  ----------
+
+    source : string or file-like
+            FITS file name (may be gzip compressed), or open binary stream.
+
+    exten  : integer
+            HDU to read (0 based)
+
+  Returns
+  --------
+    header : astropy.io.fits.Header
+
+  Raises
+  --------
+    IOError:  problem reading file.
+
+  """
+  from astropy.io.fits import Header
+
+  if isinstance( source, str ):
+    with open_fits( source ) as fp:
+      raw = read_header_bytes( fp, exten )
+  else:
+    raw = read_header_bytes( source, exten )
+
+  return Header.fromstring( raw.decode("ascii") )
+
+# ================================================================================
+def header_meta( header ):
+  """
+  Convert header to metadata dictionary, following astropy Table.read:
+    o structural and column keywords are dropped
+    o COMMENT and HISTORY values are collected in lists ('comments', 'HISTORY')
+    o values of repeated keywords are collected in a list
+
+  Parameters
+  ----------
+
+    header : astropy.io.fits.Header
+
+  Returns
+  --------
+    meta   : OrderedDict
+
+  """
+  meta = OrderedDict()
+
+  for key, value, comment in header.cards:
+    if key in ( "COMMENT", "HISTORY" ):
+      if key == "COMMENT":
+        key = "comments"
+      if key in meta:
+        meta[key].append( value )
+      else:
+        meta[key] = [ value ]
+
+    elif key in meta:   # key is duplicate
+      if isinstance( meta[key], list ):
+        meta[key].append( value )
+      else:
+        meta[key] = [ meta[key], value ]
+
+    elif COLUMN_KEYWORD_REGEXP.match( key ) or key in REMOVE_KEYWORDS:
+      pass
+
+    else:
+      meta[key] = value
+
+  return meta
@@ -0,0 +1,106 @@
+"""
+  Streaming reader for the '&' delimited ASCII tables used by the Model
+  (.db) and ModelMap (instance template) formats.
+
+  Lines are read lazily, one at a time, from a file name, an open file
+  object (text or binary) or an in-memory bytes/str buffer.  Errors in a
+  line are reported as '<source>:<line>: <message>'.
+"""
+import io
+
+DELIMITER = "&"
+
+# ================================================================================
+def source_name( source ):
+  """
+  Name of the table source, for messages.
+  """
+  if isinstance( source, str ):
+    return source
+  if isinstance( source, ( bytes, bytearray ) ):
+    return "<bytes>"
+  return str( getattr( source, "name", "<stream>" ) )
+
+# ================================================================================
+class TableReader(object):
+  """
+  Iterate the content lines of a table source.
+
+  Blank lines and lines starting with '#' are skipped; each remaining line
+  is returned with leading/trailing whitespace removed, along with its line
+  number.  A file opened by the reader is closed when iteration ends, or by
+  close() / leaving a 'with' block.
+
+  Parameters
+  ----------
+
+    source : string, file-like or bytes
+            file name, open file object, or table content
+
+  Raises
+  --------
+    IOError:  error opening file.
+
+  """
+  def __init__(self, source ):
+    self.name = source_name( source )
+    self._close = False
+
+    if isinstance( source, str ):
+      self._fp = open( source, 'r' )
+      self._close = True
+    elif isinstance( source, ( bytes, bytearray ) ):
+      self._fp = io.BytesIO( source )
+    else:
+      self._fp = source
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback ):
+    self.close()
+    return False
+
+  def __iter__(self):
+    try:
+      lineno = 0
+      for line in self._fp:
+        lineno += 1
+        if isinstance( line, bytes ):
+          line = line.decode("utf-8")
+        line = line.strip()
+        if line == '' or line[0] == '#':
+          continue
+        yield lineno, line
+    finally:
+      self.close()
+
+  def close(self):
+    if self._close:
+      self._fp.close()
+      self._close = False
+
+  def where(self, lineno ):
+    """
+    Location of the line, '<source>:<line>'.
+    """
+    return "{0}:{1}".format( self.name, lineno )
+
+  def error(self, lineno, message, etype=ValueError ):
+    """
+    Exception of the given type for a problem in the line.
+    """
+    return etype( "{0}: {1}".format( self.where( lineno ), message ) )
+
+  def fields(self, lineno, line, nfields ):
+    """
+    Split table line into (at least) nfields stripped fields.
+
+    Raises
+    --------
+      ValueError:  line has fewer fields.
+    """
+    parts = line.split( DELIMITER )
+    if len(parts) < nfields:
+      raise self.error( lineno, "expected {0} '{1}' delimited fields, found {2}.".format( nfields, DELIMITER, len(parts) ) )
+    return [ part.strip() for part in parts ]
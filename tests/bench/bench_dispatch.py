@@ -0,0 +1,122 @@
+"""
+Benchmark: element type dispatch in the writers.
+
+Writes a Document with the VOTWriter (plain and VO-DML annotated) and the
+XMLWriter, which pick the method for an element from its 'kind', against
+writers dispatching as before, on chains of __class__.__name__ compares
+(reproduced here by the 'Named' subclasses).  Reports the write time per
+element, and the time of the dispatch step alone.
+
+  python tests/bench/bench_dispatch.py
+"""
+import sys
+import os
+import gc
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from bench_utils import make_template, outdir, timeit, TESTIN, TESTRES, MODELS
+from pyvodm.model.builders import DocBuilder
+from pyvodm.document.writers import VOTWriter, XMLWriter
+
+class NamedVOTWriter(VOTWriter):
+  """
+  VOTWriter dispatching on the element class name.
+  """
+  @staticmethod
+  def _is_vot_leaf( elem, depth=0, path=() ):
+    if elem.__class__.__name__ in ( "ObjectType", ):
+      return False
+    if elem.__class__.__name__ in ( "DataType", ) and elem.value == "":
+      return False
+    return True
+
+  def write_vot_element( self, elem, indent=0 ):
+    if elem.__class__.__name__ in ( "ObjectType", ):
+      self.write_vot_object( elem, indent )
+    elif elem.__class__.__name__ in ( "DataType", ):
+      self.write_vot_datatype( elem, indent )
+    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType" ):
+      self.write_vot_param( elem, indent )
+    elif elem.__class__.__name__ in ( "ReferenceType", ):
+      self.write_vot_groupref( elem, indent )
+    elif elem.__class__.__name__ in ( "FieldType", ):
+      self.write_vot_fieldref( elem, indent )
+
+  def write_vodml_element_annotation( self, elem, indent=0, dataflag=False ):
+    if elem.__class__.__name__ in ( "ObjectType" ):
+      self.write_vodml_object_annotation( elem, indent, dataflag )
+    elif elem.__class__.__name__ in ( "DataType" ):
+      self.write_vodml_datatype_annotation( elem, indent, dataflag )
+    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType" ):
+      self.write_vodml_constant_annotation( elem, indent, dataflag )
+    elif elem.__class__.__name__ in ( "ReferenceType" ):
+      self.write_vodml_idref_annotation( elem, indent, dataflag )
+    elif elem.__class__.__name__ in ( "FieldType", ):
+      self.write_vodml_column_annotation( elem, indent, dataflag )
+
+class NamedXMLWriter(XMLWriter):
+  """
+  XMLWriter dispatching on the element class name.
+  """
+  @staticmethod
+  def _is_simple( elem, depth=0, path=() ):
+    if elem.__class__.__name__ in ( "ObjectType", ):
+      return False
+    if elem.__class__.__name__ in ( "DataType", ) and elem.value == "":
+      return False
+    return True
+
+  def _interpret_element( self, elem, level ):
+    if elem.__class__.__name__ in ( "ObjectType" ):
+      self._interpret_object( elem, level )
+    elif elem.__class__.__name__ in ( "DataType", ):
+      self._interpret_datatype( elem, level )
+    elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType" ):
+      self._interpret_simple_type( elem, level )
+    elif elem.__class__.__name__ in ( "ReferenceType", ):
+      self._interpret_ref_type( elem, level )
+
+def by_name( elem ):
+  if elem.__class__.__name__ in ( "ObjectType", ):
+    return "object"
+  elif elem.__class__.__name__ in ( "DataType", ):
+    return "datatype"
+  elif elem.__class__.__name__ in ( "PrimitiveType", "EnumType" ):
+    return "value"
+  elif elem.__class__.__name__ in ( "ReferenceType", ):
+    return "reference"
+  elif elem.__class__.__name__ in ( "FieldType", ):
+    return "field"
+
+TABLE = { "object": "object", "datatype": "datatype", "primitive": "value", "enum": "value", "reference": "reference", "field": "field" }
+
+def by_kind( elem ):
+  return TABLE.get( elem.kind )
+
+def main():
+  b = DocBuilder()
+  for model in MODELS:
+    b.add_model( TESTRES+model )
+  b.add_instance_map( make_template( outdir()+"bench_dispatch.db", 4000 ) )
+  doc = b.process( TESTIN+"test_sample.fits" )
+  os.unlink( outdir()+"bench_dispatch.db" )
+
+  nelem = sum( 1 for step in doc.walk() )
+  gc.disable()   # collections of the write garbage only add noise
+  print("# {0} elements".format( nelem ) )
+  print("# {0:>10} {1:>16} {2:>16} {3:>8}".format( "writer", "by name (us/el)", "by kind (us/el)", "ratio" ) )
+  with open( os.devnull, "w" ) as fp:
+    for label, before, after in ( ( "vot",  NamedVOTWriter( None ), VOTWriter( None ) ),
+                                  ( "avot", NamedVOTWriter( None, annotation="vodml" ), VOTWriter( None, annotation="vodml" ) ),
+                                  ( "xml",  NamedXMLWriter( None ), XMLWriter( None ) ) ):
+      t_name = timeit( lambda: before.write_to( doc, fp ), repeat=9 )
+      t_kind = timeit( lambda: after.write_to( doc, fp ), repeat=9 )
+      print("  {0:>10} {1:>16.3f} {2:>16.3f} {3:>8.2f}".format( label, 1e6*t_name/nelem, 1e6*t_kind/nelem, t_kind/t_name ) )
+
+  elements = [ step.element for step in doc.walk() ] * 10
+  t_name = timeit( lambda: [ by_name( elem ) for elem in elements ], repeat=9 )
+  t_kind = timeit( lambda: [ by_kind( elem ) for elem in elements ], repeat=9 )
+  print("  {0:>10} {1:>16.3f} {2:>16.3f} {3:>8.2f}".format( "dispatch", 1e6*t_name/len(elements), 1e6*t_kind/len(elements), t_kind/t_name ) )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: DocBuilder per-file build time.
+
+Compares building a Document with the template compiled per file (the cost
+paid by every process() call before templates were compiled) against
+building from the BuildPlan compiled once by add_instance_map().
+The source file header is loaded once, so only the build is timed.
+
+  python tests/bench/bench_docbuilder.py
+"""
+import sys
+import os
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from bench_utils import make_template, outdir, timeit, TESTIN, TESTRES, MODELS
+from pyvodm.model.builders import DocBuilder
+from pyvodm.document import Document
+
+def build( b, recompile ):
+  if recompile:
+    b.compile()
+  b.document = Document()
+  b._load_document()
+  b.document = None
+
+def main():
+  b = DocBuilder()
+  for model in MODELS:
+    b.add_model( TESTRES+model )
+  b.fheader = b._get_header( TESTIN+"test_sample.fits", 1 )
+
+  print("# {0:>8} {1:>16} {2:>16} {3:>8}".format( "records", "compile+build", "build (ms)", "speedup" ) )
+  for ninst in ( 100, 200, 400, 800 ):
+    fname = make_template( outdir()+"bench_docbuilder.db", ninst )
+    b.add_instance_map( fname )
+    nrec = len( b.template._records )
+    t_before = timeit( lambda: build( b, True ) )
+    t_after  = timeit( lambda: build( b, False ) )
+    print("  {0:>8} {1:>16.3f} {2:>16.3f} {3:>8.1f}".format( nrec, t_before*1e3, t_after*1e3, t_before/t_after ) )
+    os.unlink( fname )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: memory held by Document elements.
+
+Builds 100k elements of each kind, as DocBuilder does (an enumeration has
+its model literals, an object holds a few attributes), and reports the
+traced memory they hold, scaled to 1M elements, against elements of the
+former layout: a per-instance __dict__, content tables allocated up front
+and a literal table per enumeration instance.
+
+  python tests/bench/bench_elements.py
+"""
+import sys
+import os
+import gc
+import tracemalloc
+from collections import OrderedDict
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from pyvodm.document import ObjectType, DataType, EnumType, PrimitiveType, ReferenceType, shared_table
+
+NREC = 100000
+
+LITERALS = tuple( ( "sample:catalog.SourceClassification." + lit, lit ) for lit in ( "star", "galaxy", "agn", "planet", "unknown" ) )
+
+class PlainElement:
+  """
+  Element with the former layout; attributes in a per-instance __dict__.
+  """
+  def __init__(self, content, **kwargs ):
+    self.refid = kwargs.get( "refid", "" )
+    self.name = kwargs.get( "name", "" )
+    self.description = ""
+    self.vodml_role = "sample:catalog.Source.name"
+    self.vodml_type = "ivoa:string"
+    for key, value in kwargs.items():
+      setattr( self, key, value )
+    for key in content:
+      setattr( self, key, OrderedDict() )
+
+def plain_object( ii ):
+  obj = PlainElement( ( "_attributes", "_references", "_compositions" ), refid="_o%d" % ii, name="source", _referenced=False, _datanode=False )
+  obj._attributes[ "sample:catalog.Source.name" ] = [ plain_primitive( ii ) ]
+  return obj
+
+def plain_primitive( ii ):
+  return PlainElement( (), refid="_p%d" % ii, name="name", ucd="", value="src%d" % ii )
+
+def plain_quantity( ii ):
+  return PlainElement( ( "_attributes", "_references" ), refid="_q%d" % ii, name="ra", ucd="pos.eq.ra", value="%d.5" % ii, unit="deg" )
+
+def plain_enum( ii ):
+  elem = PlainElement( ( "_literals", ), refid="_e%d" % ii, name="classification", ucd="", value="star" )
+  for vodmlid, label in LITERALS:
+    elem._literals[ vodmlid ] = label
+  return elem
+
+def plain_reference( ii ):
+  return PlainElement( (), refid="_r%d" % ii, name="frame", target="_frame" )
+
+def slot_object( ii ):
+  obj = ObjectType( refid="_o%d" % ii, name="source" )
+  obj.add_attribute( slot_primitive( ii ) )
+  return obj
+
+def slot_primitive( ii ):
+  return PrimitiveType( refid="_p%d" % ii, name="name", value="src%d" % ii )
+
+def slot_quantity( ii ):
+  return DataType( refid="_q%d" % ii, name="ra", ucd="pos.eq.ra", value="%d.5" % ii, unit="deg" )
+
+def slot_enum( ii ):
+  elem = EnumType( refid="_e%d" % ii, name="classification", value="star" )
+  elem.set_literals( shared_table( LITERALS ) )
+  return elem
+
+def slot_reference( ii ):
+  return ReferenceType( refid="_r%d" % ii, name="frame", target="_frame" )
+
+def held( make ):
+  """
+  Return traced memory (bytes) still held by the elements once built.
+  """
+  gc.collect()
+  tracemalloc.start()
+  elements = [ make( ii ) for ii in range( NREC ) ]
+  size, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del elements
+  return size
+
+def main():
+  scale = 1000000.0 / NREC
+  print("# {0:>26} {1:>14} {2:>14} {3:>14} {4:>8}".format( "per 1M elements", "before (MB)", "after (MB)", "saved (MB)", "ratio" ) )
+  for label, before, after in ( ( "ObjectType (+1 attribute)", plain_object, slot_object ),
+                                ( "DataType (quantity)", plain_quantity, slot_quantity ),
+                                ( "EnumType (5 literals)", plain_enum, slot_enum ),
+                                ( "PrimitiveType", plain_primitive, slot_primitive ),
+                                ( "ReferenceType", plain_reference, slot_reference ) ):
+    b = held( before ) * scale
+    a = held( after ) * scale
+    print("  {0:>26} {1:>14.1f} {2:>14.1f} {3:>14.1f} {4:>8.2f}".format( label, b/1e6, a/1e6, (b-a)/1e6, a/b ) )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: VO-DML/XML model load.
+
+Reports the load time and peak traced memory of Model() on synthetic models
+up to 50k elements.  The streaming reader releases each definition subtree
+once its record is made, so peak memory should track the record count rather
+than the size of the document tree; a full minidom parse of the same file is
+shown for reference.
+
+  python tests/bench/bench_model.py
+"""
+import sys
+import os
+import tracemalloc
+import xml.dom.minidom
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from bench_utils import make_model, outdir, timeit
+from pyvodm.model import Model
+
+def peak( func ):
+  """
+  Return peak traced memory (bytes) of a call to func().
+  """
+  tracemalloc.start()
+  func()
+  size, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return peak
+
+def main():
+  print("# {0:>8} {1:>12} {2:>12} {3:>14} {4:>14}".format( "elements", "load (ms)", "peak (MB)", "dom (ms)", "dom peak (MB)" ) )
+  for nelem in ( 5000, 10000, 25000, 50000 ):
+    fname = make_model( outdir()+"bench_model.vo-dml.xml", nelem )
+    nrec = len( Model( fname )._records )
+    dt = timeit( lambda: Model( fname ) )
+    mem = peak( lambda: Model( fname ) )
+    dom_dt = timeit( lambda: xml.dom.minidom.parse( fname ) )
+    dom_mem = peak( lambda: xml.dom.minidom.parse( fname ) )
+    print("  {0:>8} {1:>12.1f} {2:>12.2f} {3:>14.1f} {4:>14.2f}".format( nrec, dt*1e3, mem/1e6, dom_dt*1e3, dom_mem/1e6 ) )
+    os.unlink( fname )
+
+if __name__ == '__main__':
+  main()
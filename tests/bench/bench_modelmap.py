@@ -0,0 +1,31 @@
+"""
+Benchmark: ModelMap iteration scaling.
+
+A full pass of ModelMap.iter() should be linear in the number of records,
+ie: the per-record cost stays flat as the template grows.
+
+  python tests/bench/bench_modelmap.py
+"""
+import sys
+import os
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from bench_utils import make_template, outdir, timeit
+from pyvodm.modelMap import ModelMap
+
+def full_pass( m ):
+  for rec in m.iter():
+    pass
+
+def main():
+  print("# {0:>8} {1:>12} {2:>14}".format( "records", "pass (ms)", "per rec (us)" ) )
+  for ninst in ( 500, 1000, 2000, 4000, 8000 ):
+    fname = make_template( outdir()+"bench_modelmap.db", ninst )
+    m = ModelMap( fname )
+    nrec = len( m._records )
+    dt = timeit( lambda: full_pass( m ) )
+    print("  {0:>8} {1:>12.3f} {2:>14.3f}".format( nrec, dt*1e3, dt*1e6/nrec ) )
+    os.unlink( fname )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: memory held by model and template records.
+
+Builds 100k ModelElement and 100k ModelMapElement records from freshly
+split text lines (as the readers do) and reports the traced memory they
+hold, against records of the former layout: a per-instance __dict__ and
+no interning.
+
+  python tests/bench/bench_records.py
+"""
+import sys
+import os
+import gc
+import tracemalloc
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from pyvodm.model import ModelElement
+from pyvodm.modelMap import ModelMapElement
+
+NREC = 100000
+
+class PlainRecord:
+  """
+  Record with the former layout; attributes in a per-instance __dict__.
+  """
+  def __init__(self, **kwargs ):
+    for key, value in kwargs.items():
+      setattr( self, key, value )
+
+def model_lines():
+  etypes = ( "attribute", "attribute", "attribute", "reference", "composition" )
+  for ii in range( NREC ):
+    yield "p.T{0}.a{1} & {2} & ivoa:RealQuantity & 0..1 & Attribute {1} & & ".format( ii // 5, ii % 5, etypes[ ii % 5 ] )
+
+def map_lines():
+  for ii in range( NREC ):
+    yield "_f{0:015d} & F{0}.value & filter:PhotometryFilter.spectralLocation & & em.wl & Angstrom & & key:WAVE{1}".format( ii, ii % 10 )
+
+def plain_model( line ):
+  p = [ item.strip() for item in line.split('&') ]
+  return PlainRecord( tag=p[0], etype=p[1], dtype=p[2], extends="", multiplicity=p[3],
+                      description=p[4], constraint=p[5], semantic=p[6] )
+
+def slot_model( line ):
+  p = [ item.strip() for item in line.split('&') ]
+  return ModelElement( tag=p[0], etype=p[1], dtype=p[2], mult=p[3],
+                       desc=p[4], constraint=p[5], semcon=p[6] )
+
+def plain_map( line ):
+  p = [ item.strip() for item in line.split('&') ]
+  return PlainRecord( uid=p[0], name=p[1], role=p[2], etype=p[3], ucd=p[4],
+                      unit=p[5], description=p[6], _value=p[7] )
+
+def slot_map( line ):
+  p = [ item.strip() for item in line.split('&') ]
+  return ModelMapElement( uid=p[0], name=p[1], role=p[2], etype=p[3], ucd=p[4],
+                          unit=p[5], desc=p[6], value=p[7] )
+
+def held( make, lines ):
+  """
+  Return traced memory (bytes) still held by the records once built.
+  """
+  gc.collect()
+  tracemalloc.start()
+  records = [ make( line ) for line in lines() ]
+  size, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del records
+  return size
+
+def main():
+  print("# {0:>16} {1:>12} {2:>12} {3:>8}".format( "records", "before (MB)", "after (MB)", "ratio" ) )
+  for label, before, after, lines in ( ( "ModelElement", plain_model, slot_model, model_lines ),
+                                       ( "ModelMapElement", plain_map, slot_map, map_lines ) ):
+    b = held( before, lines )
+    a = held( after, lines )
+    print("  {0:>16} {1:>12.2f} {2:>12.2f} {3:>8.2f}".format( label, b/1e6, a/1e6, a/float(b) ) )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,84 @@
+"""
+Helpers shared by the pyvodm benchmark scripts.
+"""
+import os
+import time
+
+TEST_BASE_DIR = os.path.join( os.path.dirname(__file__), '../' )
+TESTIN  = ''.join( (TEST_BASE_DIR, "data/") )
+TESTOUT = ''.join( (TEST_BASE_DIR, "out/") )
+TESTRES = ''.join( (TEST_BASE_DIR, "res/") )
+
+MODELS = ( "Sample.vo-dml.xml", "Filter.db", "IVOA-v1.0.vo-dml.xml" )
+
+def make_template( fname, ninst ):
+  """
+  Write a synthetic instance template (ModelMap) with 'ninst' PhotometryFilter
+  instances, each having 5 attributes, all listed in one metadata block.
+  """
+  row = "{0:20}& {1:40}& {2:45}& & & & & {3}\n"
+  with open( fname, "w" ) as fp:
+    fp.write( "# synthetic template, {0} instances\n".format( ninst ) )
+    fp.write( row.format( "_s000000000000000", "Default", "vodml:metadata", "" ) )
+    for ii in range( ninst ):
+      fp.write( row.format( "_s%015d" % (ii+1), "Default.filter%d" % ii, "vodml:instance", "inline:_f%015d" % ii ) )
+    fp.write( row.format( "_szzzzzzzzzzzzzzz", "End", "vodml:terminate", "" ) )
+    for ii in range( ninst ):
+      base = "Filter%d" % ii
+      fp.write( row.format( "_f%015d" % ii,   base,                "filter:PhotometryFilter", "" ) )
+      fp.write( row.format( "_f%015da" % ii,  base+".name",        "filter:PhotometryFilter.name", "key:FILTER1" ) )
+      fp.write( row.format( "_f%015db" % ii,  base+".bandName",    "filter:PhotometryFilter.bandName", "lit:J" ) )
+      fp.write( row.format( "_f%015dc" % ii,  base+".validFrom",   "filter:PhotometryFilter.dataValidityFrom", "lit:1999-01-01T00:00:01" ) )
+      fp.write( row.format( "_f%015dd" % ii,  base+".validTo",     "filter:PhotometryFilter.dataValidityTo", "lit:2099-01-01T00:00:01" ) )
+      fp.write( row.format( "_f%015de" % ii,  base+".description", "filter:PhotometryFilter.description", "lit:J band filter" ) )
+  return fname
+
+def make_model( fname, nelem ):
+  """
+  Write a synthetic VO-DML/XML model with about 'nelem' elements: objectTypes
+  of 4 attributes each (5 elements per type), in packages of 100 types.
+  """
+  attr = ( "    <attribute>\n"
+           "      <vodml-id>{0}.a{1}</vodml-id>\n"
+           "      <name>a{1}</name>\n"
+           "      <description>Attribute {1} of {0}.</description>\n"
+           "      <datatype><vodml-ref>ivoa:RealQuantity</vodml-ref></datatype>\n"
+           "      <multiplicity><minOccurs>0</minOccurs><maxOccurs>1</maxOccurs></multiplicity>\n"
+           "    </attribute>\n" )
+  with open( fname, "w" ) as fp:
+    fp.write( '<?xml version="1.0" encoding="UTF-8"?>\n' )
+    fp.write( '<vo-dml:model xmlns:vo-dml="http://www.ivoa.net/xml/VODML/v1">\n' )
+    fp.write( "  <name>synth</name>\n  <description>Synthetic model.</description>\n" )
+    fp.write( "  <title>Synthetic</title>\n  <version>1.0</version>\n" )
+    fp.write( "  <import>\n    <name>ivoa</name>\n    <url>IVOA-v1.0.vo-dml.xml</url>\n  </import>\n" )
+    for ii in range( max( 1, nelem // 5 ) ):
+      if ii % 100 == 0:
+        if ii > 0:
+          fp.write( "  </package>\n" )
+        pkg = "p%d" % (ii // 100)
+        fp.write( "  <package>\n  <vodml-id>{0}</vodml-id>\n  <name>{0}</name>\n  <description>Package.</description>\n".format( pkg ) )
+      tag = "%s.T%d" % ( pkg, ii )
+      fp.write( "  <objectType>\n    <vodml-id>{0}</vodml-id>\n    <name>T{1}</name>\n    <description>Type {1}.</description>\n".format( tag, ii ) )
+      for jj in range( 4 ):
+        fp.write( attr.format( tag, jj ) )
+      fp.write( "  </objectType>\n" )
+    fp.write( "  </package>\n</vo-dml:model>\n" )
+  return fname
+
+def outdir():
+  if not os.path.exists( TESTOUT ):
+    os.mkdir( TESTOUT )
+  return TESTOUT
+
+def timeit( func, repeat=3 ):
+  """
+  Return best wall-clock time (seconds) of 'repeat' calls to func().
+  """
+  best = None
+  for ii in range( repeat ):
+    t0 = time.perf_counter()
+    func()
+    dt = time.perf_counter() - t0
+    if best is None or dt < best:
+      best = dt
+  return best
@@ -0,0 +1,92 @@
+"""
+Benchmark: XMLWriter throughput and peak memory.
+
+Writes Documents of increasing size with the streaming XMLWriter, against
+the previous approach of building an xml.dom.minidom tree and serializing
+it with toprettyxml() (reproduced here as 'minidom_write').  Both write
+the same text.
+
+  python tests/bench/bench_xmlwriter.py
+"""
+import sys
+import os
+import io
+import tracemalloc
+sys.path.insert( 0, os.path.join( os.path.dirname(__file__), '../../' ) )
+
+from bench_utils import make_template, outdir, timeit, TESTIN, TESTRES, MODELS
+from pyvodm.model.builders import DocBuilder
+from pyvodm.document.writers import XMLWriter
+
+def minidom_write( doc, stream ):
+  import xml.dom.minidom as md
+
+  top = md.Document()
+  root = top.createElementNS( "http://ivoa.net/dm/models/vo-dml/xsd/ivoa", "ivoa:EXAMPLE" )
+  root.setAttributeNS( "xmls", "xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance" )
+  for key in sorted( doc._models.keys() ):
+    base = "http://ivoa.net/dm/models/vo-dml/xsd" if key == "ivoa" else "http://ivoa.net/xml"
+    root.setAttributeNS( "xmls", "xmlns:"+key, base+"/"+key )
+  top.appendChild( root )
+
+  def element( elem ):
+    vrole = elem.vodml_role.rsplit('.', 1)[-1]
+    if elem.__class__.__name__ == "ReferenceType":
+      node = top.createElement( vrole )
+      node.setAttribute( 'IDREF', elem.target )
+    elif elem.__class__.__name__ == "ObjectType" or elem.value == "":
+      if elem.vodml_type == elem.vodml_role:
+        node = top.createElement( elem.vodml_type )
+      else:
+        node = top.createElement( vrole )
+        node.setAttribute( 'xsi:type', elem.vodml_type )
+      if elem.__class__.__name__ == "ObjectType" and elem.isReferenced():
+        node.setAttribute( 'ID', elem.refid )
+      for group in ( elem._references, getattr( elem, '_compositions', {} ), elem._attributes ):
+        for role in group:
+          for item in group[role]:
+            node.appendChild( element( item ) )
+    else:
+      node = top.createElement( vrole )
+      node.appendChild( top.createTextNode( elem.value ) )
+    return node
+
+  for role in doc._metadata:
+    for obj in doc._metadata[ role ]:
+      root.appendChild( element( obj ) )
+  stream.write( top.toprettyxml( indent="  ", encoding="UTF-8" ).decode() )
+
+def xmlwriter_write( doc, stream ):
+  XMLWriter( None ).write_to( doc, stream )
+
+def peak( func ):
+  tracemalloc.start()
+  func()
+  size = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return size
+
+def main():
+  b = DocBuilder()
+  for model in MODELS:
+    b.add_model( TESTRES+model )
+
+  print("# {0:>8} {1:>10} {2:>12} {3:>12} {4:>12} {5:>12}".format( "objects", "size (MB)", "minidom MB/s", "stream MB/s", "minidom peak", "stream peak" ) )
+  for ninst in ( 500, 1000, 2000, 4000 ):
+    b.add_instance_map( make_template( outdir()+"bench_xmlwriter.db", ninst ) )
+    doc = b.process( TESTIN+"test_sample.fits" )
+
+    with open( os.devnull, "w" ) as fp:
+      text = io.StringIO()
+      xmlwriter_write( doc, text )
+      size = len( text.getvalue() ) / 1e6
+      t_dom = timeit( lambda: minidom_write( doc, fp ) )
+      t_str = timeit( lambda: xmlwriter_write( doc, fp ) )
+      m_dom = peak( lambda: minidom_write( doc, fp ) )
+      m_str = peak( lambda: xmlwriter_write( doc, fp ) )
+
+    print("  {0:>8} {1:>10.2f} {2:>12.1f} {3:>12.1f} {4:>10.1f}MB {5:>10.1f}MB".format( ninst, size, size/t_dom, size/t_str, m_dom/1e6, m_str/1e6 ) )
+    os.unlink( outdir()+"bench_xmlwriter.db" )
+
+if __name__ == '__main__':
+  main()
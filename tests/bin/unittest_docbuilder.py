@@ -1,6 +1,11 @@
 import unittest
 from pyvodm.model.builders import *
+from pyvodm.model import ModelRegistry, ModelCache, default_registry
+import pickle
 import os
+import gzip
+import http.server
+import threading
  
 class TestDocBuilder(unittest.TestCase):
   """Test DocBuilder Class """
@@ -61,7 +66,8 @@ class TestDocBuilder(unittest.TestCase):
   def test02(self):
     """ Test missing models  """
 
-    b = DocBuilder()
+    # imported models may not be fetched from the network
+    b = DocBuilder( registry=ModelRegistry( offline=True ) )
     
     # Add models
     b.add_model( self.TESTRES+"Sample.vo-dml.xml")
@@ -83,6 +89,409 @@ class TestDocBuilder(unittest.TestCase):
       raise Exception("Error: No exception thrown for bad input.")
 
 
+  def test03(self):
+    """ Test compiled template reuse  """
+
+    try:
+        b = DocBuilder()
+
+        # Add models
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+
+        # Add instance map; compiles the template
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        plan = b._plan
+
+        d1 = b.process( self.TESTIN+"test_sample.fits" )
+        d2 = b.process( self.TESTIN+"test_sample.fits" )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    assert plan is not None
+    assert b._plan is plan
+    self.assertEqual( len(plan.steps), 6 )
+    self.assertEqual( [ step[0] for step in plan.steps ].count("metadata"), 5 )
+    self.assertEqual( str(d1), str(d2) )
+
+    # Header keyword values are substituted per file
+    self.assertEqual( d1._metadata["FRAMES"][0]._attributes["sample:catalog.SkyCoordinateFrame.name"][0].value, "FK5" )
+
+
+  def test04(self):
+    """ Test source read in place, only header blocks read  """
+
+    fname = "".join( (self.TESTIN, 'test_sample.fits') )
+    try:
+        b = DocBuilder()
+
+        # Add models
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+
+        # Add instance map
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+
+        d1 = b.process( fname )
+        d2 = b.process( "file://"+os.path.abspath( fname ) )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    self.assertEqual( str(d1), str(d2) )
+    self.assertEqual( b.stats["files"], 2 )
+    self.assertEqual( b.stats["bytes_read"], 3*2880 )
+    self.assertEqual( b.stats["total_bytes_read"], 6*2880 )
+
+
+  def test05(self):
+    """ Test batch processing, serial and with worker processes  """
+
+    good = "".join( (self.TESTIN, 'test_sample.fits') )
+    bad  = "".join( (self.TESTIN, 'dne.fits') )
+    try:
+        b = DocBuilder()
+
+        # Add models
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+
+        # Add instance map
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+
+        serial = list( b.process_many( [ good, bad, good ] ) )
+        pooled = list( b.process_many( ",".join( [ good, bad, good ] ), workers=2 ) )
+        unordered = list( b.process_many( "@"+self.TESTIN+"test_stack.lis", workers=2, ordered=False ) )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    self.assertEqual( [ item[0] for item in serial ], [ good, bad, good ] )
+    self.assertEqual( [ item[0] for item in pooled ], [ good, bad, good ] )
+    self.assertIsInstance( serial[1][1], IOError )
+    self.assertIsInstance( pooled[1][1], IOError )
+    self.assertEqual( str(pooled[0][1]), str(serial[0][1]) )
+    self.assertEqual( str(pooled[2][1]), str(serial[2][1]) )
+    self.assertEqual( len(unordered), 1 )
+    self.assertEqual( b.stats["files"], 5 )
+
+
+  def test06(self):
+    """ Test models loaded on demand from imports """
+
+    url = "http://volute.g-vo.org/svn/trunk/projects/dm/vo-dml/models/"
+    try:
+        r = ModelRegistry( offline=True )
+        r.alias( url+"ivoa/vo-dml/IVOA-v1.0.vo-dml.xml", self.TESTRES+"IVOA-v1.0.vo-dml.xml" )
+        r.alias( url+"sample/filter/vo-dml/Filter.vo-dml.xml", self.TESTRES+"Filter.db" )
+
+        b = DocBuilder( registry=r )
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        doc = b.process( self.TESTIN+"test_sample.fits" )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( sorted( b.models.keys() ), [ "filter", "ivoa", "sample" ] )
+    self.assertEqual( len(r), 3 )
+    self.assertEqual( b.models["ivoa"].url, url+"ivoa/vo-dml/IVOA-v1.0.vo-dml.xml" )
+    assert doc is not None
+
+    # a second builder shares the loaded models
+    b2 = DocBuilder( registry=r )
+    b2.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    assert b2.models["sample"] is b.models["sample"]
+
+
+  def test07(self):
+    """ Test template type which does not extend the Model type """
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+
+    b.template.find( uid="_21xDSJklm1yaOgN4" ).etype = "sample:catalog.Source"
+    try:
+        b.compile()
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("does not extend 'sample:catalog.SkyError'") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+
+  def test08(self):
+    """ Test instrumentation: phase timings, counters and callback """
+
+    records = []
+    try:
+        cache = ModelCache( self.TESTOUT+"docBuilder_test08_cache" )
+        b = DocBuilder( cache=cache, registry=ModelRegistry() )
+        stats = b.instrument( callback=lambda operation, record: records.append( ( operation, record ) ) )
+
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        doc = b.process( self.TESTIN+"test_sample.fits" )
+
+        # builder with instrumentation can be sent to worker processes
+        copy = pickle.loads( pickle.dumps( b ) )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    for phase in ( "add_model", "add_instance_map", "template", "required_models", "referenced", "compile", "process", "fetch", "header", "load" ):
+      self.assertTrue( phase in stats.wall, phase )
+      self.assertTrue( stats.wall[phase] >= 0.0 )
+    self.assertEqual( stats.calls["add_model"], 3 )
+    self.assertEqual( stats.cache_hits + stats.cache_misses, 3 )
+    self.assertTrue( stats.map_find > 0 )
+    self.assertTrue( stats.model_get > 0 )
+    self.assertEqual( stats.bytes_read, b.stats["total_bytes_read"] )
+    self.assertEqual( stats.elements.get( "field", 0 ), len( doc._body ) )
+    self.assertEqual( stats.elements["object"], 6 )
+    self.assertTrue( sum( stats.elements.values() ) >= sum( 1 for step in doc.walk() ) )
+
+    self.assertEqual( [ op for op, record in records ], [ "add_model" ]*3 + [ "add_instance_map", "process" ] )
+    self.assertEqual( records[-1][1].bytes_read, b.stats["bytes_read"] )
+    self.assertEqual( records[-1][1].map_find, 0 )
+    self.assertEqual( list( stats.as_dict().keys() ), [ "phases", "elements", "map_find", "model_get", "bytes_read", "cache_hits", "cache_misses" ] )
+    self.assertIsNone( copy.instrumentation )
+    self.assertFalse( "process" in copy.__dict__ )
+
+    # turned off, the builder methods are restored
+    self.assertTrue( b.uninstrument() is stats )
+    self.assertFalse( "process" in b.__dict__ )
+    b.process( self.TESTIN+"test_sample.fits" )
+    self.assertEqual( stats.calls["process"], 1 )
+
+
+  def test09(self):
+    """ Test template analysis is reused across files, and reset with a new template """
+
+    # template with one PhotometryFilter instance, no references
+    row = "{0:20}& {1:40}& {2:45}& & & & & {3}\n"
+    tfile = self.TESTOUT+"docBuilder_test09.db"
+    with open( tfile, "w" ) as fp:
+      fp.write( row.format( "_s000000000000000", "Default", "vodml:metadata", "" ) )
+      fp.write( row.format( "_s000000000000001", "Default.filter", "vodml:instance", "inline:_f000000000000000" ) )
+      fp.write( row.format( "_szzzzzzzzzzzzzzz", "End", "vodml:terminate", "" ) )
+      fp.write( row.format( "_f000000000000000", "Filter", "filter:PhotometryFilter", "" ) )
+      fp.write( row.format( "_f000000000000001", "Filter.name", "filter:PhotometryFilter.name", "key:FILTER1" ) )
+      fp.write( row.format( "_f000000000000002", "Filter.bandName", "filter:PhotometryFilter.bandName", "lit:J" ) )
+
+    try:
+        b = DocBuilder()
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        plan = b._plan
+        required = b._identify_required_models()
+
+        # models already loaded leave the compiled template in place
+        b.add_model( self.TESTRES+"Filter.db")
+
+        stats = b.instrument()
+        docs = [ b.process( self.TESTIN+"test_sample.fits" ) for ii in range( 3 ) ]
+        b.uninstrument()
+
+        # a new template replaces everything derived from the previous one
+        b.add_instance_map( tfile )
+        doc = b.process( self.TESTIN+"test_sample.fits" )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    self.assertTrue( b._plan is not plan )
+    self.assertEqual( sorted( required ), [ "filter", "ivoa", "sample" ] )
+    self.assertEqual( stats.calls["process"], 3 )
+    self.assertFalse( "compile" in stats.calls )
+    self.assertFalse( "required_models" in stats.calls )
+    self.assertEqual( stats.map_find + stats.model_get, 0 )
+    self.assertEqual( str(docs[0]), str(docs[2]) )
+
+    self.assertEqual( b._referenced, set() )
+    self.assertEqual( sorted( b._identify_required_models() ), [ "filter", "ivoa" ] )
+    self.assertEqual( [ step[0] for step in b._template_layout() ], [ "metadata" ] )
+    self.assertEqual( len( doc._metadata["Default"] ), 1 )
+
+  def test10(self):
+    """ Test compile() picks up edits made to the loaded template """
+
+    try:
+        b = DocBuilder()
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        before = b.process( self.TESTIN+"test_sample.fits" )
+
+        b.template.find( uid="_00z5gphhjgZddB81" ).etype = "sample:catalog.Source"
+        b.compile()
+        doc = b.process( self.TESTIN+"test_sample.fits" )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    self.assertTrue( ( "datanode", "sample:catalog.Source", None ) in b._template_layout() )
+    self.assertFalse( before._metadata["Default"][0]._datanode )
+    self.assertTrue( doc._metadata["Default"][0]._datanode )
+
+
+  def test11(self):
+    """ Test add_model() reads a model file again once changed on disk """
+
+    fname = self.TESTOUT+"docBuilder_test11.db"
+    with open( self.TESTRES+"Filter.db", "r" ) as fp:
+      content = fp.read()
+    with open( fname, "w" ) as fp:
+      fp.write( content )
+
+    try:
+        b1 = DocBuilder()
+        b1.add_model( fname )
+        b2 = DocBuilder()
+        b2.add_model( fname )
+        shared = b2.models["filter"]
+
+        with open( fname, "w" ) as fp:
+          fp.write( content.replace( "Version=0.x", "Version=0.y (changed)" ) )
+        b3 = DocBuilder()
+        b3.add_model( fname )
+
+        # remote models are not checked; invalidate() drops them
+        default_registry().invalidate( fname )
+        b4 = DocBuilder()
+        b4.add_model( fname )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+    # Validate
+    self.assertTrue( b1.models["filter"] is shared )
+    self.assertEqual( shared.version, "0.x" )
+    self.assertEqual( b3.models["filter"].version, "0.y (changed)" )
+    self.assertTrue( b4.models["filter"] is not b3.models["filter"] )
+    self.assertEqual( b4.models["filter"].version, "0.y (changed)" )
+
+  def test12(self):
+    """ Test template root type which is not the Model type """
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+
+    # SkyCoordinate extends nothing
+    b.template.find( uid="_21xDSJklm1yaOgN4" ).etype = "sample:catalog.SkyCoordinate"
+    try:
+        b.compile()
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Template type 'sample:catalog.SkyCoordinate' of 'Source.positionError' does not extend 'sample:catalog.SkyError'") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test13(self):
+    """ Test compile() of a template edited to use a Model not loaded """
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+
+    b.template.find( uid="_21xDSJklm1yaOgN4" ).etype = "other:catalog.CircleError"
+    try:
+        b.compile()
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Template requires Models not loaded, ['other']") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test14(self):
+    """ Test process() of a remote, gzip compressed, file """
+
+    with open( self.TESTIN+"test_sample.fits", "rb" ) as fp:
+      data = gzip.compress( fp.read() )
+
+    class Handler( http.server.BaseHTTPRequestHandler ):
+      def do_GET( self ):
+        self.send_response( 200 )
+        self.send_header( "Content-Length", str(len(data)) )
+        self.end_headers()
+        self.wfile.write( data )
+      def log_message( self, *args ):
+        pass
+
+    server = http.server.HTTPServer( ( "127.0.0.1", 0 ), Handler )
+    thread = threading.Thread( target=server.serve_forever )
+    thread.start()
+    url = "http://127.0.0.1:{0}/test_sample.fits.gz".format( server.server_address[1] )
+    try:
+        b = DocBuilder()
+        b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+        b.add_model( self.TESTRES+"Filter.db")
+        b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+        b.add_instance_map( self.TESTRES+"test_modelmap.db")
+        doc = b.process( url )
+        local = b.process( self.TESTIN+"test_sample.fits" )
+
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    # Validate
+    self.assertEqual( doc._source, url )
+    self.assertEqual( str(doc), str(local) )
+
   def test_get_header(self):
     """ Test method _get_header() """
 
@@ -1,4 +1,5 @@
 import unittest
+import pickle
 from pyvodm.document import *
  
 class TestDocument(unittest.TestCase):
@@ -19,6 +20,176 @@ class TestDocument(unittest.TestCase):
 
     assert result is not None
 
+  def test02(self):
+    """ Document: compact text representation """
+
+    obj = ObjectType( refid="_obj1", name="source", desc="Source object" )
+    obj.vodml_role = "sample:catalog.Source"
+    obj.vodml_type = "sample:catalog.Source"
+    attr = PrimitiveType( refid="_prim1", name="name", value="Alpha" )
+    attr.vodml_role = "sample:catalog.Source.name"
+    attr.vodml_type = "ivoa:string"
+    obj.add_attribute( attr )
+
+    doc = Document()
+    doc.add_model_pointer( "sample", "Sample.vo-dml.xml" )
+    doc.add_metadata( obj )
+
+    try:
+      pretty  = repr(doc)
+      compact = doc.to_string( compact=True )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( compact.find("\n"), -1 )
+    self.assertEqual( compact, "".join( line.strip() for line in pretty.split("\n") ) )
+    self.assertTrue( pretty.find("\n        <PRIMITIVE ID='_prim1'") != -1 )
+    self.assertEqual( obj.to_string( compact=True ), "".join( line.strip() for line in repr(obj).split("\n") ) )
+
+  def _nested(self, depth ):
+    # chain of compositions: Top -> child -> child ..., each with a 'name' attribute
+    top = None
+    parent = None
+    for ii in range( depth ):
+      obj = ObjectType( refid="_obj%d" % ii, name="level%d" % ii )
+      obj.vodml_type = "test:Node"
+      obj.vodml_role = "test:Node" if parent is None else "test:Node.child"
+      attr = PrimitiveType( refid="_name%d" % ii, name="name", value="n%d" % ii )
+      attr.vodml_role = "test:Node.name"
+      attr.vodml_type = "ivoa:string"
+      obj.add_attribute( attr )
+      if parent is None:
+        top = obj
+      else:
+        parent.add_composition( obj )
+      parent = obj
+
+    ref = ReferenceType( refid="_ref", name="target", target="_obj3" )
+    ref.vodml_role = "test:Node.target"
+    ref.vodml_type = "test:Node"
+    top.add_reference( ref )
+    return top
+
+  def test03(self):
+    """ Document: index by refid and vodml_role """
+
+    doc = Document()
+    try:
+      doc.add_metadata( self._nested( 6 ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( doc.find( "_obj4" ).name, "level4" )
+    self.assertEqual( doc.find( "_name5" ).value, "n5" )
+    self.assertEqual( [ e.refid for e in doc.find_role( "test:Node.child" ) ], [ "_obj%d" % ii for ii in range( 1, 6 ) ] )
+    self.assertEqual( len( doc.find_role( "test:Node.name" ) ), 6 )
+    self.assertEqual( doc.find_role( "test:Node.nosuchrole" ), [] )
+    self.assertEqual( doc.resolve( doc.find( "_ref" ) ).name, "level3" )
+
+    try:
+      doc.find( "_nosuchid" )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("not found in document") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test04(self):
+    """ Document: set_datanode() on a nested element """
+
+    doc = Document()
+    doc.add_metadata( self._nested( 5 ) )
+    self.assertEqual( doc.find_data_node(), None )
+
+    try:
+      doc.set_datanode( "test:Node.child" )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    nodes = doc.find_data_node()
+    self.assertEqual( [ e.refid for e in nodes ], [ "_obj1", "_obj2", "_obj3", "_obj4" ] )
+    self.assertTrue( all( e._datanode for e in nodes ) )
+    self.assertFalse( doc.find( "_obj0" )._datanode )
+
+    # a role which only contains the given one as a substring is no match
+    try:
+      doc.set_datanode( "test:Node.chi" )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("not found in document") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test05(self):
+    """ Document: walk() events, depth, path and pruning """
+
+    doc = Document()
+    doc.add_metadata( self._nested( 3 ) )
+
+    try:
+      steps = [ ( s.event, s.element.refid, s.depth ) for s in doc.walk( ( ENTER, LEAVE ) ) ]
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( steps, [ ( ENTER, "_obj0", 0 ),
+                                 ( ENTER, "_name0", 1 ), ( LEAVE, "_name0", 1 ),
+                                 ( ENTER, "_ref", 1 ),   ( LEAVE, "_ref", 1 ),
+                                 ( ENTER, "_obj1", 1 ),
+                                   ( ENTER, "_name1", 2 ), ( LEAVE, "_name1", 2 ),
+                                   ( ENTER, "_obj2", 2 ),
+                                     ( ENTER, "_name2", 3 ), ( LEAVE, "_name2", 3 ),
+                                   ( LEAVE, "_obj2", 2 ),
+                                 ( LEAVE, "_obj1", 1 ),
+                               ( LEAVE, "_obj0", 0 ) ] )
+
+    last = list( doc.walk() )[-1]
+    self.assertEqual( last.path, ( "test:Node", "test:Node.child", "test:Node.child", "test:Node.name" ) )
+
+    # pruned element is reported, its content is not
+    pruned = [ s.element.refid for s in doc.walk( prune=lambda e, depth, path: depth == 1 ) ]
+    self.assertEqual( pruned, [ "_obj0", "_name0", "_ref", "_obj1" ] )
+
+    # selected content only
+    objs = [ s.element.refid for s in doc.find( "_obj0" ).walk( content=( "_compositions", ) ) ]
+    self.assertEqual( objs, [ "_obj0", "_obj1", "_obj2" ] )
+
+  def test06(self):
+    """ Document: walk() and index beyond the recursion limit """
+
+    depth = 5000
+    doc = Document()
+    try:
+      doc.add_metadata( self._nested( depth ) )
+      nleave = sum( 1 for s in doc.walk( ( LEAVE, ) ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( nleave, 2*depth + 1 )
+    self.assertEqual( doc.find( "_obj%d" % ( depth-1 ) ).name, "level%d" % ( depth-1 ) )
+    self.assertEqual( len( doc.find_role( "test:Node.child" ) ), depth-1 )
+
 
 # ================================================================================
 class TestElementType(unittest.TestCase):
@@ -218,6 +389,63 @@ class TestObjectType(unittest.TestCase):
       raise Exception("Error: No exception thrown for bad input.")
 
 
+  def test04(self):
+    """ ObjectType: content tables created on first add """
+
+    empty = ObjectType( name="Empty" )
+    other = ObjectType( name="Other" )
+    item = PrimitiveType( name="name", value="Bob" )
+    item.vodml_role = "test:Person.name"
+
+    try:
+      other.add_attribute( item )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( len(empty._attributes), 0 )
+    self.assertTrue( empty._attributes is empty._compositions )
+    self.assertEqual( len(other._attributes), 1 )
+    self.assertEqual( len(empty._attributes), 0 )
+    self.assertFalse( hasattr( empty, "__dict__" ) )
+    self.assertEqual( repr( pickle.loads( pickle.dumps( other ) ) ), repr( other ) )
+
+
+  def test05(self):
+    """ ObjectType: add_*() accept element subclasses, by kind """
+
+    class Person(ObjectType):
+      __slots__ = ()
+
+    result = ObjectType( name="Family" )
+    try:
+      result.add_composition( Person( name="Bob" ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( len(result._compositions), 1 )
+    self.assertEqual( Person().kind, "object" )
+    self.assertEqual( [ c.kind for c in ( DataType(), FieldType(), EnumType(), PrimitiveType( "1" ), ReferenceType( "_x" ) ) ],
+                      [ "datatype", "field", "enum", "primitive", "reference" ] )
+
+    try:
+      result.add_composition( DataType( name="Bob" ) )
+
+    except TypeError as te: # catch the error
+        if str(te).find("argument must be ObjectType object") == -1:
+          print(te)
+          raise Exception("Error: expected TypeError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+
   def test99(self):
     """ ObjectType Display """
 
@@ -575,6 +803,48 @@ class TestEnumType(unittest.TestCase):
       raise Exception("Error: No exception thrown for bad input.")
 
 
+  def test03(self):
+    """ EnumType:set_literals() - shared table """
+
+    literals = [ ( "catalog.SourceClassification.star", "STAR" ), ( "catalog.SourceClassification.galaxy", "GALAXY" ) ]
+    try:
+      e1 = EnumType(name="classification", value="STAR")
+      e1.set_literals( literals )
+      e2 = EnumType(name="classification", value="GALAXY")
+      e2.set_literals( shared_table( literals ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertTrue( e1._literals is e2._literals )
+    self.assertEqual( list( e1._literals.items() ), literals )
+
+    # table survives pickling, and is shared again on load
+    copies = pickle.loads( pickle.dumps( [ e1, e2 ] ) )
+    self.assertTrue( copies[0]._literals is e1._literals )
+    self.assertTrue( copies[1]._literals is e1._literals )
+
+    # adding to a shared table leaves the other instances unchanged
+    e1.add_literal( "catalog.SourceClassification.agn", "AGN" )
+    self.assertEqual( len( e1._literals ), 3 )
+    self.assertEqual( len( e2._literals ), 2 )
+
+    try:
+      e1.set_literals( [ ( "catalog.SourceClassification.star", 7 ) ] )
+
+    except TypeError as te: # catch the error
+        if str(te).find("argument must hold string pairs") == -1:
+          print(te)
+          raise Exception("Error: expected TypeError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+
   def test99(self):
     """ EnumType Display """
 
@@ -0,0 +1,116 @@
+import unittest
+from pyvodm.utils.header import *
+import os
+import io
+import gzip
+ 
+class TestHeader(unittest.TestCase):
+  """Test header-only FITS access """
+
+  TEST_BASE_DIR = os.path.join( os.path.dirname(__file__), '../' )
+
+  TESTIN  = ''.join( (TEST_BASE_DIR, "data/") )
+
+  fname = ''.join( (TESTIN, 'test_sample.fits') )
+
+  def setUp(self):
+    """ Setup prior to each test"""
+
+  def test01(self):
+    """ read_header(): table extension """
+
+    try:
+      hdr = read_header( self.fname, 1 )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( hdr["XTENSION"], "BINTABLE" )
+    self.assertEqual( hdr["FILTER1"], "2mass:J" )
+    self.assertEqual( hdr["HISTNUM"], 7 )
+
+  def test02(self):
+    """ read_header(): primary HDU from open stream, data not read """
+
+    try:
+      with open( self.fname, 'rb' ) as fp:
+        hdr = read_header( fp, 0 )
+        pos = fp.tell()
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( hdr["NAXIS"], 0 )
+    self.assertEqual( pos % BLOCK_SIZE, 0 )
+    self.assertLess( pos, os.path.getsize( self.fname ) )
+
+  def test03(self):
+    """ read_header(): HDU does not exist """
+
+    try:
+      hdr = read_header( self.fname, 5 )
+
+    except IOError as ie: # catch the error
+        if str(ie).find("HDU 5 not found in file") == -1:
+          print(ie)
+          raise Exception("Error: expected IOError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test04(self):
+    """ header_meta(): structural and column keywords removed """
+
+    try:
+      meta = header_meta( read_header( self.fname, 1 ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( len(meta), 19 )
+    self.assertEqual( list(meta.keys())[0], "EXTNAME" )
+    self.assertEqual( meta["comments"], [ "# Temporary - put columns as keys" ] )
+    self.assertEqual( len(meta["HISTORY"]), 7 )
+    for key in ( "XTENSION", "NAXIS2", "TTYPE1", "TFORM8" ):
+      assert ( key not in meta ) is True
+
+  def test05(self):
+    """ open_fits_stream(): gzip compressed, not seekable stream """
+
+    class Stream(object):
+      # eg: remote file
+      def __init__(self, data ):
+        self._fp = io.BytesIO( data )
+      def read( self, size=-1 ):
+        return self._fp.read( size )
+      def close( self ):
+        self._fp.close()
+
+    with open( self.fname, 'rb' ) as fp:
+      data = fp.read()
+    try:
+      plain = open_fits_stream( Stream( data ) )
+      hdr = read_header( plain, 1 )
+      plain.close()
+
+      packed = open_fits_stream( Stream( gzip.compress( data ) ) )
+      zhdr = read_header( packed, 1 )
+      packed.close()
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( hdr["FILTER1"], "2mass:J" )
+    self.assertEqual( str(zhdr), str(hdr) )
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
 from pyvodm.model import *
 import os
+import json
+import zlib
+import shutil
+import tempfile
+import threading
  
 class TestModelElement(unittest.TestCase):
   """Test ModelElement class """
@@ -206,6 +211,253 @@ class TestModel(unittest.TestCase):
     else:
       raise Exception("Error: No exception thrown for bad input.")
 
+  def test10(self):
+    """ Model: constructor using ModelCache """
+
+    cachedir = tempfile.mkdtemp()
+    try:
+      cache = ModelCache( cachedir )
+      m1 = Model( self.xname, cache=cache )
+      m2 = Model( self.xname, cache=cache )
+      m3 = Model( self.xname )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+    finally:
+      shutil.rmtree( cachedir )
+
+    self.assertEqual( cache.misses, 1 )
+    self.assertEqual( cache.hits, 1 )
+    self.assertEqual( m2.name, m3.name )
+    self.assertEqual( m2.imports, m3.imports )
+    self.assertEqual( list(m2._records.keys()), list(m3._records.keys()) )
+    for key in m3._records:
+      self.assertEqual( str(m2._records[key]), str(m3._records[key]) )
+
+  def test11(self):
+    """ ModelCache: prewarm """
+
+    cachedir = tempfile.mkdtemp()
+    try:
+      cache = ModelCache( cachedir )
+      cache.prewarm( [ self.xname, self.fname ] )
+      misses = cache.misses
+      Model( self.fname, cache=cache )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+    finally:
+      shutil.rmtree( cachedir )
+
+    self.assertEqual( misses, 2 )
+    self.assertEqual( cache.hits, 1 )
+
+  def test12(self):
+    """ Model: get() of imported model element """
+
+    url = "http://volute.g-vo.org/svn/trunk/projects/dm/vo-dml/models/ivoa/vo-dml/IVOA-v1.0.vo-dml.xml"
+    try:
+      r = ModelRegistry( offline=True )
+      r.alias( url, self.TEST_RESOURCE_DIR+"IVOA-v1.0.vo-dml.xml" )
+      m = Model( self.xname, registry=r )
+      self.assertEqual( len(r), 0 )
+      result = m.get( "ivoa:RealQuantity" )
+      m.get( "ivoa:string" )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( result.etype, "dataType" )
+    self.assertEqual( len(r), 1 )
+    assert (url in r) is True
+
+  def test13(self):
+    """ ModelRegistry: concurrent load of one model """
+
+    r = ModelRegistry()
+    results = []
+    def load():
+      results.append( r.load( self.xname ) )
+
+    threads = [ threading.Thread( target=load ) for ii in range(8) ]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+
+    self.assertEqual( len(results), 8 )
+    self.assertEqual( len(r), 1 )
+    for m in results:
+      assert m is results[0]
+
+  def test14(self):
+    """ ModelRegistry: remote model while offline """
+
+    r = ModelRegistry( offline=True )
+    m = Model( self.xname, registry=r )
+    try:
+      m.get( "ivoa:RealQuantity" )
+
+    except IOError as ie: # catch the error
+        if str(ie).find("not available offline") == -1:
+          print(ie)
+          raise Exception("Error: expected IOError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test15(self):
+    """ Model: children(), literals() and iter_records() """
+
+    try:
+      m = Model( self.xname )
+      top = m.children( None )
+      kids = m.children( "sample:catalog.SkyCoordinate" )
+      literals = m.literals( "sample:catalog.SourceClassification" )
+      enums = [ key for key, elem in m.iter_records( etype="enumeration" ) ]
+      allrecs = [ key for key, elem in m.iter_records() ]
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    assert ("sample:catalog" in top) is True
+    self.assertEqual( list(kids.keys()), [ "sample:catalog.SkyCoordinate.longitude",
+                                           "sample:catalog.SkyCoordinate.latitude",
+                                           "sample:catalog.SkyCoordinate.frame" ] )
+    self.assertEqual( sorted( key.split(".").pop() for key in literals ),
+                      [ "AGN", "galaxy", "planet", "star", "unknown" ] )
+    self.assertEqual( sorted( enums ), [ "sample:catalog.LuminosityType",
+                                         "sample:catalog.SourceClassification" ] )
+    self.assertEqual( allrecs, list( m._records.keys() ) )
+
+    # children cover every record exactly once
+    count = 0
+    stack = [ None ]
+    while stack:
+      kids = m.children( stack.pop() )
+      count += len(kids)
+      stack.extend( kids.keys() )
+    self.assertEqual( count, len( m._records ) )
+
+  def test16(self):
+    """ Model: children() with no match to input tag """
+
+    m = Model( self.xname )
+    try:
+      m.children( "sample:catalog.dne" )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Input tag not found in Model") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test17(self):
+    """ Model: supertypes(), is_subtype() and members() """
+
+    url = "http://volute.g-vo.org/svn/trunk/projects/dm/vo-dml/models/ivoa/vo-dml/IVOA-v1.0.vo-dml.xml"
+    try:
+      r = ModelRegistry( offline=True )
+      r.alias( url, self.TEST_RESOURCE_DIR+"IVOA-v1.0.vo-dml.xml" )
+      m = Model( self.xname, registry=r )
+      supers = m.supertypes( "sample:catalog.Source" )
+      members = m.members( "sample:catalog.Source" )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( m.get( "sample:catalog.CircleError" ).extends, "sample:catalog.SkyError" )
+    self.assertEqual( supers, ( "sample:catalog.AbstractSource", "sample:catalog.AstroObject" ) )
+    assert m.is_subtype( "sample:catalog.Source", "sample:catalog.AstroObject" ) is True
+    assert m.is_subtype( "sample:catalog.Source", "sample:catalog.Source" ) is True
+    assert m.is_subtype( "sample:catalog.AstroObject", "sample:catalog.Source" ) is False
+    assert m.is_subtype( "sample:catalog.CircleError", "sample:catalog.SkyError" ) is True
+
+    # inherited members first
+    self.assertEqual( list( members.keys() )[:2], [ "sample:catalog.AstroObject.label",
+                                                    "sample:catalog.AbstractSource.name" ] )
+    assert ( "sample:catalog.AbstractSource.positionError" in members ) is True
+    assert m.members( "sample:catalog.Source" ) is members
+
+    # imported model types
+    assert m.is_subtype( "ivoa:RealQuantity", "ivoa:Quantity" ) is True
+    assert m.is_subtype( "ivoa:Quantity", "ivoa:RealQuantity" ) is False
+
+  def test18(self):
+    """ Model: constructor from bytes and open file """
+
+    try:
+      with open( self.fname, 'rb' ) as fp:
+        dbm = Model( fp.read() )
+      with open( self.xname, 'rb' ) as fp:
+        xmlm = Model( fp )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( str(dbm), str( Model( self.fname ) ) )
+    self.assertEqual( str(xmlm), str( Model( self.xname ) ) )
+
+  def test19(self):
+    """ Model: malformed table line reports file and line """
+
+    content = b"Prefix=bad\n#\ncatalog & package &\n"
+    try:
+      result = Model( content )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("<bytes>:3: expected 5") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test20(self):
+    """ ModelCache: entries are data only; a given stamp needs no lookup """
+
+    url = "http://localhost.invalid/Sample.vo-dml.xml"
+    cachedir = tempfile.mkdtemp()
+    try:
+      cache = ModelCache( cachedir )
+      m1 = Model( self.xname )
+      cache.store( url, m1, stamp="stamp-1" )
+      entries = os.listdir( cachedir )
+      with open( os.path.join( cachedir, entries[0] ), 'rb' ) as fp:
+        content = json.loads( zlib.decompress( fp.read() ).decode("utf-8") )
+
+      # remote source, not contacted
+      m2 = Model( url, cache=cache, stamp="stamp-1" )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+    finally:
+      shutil.rmtree( cachedir )
+
+    self.assertEqual( len(entries), 1 )
+    self.assertEqual( content["version"], ModelCache.VERSION )
+    self.assertEqual( cache.hits, 1 )
+    self.assertEqual( m2.name, m1.name )
+    self.assertEqual( list(m2._records.keys()), list(m1._records.keys()) )
+
 
 if __name__ == '__main__':
 
@@ -1,5 +1,6 @@
 import unittest
 from pyvodm.modelMap import *
+import io
 import os
  
 class TestModelMapElement(unittest.TestCase):
@@ -311,6 +312,138 @@ class TestModelMap(unittest.TestCase):
         self.assertEqual( result[k].name, children[k] )
 
 
+  def test07(self):
+    """ ModelMap: iter() cursor, rewind, slicing and role filter """
+
+    try:
+      m = ModelMap( self.fname )
+      it = m.iter()
+      first = next( it )
+      nrecs = 1 + len( [ rec for rec in it ] )
+      it.rewind()
+      again = next( it )
+      sub = m.iter()[2:4]
+      structure = [ rec.role for rec in m.iter( role="vodml:" ) ]
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( nrecs, len(m._records) )
+    self.assertEqual( first.uid, "_00z00IQ9XCCV2h9U" )
+    self.assertEqual( again.uid, first.uid )
+    self.assertEqual( len(sub), 2 )
+    self.assertEqual( next(sub).uid, m.iter()[2].uid )
+    self.assertEqual( len(structure), 10 )
+    self.assertEqual( structure[-1], "vodml:terminate" )
+
+  def test08(self):
+    """ ModelMap: find_parent() and descendants() """
+
+    uid = "_309W3rygu5gAFiob"  #Source Position
+    try:
+      m = ModelMap( self.fname )
+      parent = m.find_parent( "_30XJg9FgKp5qr9vc" )
+      top = m.find_parent( uid )
+      desc = [ rec.uid for rec in m.descendants( uid ) ]
+      frames = [ rec.uid for rec in m.descendants( "_00z00IQ9XCCV2h9U" ) ]
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( parent.uid, uid )
+    self.assertIsNone( top )
+    self.assertEqual( desc, list( m.find_children( uid ).keys() ) )
+    self.assertEqual( frames, [ "_00z0J1hpA0Qf7UzK" ] )
+
+    try:
+      # test uid not matched
+      result = m.find_parent( "unmatched_string" )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Input ID not found in ModelMap") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+        raise Exception("Error: No exception thrown for bad input.")
+
+  def test09(self):
+    """ ModelMap: find_prefix() """
+
+    try:
+      m = ModelMap( self.fname )
+      result = m.find_prefix( "JBandFilter." )
+      empty = m.find_prefix( "NoSuchInstance." )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( len(result), 5 )
+    self.assertEqual( list(result.keys())[0], "_100mtkxjdi92CGCj" )
+    self.assertEqual( list(result.keys()), list( m.find_children( "_100bQ8LarUAorcmn" ).keys() ) )
+    self.assertEqual( len(empty), 0 )
+
+  def test10(self):
+    """ ModelMap: constructor from open file and bytes """
+
+    try:
+      expected = ModelMap( self.fname )
+      with open( self.fname, 'rb' ) as fp:
+        content = fp.read()
+      with open( self.fname, 'r' ) as fp:
+        from_file = ModelMap( fp )
+      from_bytes = ModelMap( content )
+      from_stream = ModelMap( io.BytesIO( content ) )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    for result in ( from_file, from_bytes, from_stream ):
+      self.assertEqual( str(result), str(expected) )
+
+  def test11(self):
+    """ ModelMap: malformed record reports file and line """
+
+    content = b"# comment\n\n_a & A & sample:catalog.Source & & & & & \n_b & B & sample:catalog.Source\n"
+    try:
+      result = ModelMap( content )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("<bytes>:4: expected 8") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test12(self):
+    """ ModelMap: invalid record value reports file and line """
+
+    content = b"_a & A & sample:catalog.Source & & & & & bad:value\n"
+    try:
+      result = ModelMap( io.BytesIO( content ) )
+
+    except TypeError as te: # catch the error
+        if str(te).find("<stream>:1: 'value' argument value invalid") == -1:
+          print(te)
+          raise Exception("Error: expected TypeError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
 
 if __name__ == '__main__':
 
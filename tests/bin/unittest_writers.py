@@ -0,0 +1,511 @@
+import unittest
+from pyvodm.model.builders import DocBuilder
+from pyvodm.document.writers import *
+import io
+import os
+import socket
+import threading
+import re
+
+import numpy as np
+from astropy.io import fits
+from astropy.io.votable import parse
+ 
+class TestVOTWriter(unittest.TestCase):
+  """Test VOTWriter Class """
+
+  TEST_BASE_DIR = os.path.join( os.path.dirname(__file__), '../' )
+
+  TESTIN  = ''.join( (TEST_BASE_DIR, "data/") )
+  TESTOUT = ''.join( (TEST_BASE_DIR, "out/") )
+  TESTRES = ''.join( (TEST_BASE_DIR, "res/") )
+
+  def setUp(self):
+    """ Setup prior to each test"""
+
+    if not os.path.exists( self.TESTOUT ):
+      os.mkdir( self.TESTOUT )
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+    self.doc = b.process( self.TESTIN+"test_sample.fits" )
+
+  def _write_file(self, annotation ):
+    fname = self.TESTOUT+"unittest_writers.vot"
+    with VOTWriter( fname ) as w:
+      w.set_annotation( annotation )
+      w.write( self.doc )
+    with open( fname, 'r' ) as fp:
+      return fp.read()
+
+  def test01(self):
+    """ VOTWriter: write_to() text, binary and unbuffered streams """
+
+    for annotation in ( "none", "vodml" ):
+      expected = self._write_file( annotation )
+      try:
+        w = VOTWriter( None )
+        w.set_annotation( annotation )
+
+        text = io.StringIO()
+        w.write_to( self.doc, text )
+
+        data = io.BytesIO()
+        w.write_to( self.doc, data )
+
+        w.flush_size = 0
+        small = io.StringIO()
+        w.write_to( self.doc, small )
+
+      except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+      assert len(expected) > 0
+      self.assertEqual( text.getvalue(), expected )
+      self.assertEqual( data.getvalue().decode("utf-8"), expected )
+      self.assertEqual( small.getvalue(), expected )
+
+  def test02(self):
+    """ VOTWriter: write_to() socket """
+
+    expected = self._write_file( "vodml" )
+    received = []
+
+    a, b = socket.socketpair()
+    def reader():
+      while True:
+        data = b.recv( 4096 )
+        if not data:
+          break
+        received.append( data )
+
+    t = threading.Thread( target=reader )
+    t.start()
+    try:
+      w = VOTWriter( None, flush_size=1024 )
+      w.set_annotation( "vodml" )
+      w.write_to( self.doc, a )
+    finally:
+      a.close()
+      t.join()
+      b.close()
+
+    self.assertEqual( b"".join( received ).decode("utf-8"), expected )
+
+  def test03(self):
+    """ VOTWriter: write() without output file """
+
+    w = VOTWriter( None )
+    try:
+      w.write( self.doc )
+
+    except IOError as ie: # catch the error
+        if str(ie).find("No output file") == -1:
+          print(ie)
+          raise Exception("Error: expected IOError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def _inline_doc(self):
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+    for uid, column in ( ("_31PB0wN4yle0K5mQ", "ra"), ("_30XJg9FgKp5qr9vc", "dec"), ("_50XbEKAqJbw3QCCV", "magj") ):
+      b.template.find( uid=uid ).value = "field:"+column
+    b.compile()
+    return b.process( self.TESTIN+"test_sample.fits" )
+
+  def _inline_rows(self, doc, data_format, chunk_rows=1000 ):
+    w = VOTWriter( None, data_format=data_format, chunk_rows=chunk_rows )
+    data = io.BytesIO()
+    w.write_to( doc, data )
+    data.seek(0)
+    return data.getvalue().decode("utf-8"), parse( data ).get_first_table().array
+
+  def test04(self):
+    """ VOTWriter: inline TABLEDATA and BINARY2 data """
+
+    try:
+      doc = self._inline_doc()
+      text, tabledata = self._inline_rows( doc, "tabledata" )
+      text2, binary2 = self._inline_rows( doc, "binary2" )
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( len(doc._body), 3 )
+    self.assertTrue( text.find("<TR><TD>12.9768538030848</TD><TD>-72.9580158132637</TD><TD>0.042</TD></TR>") != -1 )
+    self.assertEqual( text.find("<FITS"), -1 )
+    self.assertTrue( text2.find("<STREAM encoding=\"base64\">") != -1 )
+
+    source = fits.getdata( self.TESTIN+"test_sample.fits", 1 )
+    for rows in ( tabledata, binary2 ):
+      self.assertEqual( len(rows), 1 )
+      self.assertEqual( rows["ra"][0], source["ra"][0] )
+      self.assertEqual( rows["dec"][0], source["dec"][0] )
+    self.assertEqual( binary2["magj"][0], np.float64( source["magj"][0] ) )
+    self.assertAlmostEqual( tabledata["magj"][0], 0.042 )
+
+  def test05(self):
+    """ VOTWriter: inline data streamed in chunks, with nulls """
+
+    nrows = 2503
+    ra = np.arange( nrows ) * 0.125
+    dec = np.where( np.arange( nrows ) % 10 == 0, np.nan, -np.arange( nrows ) * 0.25 )
+    magj = np.arange( nrows, dtype="f4" )
+    fname = self.TESTOUT+"unittest_writers.fits"
+    fits.BinTableHDU.from_columns( [ fits.Column( "RA", "D", array=ra ),
+                                     fits.Column( "DEC", "D", array=dec ),
+                                     fits.Column( "MAGJ", "E", array=magj ) ] ).writeto( fname, overwrite=True )
+    try:
+      doc = self._inline_doc()
+      doc._source = "file://"+os.path.abspath( fname )
+      doc._source_ext = 1
+      results = [ self._inline_rows( doc, data_format, chunk_rows )[1]
+                  for data_format in ( "tabledata", "binary2" ) for chunk_rows in ( 100, 10000 ) ]
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    for rows in results:
+      self.assertEqual( len(rows), nrows )
+      self.assertTrue( np.array_equal( rows["ra"], ra ) )
+      self.assertTrue( np.array_equal( np.ma.filled( rows["dec"], np.nan ), dec, equal_nan=True ) )
+      self.assertTrue( np.array_equal( rows["magj"], magj ) )
+
+  def test06(self):
+    """ VOTWriter: bad data format """
+
+    try:
+      w = VOTWriter( None, data_format="csv" )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Unrecognized data format") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test07(self):
+    """ VOTWriter: inline data for column missing from source table """
+
+    doc = self._inline_doc()
+    doc._body[0].value = "nosuchcolumn"
+    try:
+      w = VOTWriter( None, data_format="tabledata" )
+      w.write_to( doc, io.StringIO() )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Column 'nosuchcolumn' not found") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test08(self):
+    """ VOTWriter: compact output """
+
+    for annotation in ( "none", "vodml" ):
+      expected = self._write_file( annotation )
+      try:
+        w = VOTWriter( None, annotation=annotation, compact=True )
+        text = io.StringIO()
+        w.write_to( self.doc, text )
+      except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: unexpected exception thrown")
+
+      self.assertEqual( text.getvalue().find("\n"), -1 )
+      self.assertTrue( len( text.getvalue() ) < len( expected ) )
+      self.assertEqual( re.sub( r">\s+<", "><", text.getvalue() ), re.sub( r">\s+<", "><", expected ).strip() )
+
+  def _integer_doc(self, columns, keywords={} ):
+    # inline document of integer FIELDs, filled from the given table columns;
+    # keywords (eg: scaling) are set on the stored table as is
+    fname = self.TESTOUT+"unittest_writers.fits"
+    fits.BinTableHDU.from_columns( columns ).writeto( fname, overwrite=True )
+    for key, value in keywords.items():
+      fits.setval( fname, key, value=value, ext=1 )
+    doc = self._inline_doc()
+    doc._source = "file://"+os.path.abspath( fname )
+    doc._source_ext = 1
+    for obj in doc._body:
+      obj.vodml_type = "ivoa:integer"
+    return doc
+
+  def test09(self):
+    """ VOTWriter: inline data of K, unsigned and scaled integer columns """
+
+    big = np.array( [ 5000000000, -5000000000, 7 ], dtype="i8" )
+    unsigned = np.array( [ 3000000000, 0, 4294967295 ], dtype="u4" )
+    scaled = np.array( [ 10.5, -2.0, 100.25 ] )
+    try:
+      doc = self._integer_doc( [ fits.Column( "RA", "K", array=big ),
+                                 fits.Column( "DEC", "J", bzero=2**31, array=unsigned ),
+                                 fits.Column( "MAGJ", "I", array=np.array( [ 2, -48, 361 ], dtype="i2" ) ) ],
+                               { "TSCAL3": 0.25, "TZERO3": 10 } )
+      results = [ self._inline_rows( doc, data_format ) for data_format in ( "tabledata", "binary2" ) ]
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    for text, rows in results:
+      self.assertTrue( text.find("name=\"ra\" datatype=\"long\"") != -1 )
+      self.assertTrue( text.find("name=\"dec\" datatype=\"long\"") != -1 )
+      self.assertTrue( text.find("name=\"magj\" datatype=\"double\"") != -1 )
+      self.assertTrue( np.array_equal( rows["ra"], big ) )
+      self.assertTrue( np.array_equal( rows["dec"], unsigned ) )
+      self.assertTrue( np.array_equal( rows["magj"], scaled ) )
+    self.assertTrue( results[0][0].find("<TR><TD>5000000000</TD><TD>3000000000</TD><TD>10.5</TD></TR>") != -1 )
+
+  def test10(self):
+    """ VOTWriter: inline data of integer columns with TNULL """
+
+    values = np.array( [ 1, -1, 3, -1 ], dtype="i4" )
+    try:
+      doc = self._integer_doc( [ fits.Column( "RA", "J", null=-1, array=values ),
+                                 fits.Column( "DEC", "K", null=-1, array=values.astype("i8") ),
+                                 fits.Column( "MAGJ", "J", null=-1, array=values ) ],
+                               { "TSCAL3": 0.5 } )
+      results = [ self._inline_rows( doc, data_format ) for data_format in ( "tabledata", "binary2" ) ]
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    nulls = values == -1
+    for text, rows in results:
+      for name in ( "ra", "dec", "magj" ):
+        self.assertTrue( np.array_equal( np.ma.getmaskarray( rows[name] ), nulls ) )
+      self.assertEqual( rows["ra"].compressed().tolist(), [ 1, 3 ] )
+      self.assertEqual( rows["dec"].compressed().tolist(), [ 1, 3 ] )
+      self.assertEqual( rows["magj"].compressed().tolist(), [ 0.5, 1.5 ] )
+    self.assertTrue( results[0][0].find("<TR><TD></TD><TD></TD><TD></TD></TR>") != -1 )
+
+  def test11(self):
+    """ VOTWriter: inline data of unsigned 64 bit column """
+
+    doc = self._integer_doc( [ fits.Column( "RA", "K", bzero=2**63, array=np.array( [ 2**63 ], dtype="u8" ) ),
+                               fits.Column( "DEC", "J", array=np.zeros( 1, dtype="i4" ) ),
+                               fits.Column( "MAGJ", "J", array=np.zeros( 1, dtype="i4" ) ) ] )
+    try:
+      w = VOTWriter( None, data_format="binary2" )
+      w.write_to( doc, io.StringIO() )
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("can not be written as integer FIELD 'ra'") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+
+class TestXMLWriter(unittest.TestCase):
+  """Test XMLWriter Class """
+
+  TEST_BASE_DIR = os.path.join( os.path.dirname(__file__), '../' )
+
+  TESTIN  = ''.join( (TEST_BASE_DIR, "data/") )
+  TESTOUT = ''.join( (TEST_BASE_DIR, "out/") )
+  TESTRES = ''.join( (TEST_BASE_DIR, "res/") )
+  TESTSAV = ''.join( (TEST_BASE_DIR, "base/") )
+
+  def setUp(self):
+    """ Setup prior to each test"""
+
+    if not os.path.exists( self.TESTOUT ):
+      os.mkdir( self.TESTOUT )
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+    self.doc = b.process( self.TESTIN+"test_sample.fits" )
+
+    with open( self.TESTSAV+"unittest_writers.xml", 'r' ) as fp:
+      self.expected = fp.read()
+
+  def test01(self):
+    """ XMLWriter: write() matches golden file """
+
+    fname = self.TESTOUT+"unittest_writers.xml"
+    try:
+      with XMLWriter( fname ) as w:
+        w.write( self.doc )
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    with open( fname, 'r' ) as fp:
+      self.assertEqual( fp.read(), self.expected )
+
+  def test02(self):
+    """ XMLWriter: write_to() text, binary and unbuffered streams """
+
+    try:
+      w = XMLWriter( None )
+
+      text = io.StringIO()
+      w.write_to( self.doc, text )
+
+      data = io.BytesIO()
+      w.write_to( self.doc, data )
+
+      w.flush_size = 0
+      small = io.StringIO()
+      w.write_to( self.doc, small )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    self.assertEqual( text.getvalue(), self.expected )
+    self.assertEqual( data.getvalue().decode("utf-8"), self.expected )
+    self.assertEqual( small.getvalue(), self.expected )
+
+  def test03(self):
+    """ XMLWriter: values are escaped """
+
+    obj = self.doc._metadata[ list( self.doc._metadata )[-1] ][0]
+    obj._attributes[ list( obj._attributes )[0] ][0].value = "<a & \"b\">"
+    text = io.StringIO()
+    XMLWriter( None ).write_to( self.doc, text )
+
+    self.assertTrue( text.getvalue().find( ">&lt;a &amp; &quot;b&quot;&gt;<" ) != -1 )
+
+  def test04(self):
+    """ XMLWriter: compact output """
+
+    text = io.StringIO()
+    with XMLWriter( None, compact=True ) as w:
+      w.write_to( self.doc, text )
+
+    self.assertEqual( text.getvalue().find("\n"), -1 )
+    self.assertEqual( text.getvalue(), re.sub( r">\s+<", "><", self.expected ).strip() )
+
+
+class TestWriterRegistry(unittest.TestCase):
+  """Test writer registry and MultiWriter """
+
+  TEST_BASE_DIR = os.path.join( os.path.dirname(__file__), '../' )
+
+  TESTIN  = ''.join( (TEST_BASE_DIR, "data/") )
+  TESTOUT = ''.join( (TEST_BASE_DIR, "out/") )
+  TESTRES = ''.join( (TEST_BASE_DIR, "res/") )
+
+  def setUp(self):
+    """ Setup prior to each test"""
+
+    if not os.path.exists( self.TESTOUT ):
+      os.mkdir( self.TESTOUT )
+
+    b = DocBuilder()
+    b.add_model( self.TESTRES+"Sample.vo-dml.xml")
+    b.add_model( self.TESTRES+"Filter.db")
+    b.add_model( self.TESTRES+"IVOA-v1.0.vo-dml.xml")
+    b.add_instance_map( self.TESTRES+"test_modelmap.db")
+    self.doc = b.process( self.TESTIN+"test_sample.fits" )
+
+  def _write(self, writer ):
+    text = io.StringIO()
+    writer.write_to( self.doc, text )
+    return text.getvalue()
+
+  def test01(self):
+    """ Writer registry: formats """
+
+    self.assertEqual( writer_formats(), [ "avot", "vot", "xml" ] )
+    self.assertTrue( isinstance( get_writer("vot"), VOTWriter ) )
+    self.assertTrue( isinstance( get_writer("xml"), XMLWriter ) )
+    self.assertEqual( self._write( get_writer("avot") ), self._write( VOTWriter( None, annotation=VOTWriter( None ).VODML ) ) )
+    self.assertEqual( self._write( get_writer("avot", annotation="none") ), self._write( VOTWriter( None ) ) )
+
+    try:
+      get_writer("fits")
+
+    except ValueError as ve: # catch the error
+        if str(ve).find("Unrecognized output format") == -1:
+          print(ve)
+          raise Exception("Error: expected ValueError not thrown")
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+  def test02(self):
+    """ MultiWriter: files and streams, in one write """
+
+    stream = io.BytesIO()
+    targets = [ ( name, self.TESTOUT+"unittest_multiwriter."+name ) for name in writer_formats() ]
+    try:
+      with MultiWriter( targets + [ ( "xml", stream ) ], flush_size=512 ) as w:
+        self.assertEqual( len(w), 4 )
+        w.write( self.doc )
+
+    except Exception as ex:
+      print(ex.__class__.__name__ + ": " + str(ex))
+      raise Exception("Error: unexpected exception thrown")
+
+    for name, fname in targets:
+      with open( fname, 'r' ) as fp:
+        self.assertEqual( fp.read(), self._write( get_writer( name ) ) )
+    self.assertEqual( stream.getvalue().decode("utf-8"), self._write( XMLWriter( None ) ) )
+
+  def test03(self):
+    """ Writer: file opened on first write, closed by context manager """
+
+    fname = self.TESTOUT+"unittest_lazy.vot"
+    if os.path.exists( fname ):
+      os.unlink( fname )
+
+    with VOTWriter( fname ) as w:
+      self.assertFalse( os.path.exists( fname ) )
+      w.write( self.doc )
+      self.assertFalse( w._fp.closed )
+      fp = w._fp
+    self.assertTrue( fp.closed )
+    self.assertEqual( w._fp, None )
+
+    with open( fname, 'r' ) as fp:
+      self.assertEqual( fp.read(), self._write( VOTWriter( None ) ) )
+
+    # bad output location is reported on write
+    w = XMLWriter( self.TESTOUT+"nosuchdir/unittest_lazy.xml" )
+    try:
+      w.write( self.doc )
+
+    except IOError as ie: # catch the error
+        pass
+    except Exception as ex:
+        print(ex.__class__.__name__ + ": " + str(ex))
+        raise Exception("Error: expected exception not thrown")
+    else:
+      raise Exception("Error: No exception thrown for bad input.")
+
+
+if __name__ == '__main__':
+    unittest.main()